@@ -1,56 +1,462 @@
 # app/api/v1/routes_admin_jobs.py
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status,BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_admin_user
-from app.db.session import get_db
+from app.config import settings
+from app.core.principal_cache import Principal
+from app.core.rate_limit import rate_limit, write_slot
+from app.core.security import get_current_admin_user, get_current_stream_user
+from app.db.session import get_db, get_read_db
 from app.models.job import Job, JobStatus
-from app.models.user import User
-from app.schemas.job import JobRead
-from app.services.job_runner import simulate_job_run
+from app.schemas.job import (
+    JOB_LIST_RESPONSES,
+    JobBulkRequest,
+    JobBulkResult,
+    JobBulkSkipped,
+    JobRead,
+)
+from app.services.approval_policy import get_approval_policy, reload_approval_policy
+from app.services.change_versions import (
+    CACHE_CONTROL,
+    GLOBAL_SCOPE,
+    etag_matches,
+    job_list_etag,
+)
+from app.services.job_events import SSE_HEADERS, broker, event_stream
+from app.services.job_queue import enqueue_job, enqueue_jobs
+from app.services.job_serialization import (
+    EXPORT_MEDIA_TYPES,
+    JOB_FIELDS,
+    job_columns,
+    parse_fields,
+    render_jobs,
+    stream_jobs,
+)
+from app.services.lifecycle import (
+    InvalidTransition,
+    TransitionOutcome,
+    TransitionResult,
+    bulk_apply_transition,
+    transition,
+)
+from app.services.pagination import paginate_jobs
+from app.services.placement import (
+    allocate_gpus,
+    allocate_gpus_bulk,
+    release_gpus,
+    release_gpus_for_jobs,
+)
+from app.services.scheduler import priority_rank
 
 router = APIRouter(
     prefix="/admin/jobs",
     tags=["Admin Jobs"],
 )
 
+# endpoint های تغییر وضعیت: rate limit هر ادمین و صف عادلانه نوشتن‌ها
+ADMIN_WRITE_LIMITS = [
+    Depends(rate_limit("jobs.admin")),
+    Depends(write_slot, scope="function"),
+]
+
+
+def _parse_fields_or_raise(fields: Optional[str], **kwargs) -> Tuple[str, ...]:
+    """پارامتر fields لیست‌ها؛ فیلد ناشناخته = HTTPException 400."""
+    try:
+        return parse_fields(fields, **kwargs)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
 
-def _get_job_or_404(db: Session, job_id: int) -> Job:
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
+def _raise_for_result(result: TransitionResult) -> None:
+    """تبدیل نتیجه ناموفق compare-and-swap به خطای HTTP (404 / 400)."""
+    if result.outcome == TransitionOutcome.NOT_FOUND:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found",
         )
+    if result.outcome == TransitionOutcome.CONFLICT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(result.error()),
+        )
+
+
+def _transition_and_commit(
+    db: Session,
+    job_id: int,
+    action: str,
+    *,
+    release: bool = False,
+) -> JobRead:
+    """
+    یک تغییر وضعیت تکی با UPDATE شرطی و commit. خروجی قبل از commit
+    ساخته می‌شود تا برای پاسخ SELECT/refresh دوباره لازم نباشد.
+    """
+    result = transition(db, job_id, action)
+    _raise_for_result(result)
+    if release:
+        release_gpus(db, job_id)
+    job = JobRead.model_validate(result.job)
+    db.commit()
     return job
 
 
-@router.get("", response_model=List[JobRead])
+def _bulk_criteria(req: JobBulkRequest) -> list:
+    """شرط‌های WHERE برای انتخاب Job ها در درخواست دسته‌ای."""
+    if req.job_ids is not None:
+        return [Job.id.in_(req.job_ids)]
+    criteria = []
+    if req.filter.status is not None:
+        criteria.append(Job.status == req.filter.status)
+    if req.filter.user_id is not None:
+        criteria.append(Job.user_id == req.filter.user_id)
+    if req.filter.gpu_type is not None:
+        criteria.append(Job.gpu_type == req.filter.gpu_type)
+    return criteria
+
+
+def _bulk_result(
+    db: Session,
+    action: str,
+    req: JobBulkRequest,
+    succeeded: List[int],
+    reasons: Optional[Dict[int, str]] = None,
+) -> JobBulkResult:
+    """
+    ساخت پاسخ دسته‌ای. برای شناسه‌های صریح، دلیل رد شدن هر Job ای که
+    تغییر نکرد با یک SELECT پیدا می‌شود.
+    """
+    reasons = dict(reasons or {})
+    if req.job_ids is not None:
+        done = set(succeeded)
+        missing = [
+            job_id
+            for job_id in dict.fromkeys(req.job_ids)
+            if job_id not in done and job_id not in reasons
+        ]
+        statuses = {}
+        if missing:
+            statuses = dict(
+                db.query(Job.id, Job.status).filter(Job.id.in_(missing)).all()
+            )
+        for job_id in missing:
+            if job_id not in statuses:
+                reasons[job_id] = "Job not found"
+            else:
+                reasons[job_id] = str(InvalidTransition(job_id, action, statuses[job_id]))
+
+    return JobBulkResult(
+        action=action,
+        succeeded=sorted(succeeded),
+        skipped=[
+            JobBulkSkipped(id=job_id, reason=reason)
+            for job_id, reason in sorted(reasons.items())
+        ],
+    )
+
+
+def _bulk_simple_transition(db: Session, action: str, req: JobBulkRequest) -> JobBulkResult:
+    succeeded = bulk_apply_transition(db, action, *_bulk_criteria(req))
+    db.commit()
+    return _bulk_result(db, action, req, succeeded)
+
+
+@router.get("", response_model=None, responses=JOB_LIST_RESPONSES)
 def list_all_jobs(
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_admin_user),
     status_filter: Optional[JobStatus] = None,
+    limit: int = Query(
+        settings.JOB_LIST_DEFAULT_LIMIT, ge=1, le=settings.JOB_LIST_MAX_LIMIT
+    ),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
 ):
     """
-    لیست همه Jobها برای ادمین.
+    لیست همه Jobها برای ادمین، صفحه به صفحه (جدیدترین اول).
     امکان فیلتر روی status: ?status_filter=PENDING
+    صفحه بعد: ?cursor=<X-Next-Cursor>؛ تعداد کل (روی PostgreSQL تخمینی):
+    ?include_total=true
+    فیلدهای خروجی: ?fields=id,name,status (پیش‌فرض بدون ستون‌های Text سنگین
+    command، data_location و error_message)
+    با If-None-Match و بدون تغییر هیچ Job ای: 304 بدون خواندن جدول jobs
     """
-    query = db.query(Job)
+    selected = _parse_fields_or_raise(fields)
+    etag = job_list_etag(
+        db, GLOBAL_SCOPE, status_filter, limit, cursor, include_total, selected
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    query = db.query(*job_columns(selected))
 
     if status_filter is not None:
         query = query.filter(Job.status == status_filter)
 
-    jobs = query.order_by(Job.created_at.desc()).all()
-    return jobs
+    try:
+        page = paginate_jobs(
+            db, query, limit=limit, cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return Response(
+        content=render_jobs(page.items, selected),
+        media_type="application/json",
+        headers={**page.headers(), "ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+@router.get("/export")
+def export_all_jobs(
+    db: Session = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_admin_user),
+    status_filter: Optional[JobStatus] = None,
+    fmt: Literal["ndjson", "json"] = Query("ndjson", alias="format"),
+    fields: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    همه Job ها (جدیدترین اول) به صورت stream NDJSON یا آرایه JSON.
+    حافظه سرور به اندازه یک دسته (JOB_EXPORT_BATCH_SIZE) است.
+    fields مثل لیست است ولی پیش‌فرض آن همه فیلدهاست.
+    """
+    selected = _parse_fields_or_raise(fields, default=JOB_FIELDS)
+    criteria = []
+    if status_filter is not None:
+        criteria.append(Job.status == status_filter)
+    return StreamingResponse(
+        stream_jobs(
+            db.get_bind(), criteria, fmt=fmt,
+            batch_size=settings.JOB_EXPORT_BATCH_SIZE, fields=selected,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+    )
 
 
-@router.post("/{job_id}/approve", response_model=JobRead)
+@router.get("/events")
+async def stream_all_job_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_stream_user),
+) -> StreamingResponse:
+    """
+    push تغییرات همه Job ها به صورت Server-Sent Events (مثل
+    /jobs/events ولی بدون فیلتر کاربر).
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    await run_in_threadpool(db.close)
+    return StreamingResponse(
+        event_stream(broker.subscribe(), request.is_disconnected),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.get("/approval-policy")
+def get_auto_approval_policy(
+    current_admin: Principal = Depends(get_current_admin_user),
+) -> dict:
+    """
+    قوانین فعلی تایید خودکار (همان JSON فایل AUTO_APPROVAL_POLICY_FILE).
+
+    Example:
+        >>> # GET /api/v1/admin/jobs/approval-policy
+    """
+    policy = get_approval_policy()
+    return {
+        "file": settings.AUTO_APPROVAL_POLICY_FILE or None,
+        "rules": (policy.source or {}).get("rules", []),
+    }
+
+
+@router.post("/approval-policy/reload")
+def reload_auto_approval_policy(
+    current_admin: Principal = Depends(get_current_admin_user),
+) -> dict:
+    """
+    خواندن فوری فایل قوانین تایید خودکار بدون ری‌استارت.
+
+    Raises:
+        HTTPException 400: اگر فایل خوانده یا compile نشود؛ قوانین قبلی
+            فعال می‌مانند
+
+    Example:
+        >>> # POST /api/v1/admin/jobs/approval-policy/reload
+    """
+    try:
+        policy = reload_approval_policy()
+    except (OSError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid approval policy: {e}",
+        )
+    return {"rules": len(policy)}
+
+
+@router.post(
+    "/bulk/approve",
+    response_model=JobBulkResult,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
+def bulk_approve_jobs(
+    req: JobBulkRequest,
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin_user),
+) -> JobBulkResult:
+    """
+    تایید دسته‌ای Job ها با یک UPDATE.
+
+    Job ها یا با لیست شناسه (`job_ids`) یا با فیلتر (`filter`: status،
+    user_id، gpu_type) انتخاب می‌شوند. فقط Job های PENDING تغییر می‌کنند؛
+    بقیه شناسه‌ها همراه با دلیل در `skipped` برمی‌گردند.
+
+    Args:
+        req: شناسه‌ها یا فیلتر انتخاب Job ها
+        db: نشست دیتابیس (تزریق خودکار)
+        current_admin: ادمین احراز هویت شده (تزریق خودکار)
+
+    Returns:
+        JobBulkResult: شناسه‌های تاییدشده و Job های ردشده با دلیل
+
+    Raises:
+        HTTPException 422: اگر هر دو یا هیچ‌کدام از job_ids و filter داده نشوند
+
+    Example:
+        >>> # POST /api/v1/admin/jobs/bulk/approve
+        >>> {"filter": {"status": "PENDING", "gpu_type": "A100"}}
+    """
+    return _bulk_simple_transition(db, "approve", req)
+
+
+@router.post(
+    "/bulk/reject",
+    response_model=JobBulkResult,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
+def bulk_reject_jobs(
+    req: JobBulkRequest,
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin_user),
+) -> JobBulkResult:
+    """
+    رد دسته‌ای Job های PENDING با یک UPDATE.
+
+    Args:
+        req: شناسه‌ها یا فیلتر انتخاب Job ها
+        db: نشست دیتابیس (تزریق خودکار)
+        current_admin: ادمین احراز هویت شده (تزریق خودکار)
+
+    Returns:
+        JobBulkResult: شناسه‌های ردشده و Job های تغییرنکرده با دلیل
+
+    Example:
+        >>> # POST /api/v1/admin/jobs/bulk/reject
+        >>> {"job_ids": [12, 13, 14]}
+    """
+    return _bulk_simple_transition(db, "reject", req)
+
+
+@router.post(
+    "/bulk/start",
+    response_model=JobBulkResult,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
+def bulk_start_jobs(
+    req: JobBulkRequest,
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(get_current_admin_user),
+) -> JobBulkResult:
+    """
+    شروع دسته‌ای Job های APPROVED.
+
+    فرآیند:
+    1. Job های انتخاب‌شده به ترتیب priority و زمان ثبت جایگذاری می‌شوند
+       و GPU هایشان با UPDATE دسته‌ای رزرو می‌شود
+    2. وضعیت همه Job های جاشده با یک UPDATE به RUNNING تغییر می‌کند
+    3. همه با یک INSERT در صف اجرا قرار می‌گیرند و یک commit انجام می‌شود
+
+    Job هایی که GPU آزاد کافی ندارند با دلیل در `skipped` برمی‌گردند.
+
+    Args:
+        req: شناسه‌ها یا فیلتر انتخاب Job ها
+        db: نشست دیتابیس (تزریق خودکار)
+        current_admin: ادمین احراز هویت شده (تزریق خودکار)
+
+    Returns:
+        JobBulkResult: شناسه‌های شروع‌شده و Job های ردشده با دلیل
+
+    Example:
+        >>> # POST /api/v1/admin/jobs/bulk/start
+        >>> {"filter": {"gpu_type": "T4"}}
+    """
+    candidates = (
+        db.query(Job.id, Job.gpu_type, Job.num_gpus, Job.priority, Job.created_at)
+        .filter(*_bulk_criteria(req), Job.status == JobStatus.APPROVED)
+        .all()
+    )
+    candidates.sort(key=lambda job: (-priority_rank(job), job.created_at, job.id))
+
+    allocations = allocate_gpus_bulk(db, candidates)
+    started: List[int] = []
+    if allocations:
+        started = bulk_apply_transition(db, "start", Job.id.in_(list(allocations)))
+        # وضعیت Job بین SELECT و UPDATE عوض شده است؛ GPU هایش را پس بده
+        release_gpus_for_jobs(db, list(set(allocations) - set(started)))
+        enqueue_jobs(db, started)
+    db.commit()
+
+    reasons = {
+        job.id: f"Not enough free {job.gpu_type} GPUs (requested: {job.num_gpus})"
+        for job in candidates
+        if job.id not in allocations
+    }
+    return _bulk_result(db, "start", req, started, reasons)
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job_for_admin(
+    job_id: int,
+    db: Session = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_admin_user),
+):
+    """
+    جزئیات کامل یک Job (هر کاربری)، شامل ستون‌های سنگین که لیست‌ها به طور
+    پیش‌فرض نمی‌خوانند.
+    """
+    job = db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
+
+
+@router.post(
+    "/{job_id}/approve",
+    response_model=JobRead,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
 def approve_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user),
+    current_admin: Principal = Depends(get_current_admin_user),
 ) -> JobRead:
     """
     تایید Job توسط ادمین و تغییر وضعیت به APPROVED.
@@ -73,25 +479,18 @@ def approve_job(
     Example:
         >>> # POST /api/v1/admin/jobs/1/approve
     """
-    job = _get_job_or_404(db, job_id)
+    return _transition_and_commit(db, job_id, "approve")
 
-    if job.status != JobStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot approve a job in status {job.status}",
-        )
 
-    job.status = JobStatus.APPROVED
-    db.commit()
-    db.refresh(job)
-    return job
-
-
-@router.post("/{job_id}/reject", response_model=JobRead)
+@router.post(
+    "/{job_id}/reject",
+    response_model=JobRead,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
 def reject_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user),
+    current_admin: Principal = Depends(get_current_admin_user),
 ) -> JobRead:
     """
     رد کردن Job توسط ادمین و تغییر وضعیت به REJECTED.
@@ -114,42 +513,36 @@ def reject_job(
     Example:
         >>> # POST /api/v1/admin/jobs/1/reject
     """
-    job = _get_job_or_404(db, job_id)
-
-    if job.status != JobStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot reject a job in status {job.status}",
-        )
-
-    job.status = JobStatus.REJECTED
-    db.commit()
-    db.refresh(job)
-    return job
+    return _transition_and_commit(db, job_id, "reject")
 
 
-@router.post("/{job_id}/start", response_model=JobRead)
+@router.post(
+    "/{job_id}/start",
+    response_model=JobRead,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
 def start_job(
     job_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user),
+    current_admin: Principal = Depends(get_current_admin_user),
 ) -> JobRead:
     """
     شروع اجرای Job در حالت شبیه‌سازی.
     
     فقط Job های تایید شده (APPROVED) قابل اجرا هستند.
-    بعد از شروع، یک Background Task برای شبیه‌سازی اجرا ایجاد می‌شود.
+    قبل از شروع، موتور placement به تعداد num_gpus از نوع gpu_type
+    GPU آزاد روی یک node رزرو می‌کند. بعد از شروع، Job در صف پایدار اجرا
+    (جدول job_queue) قرار می‌گیرد و یکی از worker ها آن را اجرا می‌کند.
     
     فرآیند:
-    1. وضعیت به RUNNING تغییر می‌کند
-    2. زمان شروع ثبت می‌شود
-    3. یک task پس‌زمینه برای شبیه‌سازی اجرا می‌شود
-    4. پس از اتمام، وضعیت به COMPLETED یا FAILED تغییر می‌کند
+    1. GPU ها رزرو می‌شوند (در صورت نبود ظرفیت: 409)
+    2. وضعیت به RUNNING تغییر می‌کند و زمان شروع ثبت می‌شود
+    3. Job در همان تراکنش به صف اجرا اضافه می‌شود
+    4. worker پس از اتمام، وضعیت را به COMPLETED یا FAILED تغییر می‌دهد
+       و GPU ها را آزاد می‌کند
     
     Args:
         job_id: شناسه Job مورد نظر
-        background_tasks: مدیریت taskهای پس‌زمینه (تزریق خودکار)
         db: نشست دیتابیس (تزریق خودکار)
         current_admin: ادمین احراز هویت شده (تزریق خودکار)
         
@@ -159,88 +552,64 @@ def start_job(
     Raises:
         HTTPException 404: اگر Job یافت نشود
         HTTPException 400: اگر Job در وضعیت غیر از APPROVED باشد
+        HTTPException 409: اگر GPU آزاد کافی وجود نداشته باشد
         
     Example:
         >>> # POST /api/v1/admin/jobs/1/start
-        >>> # Job شروع به اجرا می‌کند در background
+        >>> # Job در صف اجرا قرار می‌گیرد
     """
-    from datetime import datetime
-
-    job = _get_job_or_404(db, job_id)
-
-    if job.status != JobStatus.APPROVED:
+    # اول Job با UPDATE شرطی گرفته می‌شود و بعد GPU؛ اگر ظرفیت نباشد
+    # rollback وضعیت را به APPROVED برمی‌گرداند
+    result = transition(db, job_id, "start")
+    _raise_for_result(result)
+    job = result.job
+
+    if allocate_gpus(db, job) is None:
+        detail = f"Not enough free {job.gpu_type} GPUs (requested: {job.num_gpus})"
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot start a job in status {job.status}",
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail,
         )
 
-    job.status = JobStatus.RUNNING
-    job.started_at = datetime.utcnow()
+    enqueue_job(db, job.id)
+    started = JobRead.model_validate(job)
     db.commit()
-    db.refresh(job)
-
-    background_tasks.add_task(
-        simulate_job_run,
-        job_id=job.id,
-        estimated_hours=job.estimated_hours,
-        num_gpus=job.num_gpus,
-    )
-
-    return job
+    return started
 
 
 
 
-@router.post("/{job_id}/complete", response_model=JobRead)
+@router.post(
+    "/{job_id}/complete",
+    response_model=JobRead,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
 def complete_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user),
+    current_admin: Principal = Depends(get_current_admin_user),
 ):
     """
     علامت زدن Job به عنوان COMPLETED.
     فقط اگر status = RUNNING باشد.
     """
-    from datetime import datetime
-
-    job = _get_job_or_404(db, job_id)
+    return _transition_and_commit(db, job_id, "complete", release=True)
 
-    if job.status != JobStatus.RUNNING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot complete a job in status {job.status}",
-        )
-
-    job.status = JobStatus.COMPLETED
-    job.finished_at = datetime.utcnow()
-    db.commit()
-    db.refresh(job)
-    return job
 
-
-@router.post("/{job_id}/fail", response_model=JobRead)
+@router.post(
+    "/{job_id}/fail",
+    response_model=JobRead,
+    dependencies=ADMIN_WRITE_LIMITS,
+)
 def fail_job(
     job_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(get_current_admin_user),
+    current_admin: Principal = Depends(get_current_admin_user),
 ):
     """
     علامت زدن Job به عنوان FAILED.
     فقط اگر status = RUNNING باشد.
     یک پیام اختیاری خطا می‌تونیم بعداً اضافه کنیم.
     """
-    from datetime import datetime
-
-    job = _get_job_or_404(db, job_id)
-
-    if job.status != JobStatus.RUNNING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot fail a job in status {job.status}",
-        )
-
-    job.status = JobStatus.FAILED
-    job.finished_at = datetime.utcnow()
-    db.commit()
-    db.refresh(job)
-    return job
+    return _transition_and_commit(db, job_id, "fail", release=True)
@@ -0,0 +1,62 @@
+# app/api/v1/routes_admin_stats.py
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.principal_cache import Principal
+from app.core.security import get_current_admin_user
+from app.db.session import get_read_db
+from app.models.job import JobStatus
+from app.schemas.stats import JobStatsResponse
+from app.services.job_stats import query_job_stats
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin Stats"],
+)
+
+
+@router.get("/stats", response_model=JobStatsResponse)
+def get_job_stats(
+    db: Session = Depends(get_read_db),
+    current_admin: Principal = Depends(get_current_admin_user),
+    group_by: List[Literal["day", "user_id", "gpu_type", "status"]] = Query(["status"]),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    user_id: Optional[int] = None,
+    gpu_type: Optional[str] = None,
+    status_filter: Optional[JobStatus] = None,
+) -> JobStatsResponse:
+    """
+    آمار تجمیعی Job ها: تعداد و GPU-hour درخواستی به تفکیک group_by.
+
+    از جدول job_stats_rollups خوانده می‌شود (نه jobs)؛ پس زمان پاسخ به
+    تعداد Job ها بستگی ندارد. روز، روز ثبت Job (UTC) است و since / until
+    هر دو شامل می‌شوند.
+
+    Example:
+        >>> # GPU-hour هر نوع GPU در این ماه
+        >>> # GET /api/v1/admin/stats?group_by=gpu_type&since=2026-10-01
+        >>> # تعداد Job ها در هر وضعیت
+        >>> # GET /api/v1/admin/stats?group_by=status
+    """
+    group_by = list(dict.fromkeys(group_by))
+    groups = query_job_stats(
+        db,
+        group_by,
+        since=since,
+        until=until,
+        user_id=user_id,
+        gpu_type=gpu_type,
+        status=status_filter,
+    )
+    return JobStatsResponse(
+        group_by=group_by,
+        since=since,
+        until=until,
+        groups=groups,
+        total_jobs=sum(g["job_count"] for g in groups),
+        total_gpu_hours=round(sum(g["gpu_hours"] for g in groups), 6),
+    )
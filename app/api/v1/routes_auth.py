@@ -1,22 +1,28 @@
 # app/api/v1/routes_auth.py
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Awaitable, List, Optional, TypeVar
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.api_keys import create_api_key, list_api_keys, revoke_api_key
+from app.core.password_hashing import PasswordHashingBusy
+from app.core.principal_cache import Principal
 from app.core.security import (
-    get_password_hash,
-    verify_password,
     create_access_token,
     get_current_active_user,
+    password_hasher,
 )
 from app.db.session import get_db
 from app.models.user import User
 from app.models.quota import UserQuota
+from app.schemas.api_key import ApiKeyCreate, ApiKeyCreated, ApiKeyRead
 from app.schemas.user import UserCreate, UserRead
 from app.schemas.auth import Token
+from app.services.quota import month_bounds
 
 router = APIRouter(
     prefix="/auth",
@@ -24,22 +30,33 @@ router = APIRouter(
 )
 
 
-@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(
-    user_in: UserCreate,
-    db: Session = Depends(get_db),
-):
-    existing_user = db.query(User).filter(User.email == user_in.email).first()
-    if existing_user:
+T = TypeVar("T")
+
+
+async def _hashing_or_429(work: Awaitable[T]) -> T:
+    """
+    bcrypt در process pool جدا اجرا می‌شود (app.core.password_hashing)؛
+    اگر صفش پر باشد 429 برمی‌گردد.
+    """
+    try:
+        return await work
+    except PasswordHashingBusy:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many password checks in progress, retry shortly",
+            headers={"Retry-After": "1"},
         )
 
+
+def _find_user(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _create_user(db: Session, user_in: UserCreate, hashed_password: str) -> User:
     db_user = User(
         email=user_in.email,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         is_active=True,
         is_admin=False,
     )
@@ -48,29 +65,65 @@ def register_user(
     db.commit()
     db.refresh(db_user)
 
+    period_start, period_end = month_bounds(datetime.utcnow())
     quota = UserQuota(
         user_id=db_user.id,
         monthly_quota_hours=10.0,
         used_hours_this_month=0.0,
+        period_start=period_start,
+        period_end=period_end,
     )
     db.add(quota)
     db.commit()
-
+    # پاسخ روی event loop ساخته می‌شود؛ بدون lazy load بعد از commit
+    db.refresh(db_user)
     return db_user
 
 
+def _save_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+# route های async: کار دیتابیس در threadpool و bcrypt در process pool، پس
+# thread ای در حین هش کردن بیکار نگه داشته نمی‌شود
+@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+async def register_user(
+    user_in: UserCreate,
+    db: Session = Depends(get_db),
+):
+    existing_user = await run_in_threadpool(_find_user, db, user_in.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+
+    hashed_password = await _hashing_or_429(password_hasher.hash(user_in.password))
+    return await run_in_threadpool(_create_user, db, user_in, hashed_password)
+
+
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(_find_user, db, form_data.username)
+    valid = False
+    if user is not None:
+        valid, new_hash = await _hashing_or_429(
+            password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
         )
 
+    # هش با BCRYPT_ROUNDS قدیمی ساخته شده؛ با هزینه جدید جایگزین می‌شود
+    if new_hash is not None:
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
+
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
@@ -87,6 +140,57 @@ def login(
 
 @router.get("/me", response_model=UserRead)
 def read_current_user(
-    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    # principal فقط فیلدهای دسترسی را دارد؛ پروفایل کامل از دیتابیس
+    user = db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+@router.post(
+    "/api-keys",
+    response_model=ApiKeyCreated,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_my_api_key(
+    key_in: ApiKeyCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
 ):
-    return current_user
+    """
+    کلید API برای client های ماشینی: در header X-API-Key یا
+    Authorization: Bearer به جای JWT. کلید کامل فقط در همین پاسخ می‌آید.
+    """
+    api_key, key = create_api_key(db, current_user.id, key_in.name)
+    db.commit()
+    db.refresh(api_key)
+    return ApiKeyCreated(**ApiKeyRead.model_validate(api_key).model_dump(), key=key)
+
+
+@router.get("/api-keys", response_model=List[ApiKeyRead])
+def list_my_api_keys(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    return list_api_keys(db, current_user.id)
+
+
+@router.delete("/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_my_api_key(
+    key_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    if revoke_api_key(db, current_user.id, key_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found",
+        )
+    db.commit()
@@ -1,9 +1,25 @@
 # app/api/v1/routes_health.py
 from fastapi import APIRouter
 
+from app.core.api_keys import api_key_table
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import write_limiter
+from app.core.security import password_hasher
+
 router = APIRouter(prefix="/health", tags=["Health"])
 
 
 @router.get("/ping")
 def ping():
     return {"status": "ok"}
+
+
+@router.get("/metrics")
+def metrics():
+    """شمارنده‌های داخلی همین process (مثلا hit rate cache احراز هویت)."""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "api_key_table": api_key_table.stats(),
+        "write_limiter": write_limiter.stats(),
+    }
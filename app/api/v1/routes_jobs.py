@@ -1,15 +1,55 @@
 # app/api/v1/routes_jobs.py
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_active_user
-from app.db.session import get_db
+from app.config import settings
+from app.core.logging import logger
+from app.core.principal_cache import Principal
+from app.core.rate_limit import rate_limit, write_slot
+from app.core.security import get_current_active_user, get_current_stream_user
+from app.db.session import get_db, get_read_db
 from app.models.job import Job, JobStatus
-from app.models.quota import UserQuota
-from app.models.user import User
-from app.schemas.job import JobCreate, JobRead
+from app.models.job_array import JobArray
+from app.schemas.job import (
+    JOB_LIST_RESPONSES,
+    JobBatchCreate,
+    JobBatchRead,
+    JobCreate,
+    JobRead,
+)
+from app.services.approval_policy import JobFacts, get_approval_policy
+from app.services.change_versions import (
+    CACHE_CONTROL,
+    etag_matches,
+    job_list_etag,
+    mark_jobs_changed,
+    user_scope,
+)
+from app.services.job_batches import create_job_array, create_jobs, get_array_job
+from app.services.lifecycle import apply_transition, bulk_apply_transition
+from app.services.job_events import (
+    SSE_HEADERS,
+    JobEvent,
+    broker,
+    event_stream,
+    publish_job_events,
+)
+from app.services.job_serialization import (
+    EXPORT_MEDIA_TYPES,
+    JOB_FIELDS,
+    job_columns,
+    parse_fields,
+    render_jobs,
+    stream_jobs,
+)
+from app.services.job_stats import track_job_stats
+from app.services.pagination import paginate_jobs
+from app.services.quota import InsufficientQuota, QuotaNotFound, reserve_quota_batch
 
 router = APIRouter(
     prefix="/jobs",
@@ -17,48 +57,57 @@ router = APIRouter(
 )
 
 
-def _check_user_quota_or_raise(
+def _reserve_quota_or_raise(
     *,
     db: Session,
     user_id: int,
-    requested_hours: float,
-) -> None:
+    jobs: List[Job],
+) -> float:
     """
-    بررسی کفایت سهمیه GPU کاربر قبل از ساخت Job.
-    
-    این تابع سهمیه ماهانه کاربر را چک می‌کند و در صورت کافی نبودن،
-    HTTPException رفع می‌کند.
-    
+    رزرو اتمی سهمیه GPU کاربر برای Job ها (app.services.quota)؛ با یک
+    UPDATE برای کل دسته، یا همه رزرو می‌شوند یا هیچ کدام.
+
     Args:
         db: نشست دیتابیس
         user_id: شناسه کاربر
-        requested_hours: ساعت درخواستی (estimated_hours × num_gpus)
-        
+        jobs: Job های flush شده؛ ساعت هر کدام estimated_hours × num_gpus
+
+    Returns:
+        سهمیه باقی‌مانده بعد از رزرو (ساعت)
+
     Raises:
         HTTPException 500: اگر سهمیه کاربر یافت نشود (خطای سیستمی)
         HTTPException 400: اگر سهمیه کافی نباشد
-        
-    Example:
-        >>> _check_user_quota_or_raise(db=db, user_id=1, requested_hours=6.0)
-        >>> # اگر سهمیه کافی نباشد: HTTPException 400
     """
-    quota = db.query(UserQuota).filter(UserQuota.user_id == user_id).first()
-    if not quota:
+    try:
+        return reserve_quota_batch(
+            db,
+            user_id,
+            [(job.id, job.estimated_hours * job.num_gpus) for job in jobs],
+        )
+    except QuotaNotFound:
         # نباید پیش بیاد؛ چون تو register براش quota ساختیم
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="User quota not found",
         )
+    except InsufficientQuota as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
-    available_hours = quota.monthly_quota_hours - quota.used_hours_this_month
-    if requested_hours > available_hours:
+
+def _parse_fields_or_raise(fields: Optional[str], **kwargs) -> Tuple[str, ...]:
+    """پارامتر fields لیست‌ها؛ فیلد ناشناخته = HTTPException 400."""
+    try:
+        return parse_fields(fields, **kwargs)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=(
-                f"Not enough GPU quota. "
-                f"Requested: {requested_hours}h, "
-                f"Available: {available_hours}h"
-            ),
+            detail=str(e),
         )
 
 
@@ -66,19 +115,28 @@ def _check_user_quota_or_raise(
     "",
     response_model=JobRead,
     status_code=status.HTTP_201_CREATED,
+    # rate limit هر کاربر و صف عادلانه نوشتن‌ها (app.core.rate_limit)
+    dependencies=[
+        Depends(rate_limit("jobs.create")),
+        Depends(write_slot, scope="function"),
+    ],
 )
 def create_job(
     job_in: JobCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> JobRead:
     """
     ایجاد Job جدید برای کاربر با بررسی سهمیه.
     
     این endpoint:
-    1. سهمیه کاربر را چک می‌کند (requested_hours = estimated_hours × num_gpus)
-    2. در صورت کافی بودن، Job را با status=PENDING ایجاد می‌کند
-    3. مقدار مصرف شده از سهمیه را افزایش می‌دهد
+    1. Job را با status=PENDING ایجاد می‌کند
+    2. requested_hours = estimated_hours × num_gpus را با یک UPDATE شرطی از
+       سهمیه کاربر رزرو می‌کند؛ اگر کافی نباشد هیچ چیز ذخیره نمی‌شود
+    3. اگر یکی از قوانین تایید خودکار (app.services.approval_policy) با
+       Job جور شود، Job مستقیما APPROVED می‌شود
+
+    بعد از reject، fail یا complete مصرف واقعی Job جای رزرو را می‌گیرد.
     
     Args:
         job_in: اطلاعات Job شامل نوع GPU، تعداد، ساعت تخمینی و دستور اجرا
@@ -102,19 +160,13 @@ def create_job(
         >>>   "command": "python train.py"
         >>> }
     """
-    requested_hours = job_in.estimated_hours * job_in.num_gpus
-    _check_user_quota_or_raise(
-        db=db,
-        user_id=current_user.id,
-        requested_hours=requested_hours,
-    )
-
     db_job = Job(
         user_id=current_user.id,
         name=job_in.name,
         gpu_type=job_in.gpu_type,
         num_gpus=job_in.num_gpus,
         estimated_hours=job_in.estimated_hours,
+        priority=job_in.priority,
         command=job_in.command,
         data_location=job_in.data_location,
         is_sensitive=job_in.is_sensitive,
@@ -122,58 +174,334 @@ def create_job(
     )
 
     db.add(db_job)
+    db.flush()
 
-    quota = db.query(UserQuota).filter(UserQuota.user_id == current_user.id).first()
-    if quota is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="User quota not found",
+    # رزرو آخرین کار قبل از commit است تا قفل ردیف سهمیه کوتاه بماند
+    headroom = _reserve_quota_or_raise(db=db, user_id=current_user.id, jobs=[db_job])
+
+    rule = get_approval_policy().evaluate(
+        JobFacts(
+            gpu_type=job_in.gpu_type,
+            num_gpus=job_in.num_gpus,
+            estimated_hours=job_in.estimated_hours,
+            is_sensitive=job_in.is_sensitive,
+            data_location=job_in.data_location,
+            quota_headroom_hours=headroom,
         )
+    )
+    if rule is not None:
+        apply_transition(db_job, "approve")
 
-    quota.used_hours_this_month += requested_hours
+    mark_jobs_changed(db, [current_user.id])
+    db.flush()
+    publish_job_events(db, [JobEvent.for_job(db_job, "create")])
+    track_job_stats(db, [db_job], old_status=None, new_status=db_job.status)
 
     db.commit()
     db.refresh(db_job)
 
+    if rule is not None:
+        logger.info(f"Job {db_job.id} auto-approved by rule '{rule}'")
     return db_job
 
 
 
-@router.get("", response_model=List[JobRead])
-def list_my_jobs(
+@router.post(
+    "/batch",
+    response_model=JobBatchRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[
+        Depends(rate_limit("jobs.create")),
+        Depends(write_slot, scope="function"),
+    ],
+)
+def create_job_batch(
+    batch_in: JobBatchCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
+) -> JobBatchRead:
+    """
+    ثبت چند Job در یک درخواست: لیست Job ها (jobs) یا یک Job آرایه‌ای (array).
+
+    کل دسته در یک تراکنش: یک INSERT چندردیفی، یک رزرو سهمیه برای جمع
+    ساعت‌ها (یا همه ثبت می‌شوند یا هیچ کدام) و یک commit. قوانین تایید
+    خودکار برای هر Job جدا بررسی می‌شوند و Job های جور با یک UPDATE
+    APPROVED می‌شوند.
+
+    Job آرایه‌ای: command قالب است و برای هر ترکیب parameters یک عضو با
+    array_index ساخته می‌شود (GET /jobs/arrays/{array_id}/{index}).
+
+    Raises:
+        HTTPException 400: اگر سهمیه برای کل دسته کافی نباشد
+        HTTPException 422: اگر هر دو یا هیچ کدام از jobs / array داده شود،
+            یا دسته از MAX_BATCH_JOBS بزرگ‌تر باشد
+
+    Example:
+        >>> # POST /api/v1/jobs/batch
+        >>> {
+        >>>   "array": {
+        >>>     "name": "sweep",
+        >>>     "gpu_type": "A100",
+        >>>     "estimated_hours": 0.5,
+        >>>     "command": "python train.py --lr {lr} --bs {bs}",
+        >>>     "parameters": {"lr": [0.1, 0.01], "bs": [32, 64]}
+        >>>   }
+        >>> }
+    """
+    array = None
+    if batch_in.array is not None:
+        array, jobs = create_job_array(db, current_user.id, batch_in.array)
+    else:
+        jobs = create_jobs(db, current_user.id, batch_in.jobs)
+
+    headroom = _reserve_quota_or_raise(db=db, user_id=current_user.id, jobs=jobs)
+
+    policy = get_approval_policy()
+    rules = {}
+    for job in jobs:
+        rule = policy.evaluate(
+            JobFacts(
+                gpu_type=job.gpu_type,
+                num_gpus=job.num_gpus,
+                estimated_hours=job.estimated_hours,
+                is_sensitive=job.is_sensitive,
+                data_location=job.data_location,
+                quota_headroom_hours=headroom,
+            )
+        )
+        if rule is not None:
+            rules[job.id] = rule
+
+    mark_jobs_changed(db, [current_user.id])
+    publish_job_events(db, [JobEvent.for_job(job, "create") for job in jobs])
+    track_job_stats(db, jobs, old_status=None, new_status=JobStatus.PENDING)
+    if rules:
+        approved = bulk_apply_transition(db, "approve", Job.id.in_(list(rules)))
+        # Job های همین دسته در session با وضعیت جدید به‌روز می‌شوند
+        db.execute(
+            select(Job)
+            .where(Job.id.in_(approved))
+            .execution_options(populate_existing=True)
+        ).all()
+
+    # خروجی قبل از commit: بدون بارگذاری دوباره تک‌تک Job ها
+    result = JobBatchRead(
+        array_id=array.id if array is not None else None,
+        jobs=[JobRead.model_validate(job) for job in jobs],
+    )
+    db.commit()
+
+    logger.info(
+        f"User {current_user.id} submitted {len(jobs)} jobs in one batch"
+        + (f" (array {array.id})" if array is not None else "")
+        + (f", {len(rules)} auto-approved" if rules else "")
+    )
+    return result
+
+
+@router.get("", response_model=None, responses=JOB_LIST_RESPONSES)
+def list_my_jobs(
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user),
     status_filter: Optional[JobStatus] = None,
-) -> List[JobRead]:
+    limit: int = Query(
+        settings.JOB_LIST_DEFAULT_LIMIT, ge=1, le=settings.JOB_LIST_MAX_LIMIT
+    ),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
     """
-    دریافت لیست Job های کاربر لاگین‌شده.
+    دریافت لیست Job های کاربر لاگین‌شده (صفحه‌بندی keyset).
     
     Args:
         db: نشست دیتابیس (تزریق خودکار)
         current_user: کاربر احراز هویت شده (تزریق خودکار)
         status_filter: فیلتر اختیاری برای وضعیت Job (مثلاً PENDING, RUNNING)
+        limit: حداکثر تعداد Job در این صفحه (حداکثر JOB_LIST_MAX_LIMIT)
+        cursor: مقدار header `X-Next-Cursor` پاسخ قبلی برای صفحه بعد
+        include_total: اگر true باشد، تعداد کل در `X-Total-Count` برمی‌گردد
+        fields: فیلدهای خروجی با کاما (مثلا `id,name,status`)؛ پیش‌فرض همه
+            فیلدها به جز ستون‌های Text سنگین (command، data_location،
+            error_message) که فقط با درخواست صریح خوانده می‌شوند
+        if_none_match: ETag پاسخ قبلی؛ اگر از آن زمان هیچ Job ای از کاربر
+            تغییر نکرده باشد، 304 بدون خواندن جدول jobs
         
     Returns:
-        لیست Job ها مرتب شده بر اساس تاریخ ایجاد (جدیدترین اول)
+        لیست Job ها مرتب شده بر اساس تاریخ ایجاد (جدیدترین اول)؛
+        اگر صفحه بعدی وجود داشته باشد، header `X-Next-Cursor` ست می‌شود.
+        ردیف‌ها بدون ساختن شیء ORM / JobRead مستقیما به JSON تبدیل می‌شوند
+        (app.services.job_serialization)
+        
+    Raises:
+        HTTPException 400: اگر cursor یا fields معتبر نباشد
         
     Example:
         >>> # GET /api/v1/jobs
-        >>> # GET /api/v1/jobs?status_filter=PENDING
+        >>> # GET /api/v1/jobs?status_filter=PENDING&limit=20
+        >>> # GET /api/v1/jobs?cursor=<X-Next-Cursor>
+        >>> # GET /api/v1/jobs?fields=id,name,status,command
     """
-    query = db.query(Job).filter(Job.user_id == current_user.id)
+    selected = _parse_fields_or_raise(fields)
+    etag = job_list_etag(
+        db, user_scope(current_user.id),
+        status_filter, limit, cursor, include_total, selected,
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    query = db.query(*job_columns(selected)).filter(Job.user_id == current_user.id)
 
     if status_filter is not None:
         query = query.filter(Job.status == status_filter)
 
-    jobs = query.order_by(Job.created_at.desc()).all()
-    return jobs
+    try:
+        page = paginate_jobs(
+            db, query, limit=limit, cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return Response(
+        content=render_jobs(page.items, selected),
+        media_type="application/json",
+        headers={**page.headers(), "ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+@router.get("/export")
+def export_my_jobs(
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    status_filter: Optional[JobStatus] = None,
+    fmt: Literal["ndjson", "json"] = Query("ndjson", alias="format"),
+    fields: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    همه Job های کاربر (جدیدترین اول) به صورت stream، بدون سقف صفحه.
+
+    format=ndjson: هر خط یک Job؛ format=json: یک آرایه JSON که تکه تکه
+    ارسال می‌شود. حافظه سرور به اندازه یک دسته (JOB_EXPORT_BATCH_SIZE) است.
+    fields مثل لیست است ولی پیش‌فرض آن همه فیلدهاست.
+
+    Example:
+        >>> # GET /api/v1/jobs/export?format=ndjson
+    """
+    selected = _parse_fields_or_raise(fields, default=JOB_FIELDS)
+    criteria = [Job.user_id == current_user.id]
+    if status_filter is not None:
+        criteria.append(Job.status == status_filter)
+    return StreamingResponse(
+        stream_jobs(
+            db.get_bind(), criteria, fmt=fmt,
+            batch_size=settings.JOB_EXPORT_BATCH_SIZE, fields=selected,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+    )
+
+
+@router.get("/events")
+async def stream_my_job_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_stream_user),
+) -> StreamingResponse:
+    """
+    push تغییرات Job های کاربر به صورت Server-Sent Events.
+
+    هر Job جدید یا تغییر وضعیت یک رویداد "job" است
+    (`{"job_id", "user_id", "action", "status", "updated_at"}`)؛ رویداد
+    "resync" یعنی لیست باید دوباره خوانده شود. چون EventSource نمی‌تواند
+    header بفرستد، توکن در `access_token` هم پذیرفته می‌شود.
+
+    Example:
+        >>> # GET /api/v1/jobs/events?access_token=<JWT>
+    """
+    user_id = current_user.id
+    # اتصال دیتابیس در تمام مدت stream نگه داشته نمی‌شود
+    await run_in_threadpool(db.close)
+    return StreamingResponse(
+        event_stream(broker.subscribe(user_id=user_id), request.is_disconnected),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+def _get_own_array_or_raise(db: Session, array_id: int, user_id: int) -> JobArray:
+    array = db.get(JobArray, array_id)
+    if array is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job array not found",
+        )
+    if array.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to view this job array",
+        )
+    return array
+
+
+@router.get("/arrays/{array_id}", response_model=List[JobRead])
+def list_job_array(
+    array_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> List[JobRead]:
+    """
+    عضوهای یک Job آرایه‌ای به ترتیب array_index.
+
+    Raises:
+        HTTPException 404: اگر Job آرایه‌ای یافت نشود
+        HTTPException 403: اگر متعلق به کاربر دیگری باشد
+    """
+    _get_own_array_or_raise(db, array_id, current_user.id)
+    return (
+        db.query(Job)
+        .filter(Job.array_id == array_id)
+        .order_by(Job.array_index)
+        .all()
+    )
+
+
+@router.get("/arrays/{array_id}/{index}", response_model=JobRead)
+def get_job_array_element(
+    array_id: int,
+    index: int,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> JobRead:
+    """
+    یک عضو Job آرایه‌ای با index آن (مثلا GET /api/v1/jobs/arrays/3/17).
+
+    Raises:
+        HTTPException 404: اگر عضوی با این index نباشد
+        HTTPException 403: اگر متعلق به کاربر دیگری باشد
+    """
+    job = get_array_job(db, array_id, index)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    if job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to view this job",
+        )
+    return job
 
 
 @router.get("/{job_id}", response_model=JobRead)
 def get_job_detail(
     job_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user),
+    if_none_match: Optional[str] = Header(None),
 ) -> JobRead:
     """
     دریافت جزئیات کامل یک Job مشخص.
@@ -193,9 +521,16 @@ def get_job_detail(
         HTTPException 404: اگر Job یافت نشود
         HTTPException 403: اگر Job متعلق به کاربر دیگری باشد
         
+    ETag از شمارنده تغییرات Job های کاربر و job_id ساخته می‌شود و فقط برای
+    Job خود کاربر صادر می‌شود؛ پس 304 بدون خواندن Job امن است.
+        
     Example:
         >>> # GET /api/v1/jobs/1
     """
+    etag = job_list_etag(db, user_scope(current_user.id), "job", job_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
         raise HTTPException(
@@ -209,4 +544,6 @@ def get_job_detail(
             detail="Not enough permissions to view this job",
         )
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return job
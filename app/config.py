@@ -19,6 +19,15 @@ class Settings:
     DB_PORT: str = os.getenv("DB_PORT", "5432")
     DB_NAME: str = os.getenv("DB_NAME", "gpu_service")
 
+    # replica های فقط-خواندنی (URL ها با کاما؛ خالی = همه چیز روی primary)
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # مدت خارج بودن replica خراب از چرخش
+    REPLICA_RETRY_SECONDS: float = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+    # بعد از هر نوشتن، خواندن‌های همان client تا این مدت از primary
+    READ_YOUR_WRITES_SECONDS: float = float(
+        os.getenv("READ_YOUR_WRITES_SECONDS", "5")
+    )
+
     @property
     def DATABASE_URL(self) -> str:
         return (
@@ -33,6 +42,96 @@ class Settings:
     )
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # هزینه bcrypt؛ با تغییرش هش کاربران در login بعدی دوباره ساخته می‌شود
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # process های bcrypt و حداکثر درخواست منتظر (بیشتر = 429)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+    # کلیدهای API: کلید HMAC (پیش‌فرض همان JWT_SECRET_KEY) و TTL جدول
+    # کلیدهای فعال؛ process های دیگر کلید باطل‌شده را حداکثر تا این مدت می‌پذیرند
+    API_KEY_HMAC_SECRET: str = os.getenv("API_KEY_HMAC_SECRET", JWT_SECRET_KEY)
+    API_KEY_CACHE_TTL_SECONDS: float = float(
+        os.getenv("API_KEY_CACHE_TTL_SECONDS", "30")
+    )
+
+    # rate limit درخواست‌های نوشتنی هر کاربر: name=COUNT/UNIT[:BURST] با کاما
+    RATE_LIMITS: str = os.getenv(
+        "RATE_LIMITS", "jobs.create=60/m:30,jobs.admin=600/m:200"
+    )
+    # local (حافظه هر process) یا database (جدول rate_limit_buckets، مشترک)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+    # حداکثر درخواست نوشتنی همزمان در هر process و صف عادلانه پشت آن
+    WRITE_CONCURRENCY_LIMIT: int = int(os.getenv("WRITE_CONCURRENCY_LIMIT", "16"))
+    WRITE_QUEUE_SIZE: int = int(os.getenv("WRITE_QUEUE_SIZE", "256"))
+    WRITE_QUEUE_PER_USER: int = int(os.getenv("WRITE_QUEUE_PER_USER", "8"))
+    WRITE_QUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("WRITE_QUEUE_TIMEOUT_SECONDS", "5")
+    )
+    # cache principal (id/is_active/is_admin) برای get_current_user؛
+    # process های دیگر تغییر کاربر را حداکثر با این تاخیر می‌بینند (0 = خاموش)
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30")
+    )
+
+    # Job queue / workers
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "10000"))
+    JOB_QUEUE_POLL_SECONDS: float = float(os.getenv("JOB_QUEUE_POLL_SECONDS", "1.0"))
+    JOB_QUEUE_LEASE_SECONDS: int = int(os.getenv("JOB_QUEUE_LEASE_SECONDS", "120"))
+    # هر worker هر چند ثانیه دوره‌های سهمیه تمام‌شده را به ماه جدید می‌برد
+    QUOTA_ROLLOVER_CHECK_SECONDS: float = float(
+        os.getenv("QUOTA_ROLLOVER_CHECK_SECONDS", "60")
+    )
+
+    # GPU inventory: TYPE:NODESxGPUS_PER_NODE:NVLINK_ISLAND_SIZE, comma separated
+    GPU_INVENTORY: str = os.getenv(
+        "GPU_INVENTORY",
+        "A100:4x8:8,V100:4x8:4,RTX4090:8x4:1,T4:8x4:1",
+    )
+    PLACEMENT_RESYNC_SECONDS: float = float(
+        os.getenv("PLACEMENT_RESYNC_SECONDS", "1.0")
+    )
+
+    # لیست Job ها (صفحه‌بندی keyset)
+    JOB_LIST_DEFAULT_LIMIT: int = int(os.getenv("JOB_LIST_DEFAULT_LIMIT", "50"))
+    JOB_LIST_MAX_LIMIT: int = int(os.getenv("JOB_LIST_MAX_LIMIT", "500"))
+    # اندازه هر دسته در خروجی stream شده (/jobs/export)
+    JOB_EXPORT_BATCH_SIZE: int = int(os.getenv("JOB_EXPORT_BATCH_SIZE", "1000"))
+
+    # push تغییرات Job ها (SSE): auto = روی PostgreSQL با LISTEN/NOTIFY بین
+    # process ها، local = فقط داخل همین process
+    JOB_EVENTS_BACKEND: str = os.getenv("JOB_EVENTS_BACKEND", "auto").lower()
+    JOB_EVENTS_QUEUE_SIZE: int = int(os.getenv("JOB_EVENTS_QUEUE_SIZE", "1000"))
+    JOB_EVENTS_HEARTBEAT_SECONDS: float = float(
+        os.getenv("JOB_EVENTS_HEARTBEAT_SECONDS", "15")
+    )
+
+    # Auto scheduler (fair share)
+    SCHEDULER_POLL_SECONDS: float = float(os.getenv("SCHEDULER_POLL_SECONDS", "2.0"))
+    # updated_at قبل از commit پر می‌شود: هر sync این پنجره قبل از watermark
+    # را دوباره می‌خواند تا Job هایی که دیر commit شده‌اند جا نمانند
+    SCHEDULER_SYNC_OVERLAP_SECONDS: float = float(
+        os.getenv("SCHEDULER_SYNC_OVERLAP_SECONDS", "60")
+    )
+    FAIR_SHARE_HALF_LIFE_HOURS: float = float(
+        os.getenv("FAIR_SHARE_HALF_LIFE_HOURS", "168")
+    )
+    SCHEDULER_BACKFILL: bool = os.getenv("SCHEDULER_BACKFILL", "true").lower() == "true"
+
+    # Preemption: کلاس‌های priority بالاتر کلاس‌های پایین‌تر را متوقف می‌کنند
+    SCHEDULER_PREEMPTION: bool = (
+        os.getenv("SCHEDULER_PREEMPTION", "true").lower() == "true"
+    )
+    PREEMPTION_CHECKPOINT_MINUTES: float = float(
+        os.getenv("PREEMPTION_CHECKPOINT_MINUTES", "5")
+    )
+
+    # Auto approval: فایل JSON قوانین (خالی = غیرفعال)
+    AUTO_APPROVAL_POLICY_FILE: str = os.getenv("AUTO_APPROVAL_POLICY_FILE", "")
+    AUTO_APPROVAL_RELOAD_SECONDS: float = float(
+        os.getenv("AUTO_APPROVAL_RELOAD_SECONDS", "5")
+    )
 
 
 settings = Settings()
@@ -0,0 +1,206 @@
+# app/core/api_keys.py
+"""
+کلیدهای API برای client های ماشینی (CI، notebook).
+
+شکل کلید: gpk_<prefix>_<secret>. در دیتابیس فقط prefix (ایندکس یکتا) و
+HMAC-SHA256 کل کلید با API_KEY_HMAC_SECRET ذخیره می‌شود؛ بررسی کلید یعنی
+پیدا کردن ردیف با prefix و مقایسه HMAC در زمان ثابت (hmac.compare_digest)،
+بدون bcrypt.
+
+ردیف‌های فعال در ApiKeyTable (داخل process، با TTL) نگه داشته می‌شوند تا
+درخواست‌های بعدی با همان کلید به دیتابیس نروند:
+- باطل کردن یا حذف کلید از طریق ORM بعد از commit آن prefix را از جدول
+  همین process خارج می‌کند
+- process های دیگر کلید باطل‌شده را حداکثر تا API_KEY_CACHE_TTL_SECONDS
+  می‌پذیرند
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.models.api_key import ApiKey
+
+API_KEY_PREFIX = "gpk_"
+_PENDING_KEY = "api_key_invalidations"
+
+
+def generate_api_key() -> Tuple[str, str]:
+    """(کلید کامل، prefix)؛ کلید کامل فقط یک بار به کاربر نشان داده می‌شود."""
+    prefix = secrets.token_hex(6)
+    return f"{API_KEY_PREFIX}{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+
+def is_api_key(token: str) -> bool:
+    return token.startswith(API_KEY_PREFIX)
+
+
+def parse_api_key(key: str) -> Optional[str]:
+    """prefix کلید؛ None اگر شکل کلید درست نباشد."""
+    if not is_api_key(key):
+        return None
+    prefix, sep, secret = key[len(API_KEY_PREFIX):].partition("_")
+    if not sep or not secret or len(prefix) != 12:
+        return None
+    return prefix
+
+
+def hash_api_key(key: str) -> str:
+    secret = settings.API_KEY_HMAC_SECRET.encode()
+    return hmac.new(secret, key.encode(), hashlib.sha256).hexdigest()
+
+
+@dataclass(frozen=True)
+class ApiKeyEntry:
+    key_id: int
+    user_id: int
+    key_hash: str
+
+
+class ApiKeyTable:
+    """prefix -> ردیف فعال کلید، با TTL؛ فقط prefix های معتبر نگه داشته می‌شوند."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = (
+            settings.API_KEY_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, ApiKeyEntry]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, db: Session, prefix: str) -> Optional[ApiKeyEntry]:
+        with self._lock:
+            cached = self._entries.get(prefix)
+            if cached is not None and cached[0] > self._clock():
+                self.hits += 1
+                return cached[1]
+            self._entries.pop(prefix, None)
+            self.misses += 1
+            generation = self._generation
+
+        row = db.execute(
+            select(ApiKey.id, ApiKey.user_id, ApiKey.key_hash).where(
+                ApiKey.prefix == prefix,
+                ApiKey.revoked_at.is_(None),
+            )
+        ).first()
+        if row is None:
+            return None
+        entry = ApiKeyEntry(key_id=row.id, user_id=row.user_id, key_hash=row.key_hash)
+        with self._lock:
+            # در حین خواندن کلیدی باطل شده: ردیف خوانده‌شده ممکن است قدیمی باشد
+            if self.ttl_seconds > 0 and generation == self._generation:
+                self._entries[prefix] = (self._clock() + self.ttl_seconds, entry)
+        return entry
+
+    def invalidate(self, prefix: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(prefix, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+api_key_table = ApiKeyTable()
+
+
+def authenticate_api_key(db: Session, key: str) -> Optional[int]:
+    """شناسه صاحب کلید؛ None اگر کلید ناشناخته، باطل یا نادرست باشد."""
+    prefix = parse_api_key(key)
+    if prefix is None:
+        return None
+    entry = api_key_table.lookup(db, prefix)
+    if entry is None:
+        return None
+    if not hmac.compare_digest(hash_api_key(key), entry.key_hash):
+        return None
+    return entry.user_id
+
+
+def create_api_key(db: Session, user_id: int, name: str) -> Tuple[ApiKey, str]:
+    """ساخت کلید (بدون commit)؛ کلید کامل فقط همین‌جا برگردانده می‌شود."""
+    key, prefix = generate_api_key()
+    api_key = ApiKey(
+        user_id=user_id,
+        name=name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+    )
+    db.add(api_key)
+    return api_key, key
+
+
+def list_api_keys(db: Session, user_id: int) -> List[ApiKey]:
+    return (
+        db.query(ApiKey)
+        .filter(ApiKey.user_id == user_id)
+        .order_by(ApiKey.created_at.desc(), ApiKey.id.desc())
+        .all()
+    )
+
+
+def revoke_api_key(db: Session, user_id: int, key_id: int) -> Optional[ApiKey]:
+    """
+    باطل کردن کلید کاربر (بدون commit؛ تکرارش بی‌اثر است).
+
+    Returns:
+        None اگر کلید نباشد یا مال کاربر دیگری باشد
+    """
+    api_key = (
+        db.query(ApiKey)
+        .filter(ApiKey.id == key_id, ApiKey.user_id == user_id)
+        .first()
+    )
+    if api_key is not None and api_key.revoked_at is None:
+        api_key.revoked_at = datetime.utcnow()
+    return api_key
+
+
+@event.listens_for(ApiKey, "after_update")
+@event.listens_for(ApiKey, "after_delete")
+def _remember_changed_key(mapper, connection, target: ApiKey) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.prefix)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_keys(session: Session) -> None:
+    for prefix in session.info.pop(_PENDING_KEY, ()):
+        api_key_table.invalidate(prefix)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_keys(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,36 @@
+# app/core/clock.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+
+class Clock:
+    """منبع زمان. کد سرویس‌ها به جای datetime.utcnow از این استفاده می‌کند."""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+
+class VirtualClock(Clock):
+    """
+    ساعت مجازی برای شبیه‌سازی و تست: فقط وقتی جلو می‌رود که صریحا
+    advance شود.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float) -> datetime:
+        self._now += timedelta(seconds=seconds)
+        return self._now
+
+    def advance_to(self, moment: datetime) -> datetime:
+        if moment > self._now:
+            self._now = moment
+        return self._now
+
+
+system_clock = Clock()
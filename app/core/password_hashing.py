@@ -0,0 +1,134 @@
+# app/core/password_hashing.py
+"""
+هش و بررسی رمز عبور (bcrypt) در یک process pool جدا.
+
+bcrypt با cost پیش‌فرض حدود 250ms CPU می‌گیرد. اگر login و register آن را
+در threadpool خود FastAPI اجرا کنند، یک موج login همه thread ها را
+می‌گیرد و endpoint های Job ها منتظر می‌مانند. اینجا:
+- کار bcrypt در PASSWORD_HASH_WORKERS process جدا انجام می‌شود و route ها
+  فقط await می‌کنند
+- حداکثر PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE درخواست همزمان
+  پذیرفته می‌شود؛ بیشتر از آن PasswordHashingBusy (API: 429 با Retry-After)
+- اگر cost هش ذخیره‌شده با BCRYPT_ROUNDS فرق کند، موقع login موفق هش جدید
+  برگردانده می‌شود تا ذخیره شود
+
+این ماژول جز passlib چیزی import نمی‌کند تا process های pool سبک بالا بیایند.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> CryptContext:
+    # min/max برابر rounds: هش با cost دیگر (بیشتر یا کمتر) needs_update است
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def verify_and_update(
+    password: str, hashed_password: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    """(درست بودن رمز، هش جدید اگر cost هش قبلی با rounds فرق کند)"""
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHashingBusy(Exception):
+    """صف هش رمز پر است؛ client باید کمی بعد دوباره تلاش کند."""
+
+
+class PasswordHasher:
+    """
+    اجرای bcrypt در process pool با صف محدود.
+
+    workers=0 یعنی بدون process جدا (یک thread اختصاصی)؛ برای محیط‌هایی که
+    ساختن process ممکن نیست.
+    """
+
+    def __init__(self, workers: int, queue_size: int, rounds: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self.capacity = max(workers, 1) + queue_size
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._executor: Optional[Executor] = None
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers <= 0:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="password-hash"
+                    )
+                else:
+                    # spawn: fork کردن process ای که thread دارد امن نیست
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+            return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "rejected": self.rejected,
+                "rounds": self.rounds,
+            }
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # ظرفیت وقتی آزاد می‌شود که کار واقعا تمام شده باشد، حتی اگر client
+        # قطع شده و await لغو شده باشد
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, password, hashed_password, self.rounds)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
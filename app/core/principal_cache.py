@@ -0,0 +1,155 @@
+# app/core/principal_cache.py
+"""
+cache داخل process برای principal درخواست‌ها (id، is_active، is_admin).
+
+get_current_user به جای خواندن ردیف users در هر درخواست، principal را از
+این cache (LRU با TTL) برمی‌دارد:
+- تغییر یا حذف یک User از طریق ORM بعد از commit همان session، آن کاربر
+  را از cache این process خارج می‌کند (invalidate_principal برای تغییرهای
+  بیرون از ORM)
+- process های دیگر و تغییر مستقیم در دیتابیس حداکثر تا
+  PRINCIPAL_CACHE_TTL_SECONDS مقدار قبلی را می‌بینند
+- PRINCIPAL_CACHE_TTL_SECONDS=0 یعنی cache خاموش است
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.models.user import User
+
+_PENDING_KEY = "principal_invalidations"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """کاربر احراز هویت‌شده؛ همان فیلدهایی که route ها برای دسترسی لازم دارند."""
+
+    id: int
+    is_active: bool
+    is_admin: bool
+
+
+class PrincipalCache:
+    """LRU با TTL و امن برای thread ها؛ آمار hit/miss برای /health/metrics."""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = settings.PRINCIPAL_CACHE_SIZE if maxsize is None else maxsize
+        self.ttl_seconds = (
+            settings.PRINCIPAL_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        # با هر invalidate زیاد می‌شود؛ put با generation قدیمی نادیده گرفته می‌شود
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, principal: Principal, generation: Optional[int] = None) -> None:
+        """
+        ذخیره principal خوانده‌شده از دیتابیس.
+
+        generation مقدار `generation` قبل از خواندن است: اگر در این فاصله
+        کاربری invalidate شده باشد، ممکن است مقدار خوانده‌شده قدیمی باشد و
+        ذخیره نمی‌شود.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[principal.id] = (self._clock() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(user_id: int) -> None:
+    """برای تغییرهایی که از ORM رد نمی‌شوند (UPDATE مستقیم، اسکریپت‌ها)."""
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(mapper, connection, target: User) -> None:
+    # invalidate بعد از commit: اگر زودتر باشد، درخواست همزمان ردیف قبلی را
+    # از دیتابیس می‌خواند و دوباره cache می‌کند
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
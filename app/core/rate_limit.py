@@ -0,0 +1,352 @@
+# app/core/rate_limit.py
+"""
+کنترل پذیرش درخواست‌های نوشتنی: rate limit هر کاربر و یک محدودیت همزمانی
+سراسری با صف عادلانه.
+
+- rate limit: token bucket برای هر (endpoint، کاربر) با نرخ و ظرفیت
+  RATE_LIMITS (مثلا "jobs.create=60/m:30" یعنی 60 درخواست در دقیقه با
+  burst تا 30). درخواست اضافه 429 با Retry-After (ثانیه تا آزاد شدن یک
+  token) می‌گیرد.
+  - RATE_LIMIT_BACKEND=local: bucket ها در حافظه همین process
+  - RATE_LIMIT_BACKEND=database: bucket ها در جدول rate_limit_buckets و
+    مشترک بین همه process ها؛ هر بررسی یک upsert اتمی در تراکنش جدا است
+- همزمانی: حداکثر WRITE_CONCURRENCY_LIMIT درخواست نوشتنی همزمان در هر
+  process. بقیه در صف منتظر می‌مانند و هر بار که جایی خالی شود نوبت به
+  کاربر بعدی (round-robin) می‌رسد، نه به درخواست بعدی؛ پس کاربری که صد
+  درخواست در صف دارد جلوی کاربری با یک درخواست را نمی‌گیرد. هر کاربر حداکثر
+  WRITE_QUEUE_PER_USER درخواست منتظر دارد (بیشتر = 429) و کل صف
+  WRITE_QUEUE_SIZE (بیشتر یا انتظار بیش از WRITE_QUEUE_TIMEOUT_SECONDS = 503).
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, Hashable, Optional, Union
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import case, literal
+from sqlalchemy.engine import Engine
+
+import app.db.session as db_session
+from app.config import settings
+from app.core.principal_cache import Principal
+from app.core.security import get_current_active_user
+from app.models.rate_limit import RateLimitBucket
+
+_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0}
+_SPEC = re.compile(r"^(\d+(?:\.\d+)?)/([smh])(?::(\d+))?$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    # token در ثانیه
+    rate: float
+    burst: int
+
+
+def parse_rate_limits(spec: str) -> Dict[str, RateLimit]:
+    """
+    "name=COUNT/UNIT[:BURST],..." (UNIT یکی از s، m، h؛ BURST پیش‌فرض COUNT).
+
+    Raises:
+        ValueError: اگر قسمتی از spec درست نباشد
+    """
+    limits = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, value = part.partition("=")
+        match = _SPEC.match(value.strip())
+        if not sep or not name.strip() or match is None:
+            raise ValueError(f"Invalid rate limit: {part!r}")
+        count, unit, burst = match.groups()
+        limits[name.strip()] = RateLimit(
+            rate=float(count) / _UNITS[unit],
+            burst=int(burst) if burst else max(1, int(float(count))),
+        )
+    return limits
+
+
+def _refill(tokens: float, elapsed: float, limit: RateLimit) -> float:
+    return min(float(limit.burst), tokens + max(elapsed, 0.0) * limit.rate)
+
+
+def _retry_after(tokens: float, limit: RateLimit) -> float:
+    return (1.0 - tokens) / limit.rate
+
+
+class LocalRateLimiter:
+    """
+    token bucket ها در حافظه همین process؛ اگر تعداد bucket ها از
+    max_buckets بگذرد، bucket هایی که دیرتر از همه استفاده شده‌اند دور
+    ریخته می‌شوند.
+    """
+
+    def __init__(
+        self,
+        max_buckets: int = 100_000,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_buckets = max_buckets
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> [tokens, updated]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def acquire(self, key: str, limit: RateLimit) -> float:
+        """0 اگر پذیرفته شد؛ وگرنه ثانیه‌های لازم تا token بعدی."""
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(limit.burst), now]
+                # bucket پر با bucket نبوده یکی است؛ قدیمی‌ترین‌ها دور ریخته می‌شوند
+                while len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            tokens = _refill(bucket[0], now - bucket[1], limit)
+            bucket[1] = now
+            if tokens >= 1.0:
+                bucket[0] = tokens - 1.0
+                return 0.0
+            bucket[0] = tokens
+            return _retry_after(tokens, limit)
+
+
+class DatabaseRateLimiter:
+    """
+    token bucket ها در جدول rate_limit_buckets (PostgreSQL یا SQLite).
+
+    هر بررسی یک INSERT ... ON CONFLICT DO UPDATE ... RETURNING است که
+    پر کردن bucket و برداشتن token را اتمی انجام می‌دهد؛ قفل ردیف فقط
+    در طول همین یک دستور نگه داشته می‌شود.
+    """
+
+    def __init__(self, engine: Engine, *, clock: Callable[[], float] = time.time):
+        self.engine = engine
+        self._clock = clock
+
+    def acquire(self, key: str, limit: RateLimit) -> float:
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        now = self._clock()
+        table = RateLimitBucket.__table__
+        elapsed = case(
+            (literal(now) > table.c.updated_at, literal(now) - table.c.updated_at),
+            else_=0.0,
+        )
+        refilled = table.c.tokens + elapsed * limit.rate
+        refilled = case((refilled > limit.burst, float(limit.burst)), else_=refilled)
+        allowed = refilled >= 1.0
+
+        stmt = insert(table).values(
+            key=key, tokens=float(limit.burst) - 1.0, updated_at=now, allowed=True
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "tokens": case((allowed, refilled - 1.0), else_=refilled),
+                "updated_at": now,
+                "allowed": allowed,
+            },
+        ).returning(table.c.tokens, table.c.allowed)
+
+        with self.engine.begin() as connection:
+            tokens, was_allowed = connection.execute(stmt).one()
+        if was_allowed:
+            return 0.0
+        return _retry_after(tokens, limit)
+
+
+class QueueFull(Exception):
+    def __init__(self, per_user: bool):
+        super().__init__("per-user queue full" if per_user else "queue full")
+        self.per_user = per_user
+
+
+class FairLimiter:
+    """
+    محدودیت همزمانی با صف round-robin بین کاربران (روی event loop برنامه).
+
+    acquire/release فقط از coroutine های همان event loop صدا زده می‌شوند؛
+    پس state بدون قفل امن است.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        *,
+        max_waiting: int,
+        max_waiting_per_user: int,
+        timeout: float,
+    ):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.max_waiting_per_user = max_waiting_per_user
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        # کاربر -> صف انتظار؛ ترتیب کاربران همان نوبت round-robin است
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self.rejected = 0
+
+    async def acquire(self, owner: Hashable) -> None:
+        if self.active < self.limit and not self._queues:
+            self.active += 1
+            return
+
+        queue = self._queues.get(owner)
+        if (len(queue) if queue else 0) >= self.max_waiting_per_user:
+            self.rejected += 1
+            raise QueueFull(per_user=True)
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise QueueFull(per_user=False)
+
+        future = asyncio.get_running_loop().create_future()
+        if queue is None:
+            queue = self._queues[owner] = deque()
+        queue.append(future)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # نوبت همزمان با timeout رسید
+                return
+            self._abandon(owner, future)
+            self.rejected += 1
+            raise QueueFull(per_user=False)
+        except BaseException:
+            # درخواست لغو شد (مثلا client قطع شد)
+            self._abandon(owner, future)
+            raise
+
+    def _abandon(self, owner: Hashable, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # جا گرفته شده ولی استفاده نمی‌شود؛ به نفر بعدی داده می‌شود
+            self.release()
+        else:
+            future.cancel()
+            self._forget(owner, future)
+
+    def _forget(self, owner: Hashable, future: asyncio.Future) -> None:
+        queue = self._queues.get(owner)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+            self.waiting -= 1
+        except ValueError:
+            return
+        if not queue:
+            del self._queues[owner]
+
+    def release(self) -> None:
+        """جای آزادشده مستقیما به اولین کاربر در نوبت داده می‌شود."""
+        while self._queues:
+            owner, queue = self._queues.popitem(last=False)
+            future = queue.popleft()
+            self.waiting -= 1
+            if queue:
+                # کاربر به آخر نوبت می‌رود
+                self._queues[owner] = queue
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "waiting_users": len(self._queues),
+            "rejected": self.rejected,
+        }
+
+
+rate_limits = parse_rate_limits(settings.RATE_LIMITS)
+_rate_limiter: Optional[Union[LocalRateLimiter, DatabaseRateLimiter]] = None
+
+write_limiter = FairLimiter(
+    settings.WRITE_CONCURRENCY_LIMIT,
+    max_waiting=settings.WRITE_QUEUE_SIZE,
+    max_waiting_per_user=settings.WRITE_QUEUE_PER_USER,
+    timeout=settings.WRITE_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+def get_rate_limiter() -> Union[LocalRateLimiter, DatabaseRateLimiter]:
+    global _rate_limiter
+    if _rate_limiter is None:
+        if settings.RATE_LIMIT_BACKEND == "database":
+            _rate_limiter = DatabaseRateLimiter(db_session.engine)
+        else:
+            _rate_limiter = LocalRateLimiter()
+    return _rate_limiter
+
+
+def _retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+def rate_limit(name: str):
+    """
+    dependency: یک token از bucket (name، کاربر فعلی)؛ اگر برای name در
+    RATE_LIMITS محدودیتی نباشد کاری نمی‌کند.
+    """
+
+    def check_rate_limit(
+        current_user: Principal = Depends(get_current_active_user),
+    ) -> None:
+        limit = rate_limits.get(name)
+        if limit is None:
+            return
+        retry_after = get_rate_limiter().acquire(f"{name}:{current_user.id}", limit)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded for {name}",
+                headers=_retry_after_header(retry_after),
+            )
+
+    return check_rate_limit
+
+
+async def write_slot(
+    current_user: Principal = Depends(get_current_active_user),
+) -> AsyncIterator[None]:
+    """
+    dependency: یک جا از write_limiter در طول اجرای route (با
+    Depends(write_slot, scope="function") تا جا قبل از ارسال پاسخ آزاد شود).
+    """
+    try:
+        await write_limiter.acquire(current_user.id)
+    except QueueFull as exc:
+        if exc.per_user:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent write requests",
+                headers=_retry_after_header(1),
+            )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, retry shortly",
+            headers=_retry_after_header(1),
+        )
+    try:
+        yield
+    finally:
+        write_limiter.release()
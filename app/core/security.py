@@ -3,12 +3,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 import jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.api_keys import authenticate_api_key, is_api_key
+from app.core.password_hashing import PasswordHasher, crypt_context
+from app.core.principal_cache import Principal, principal_cache
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.auth import TokenPayload
@@ -17,11 +19,25 @@ from app.schemas.auth import TokenPayload
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/login"
 )
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_PREFIX}/auth/login",
+    auto_error=False,
+)
+# کلید API (app.core.api_keys) در این header یا به جای JWT در Authorization: Bearer
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+pwd_context = crypt_context(settings.BCRYPT_ROUNDS)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# route ها (login/register) bcrypt را در این pool اجرا می‌کنند
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """نسخه همگام (اسکریپت‌ها)؛ route ها از password_hasher استفاده می‌کنند."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -50,14 +66,58 @@ def create_access_token(
 
 def get_current_user(
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-) -> User:
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    api_key: Optional[str] = Depends(api_key_header),
+) -> Principal:
+    return _user_from_token(db, api_key or token)
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """principal از cache؛ در صورت نبودن فقط سه ستون لازم از دیتابیس خوانده می‌شود."""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    generation = principal_cache.generation
+    row = (
+        db.query(User.id, User.is_active, User.is_admin)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    principal = Principal(id=row.id, is_active=row.is_active, is_admin=row.is_admin)
+    principal_cache.put(principal, generation)
+    return principal
+
+
+def _user_from_token(db: Session, token: Optional[str]) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    if not token:
+        raise credentials_exception
+
+    if is_api_key(token):
+        user_id = authenticate_api_key(db, token)
+        if user_id is None:
+            raise credentials_exception
+    else:
+        user_id = _user_id_from_jwt(token)
+        if user_id is None:
+            raise credentials_exception
+
+    principal = load_principal(db, user_id)
+    if principal is None:
+        raise credentials_exception
+
+    return principal
+
+
+def _user_id_from_jwt(token: str) -> Optional[int]:
     try:
         payload = jwt.decode(
             token,
@@ -66,26 +126,20 @@ def get_current_user(
         )
         token_data = TokenPayload(**payload)
     except Exception:
-        raise credentials_exception
+        return None
 
     if token_data.sub is None:
-        raise credentials_exception
+        return None
 
     try:
-        user_id = int(token_data.sub)
+        return int(token_data.sub)
     except ValueError:
-        raise credentials_exception
-
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-
-    return user
+        return None
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -94,9 +148,23 @@ def get_current_active_user(
     return current_user
 
 
+def get_current_stream_user(
+    db: Session = Depends(get_db),
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None),
+) -> Principal:
+    """
+    کاربر فعال برای endpoint های SSE.
+
+    EventSource مرورگر نمی‌تواند header بفرستد، پس توکن از query string
+    (access_token) هم پذیرفته می‌شود.
+    """
+    return get_current_active_user(_user_from_token(db, header_token or access_token))
+
+
 def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
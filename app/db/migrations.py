@@ -0,0 +1,39 @@
+# app/db/migrations.py
+"""
+اجرای migration های Alembic (پوشه migrations/) از داخل برنامه.
+
+دیتابیس‌هایی که قبل از migration ها با create_all ساخته شده‌اند جدول
+alembic_version ندارند؛ این‌ها اول روی revision پایه stamp می‌شوند و بعد
+migration های بعدی رویشان اجرا می‌شود.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.core.logging import logger
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+BASELINE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+def upgrade_db(engine: Engine, revision: str = "head") -> None:
+    """بردن اسکیمای دیتابیس به revision (پیش‌فرض: آخرین)."""
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "jobs" in tables and "alembic_version" not in tables:
+            logger.info(f"Stamping pre-migration database at {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
@@ -1,10 +1,32 @@
 # app/db/session.py
-from typing import Generator
+"""
+Engine و session های دیتابیس.
 
-from sqlalchemy import create_engine
+نوشتن‌ها همیشه روی primary (`get_db`) انجام می‌شوند. endpoint هایی که فقط
+می‌خوانند `get_read_db` می‌گیرند که اگر replica تعریف شده باشد
+(DATABASE_REPLICA_URLS) به یکی از replica های سالم (به نوبت) وصل می‌شود:
+- replica ای که وصل نشود یا اتصالش قطع شود برای REPLICA_RETRY_SECONDS از
+  چرخش خارج می‌شود و درخواست روی replica بعدی یا primary می‌رود
+- read-your-writes: درخواستی که روی primary commit کرده، کوکی
+  READ_PRIMARY_COOKIE می‌گیرد و خواندن‌های همان client تا
+  READ_YOUR_WRITES_SECONDS روی primary انجام می‌شوند (تاخیر replication
+  تغییر تازه را پنهان نمی‌کند)
+"""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Generator, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
 
 from app.config import settings
+from app.core.logging import logger
 
 
 class Base(DeclarativeBase):
@@ -24,6 +46,134 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# session های خواندنی روی replica (bind موقع ساخت داده می‌شود)
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+)
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+class ReplicaSet:
+    """replica های خواندنی با چرخش نوبتی و خارج کردن replica های خراب."""
+
+    def __init__(self, engines: List[Engine], retry_seconds: Optional[float] = None):
+        self.engines = list(engines)
+        self.retry_seconds = (
+            settings.REPLICA_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        )
+        self._down_until = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    @classmethod
+    def from_urls(cls, urls: str) -> "ReplicaSet":
+        return cls(
+            [
+                create_engine(url.strip(), pool_pre_ping=True, future=True)
+                for url in urls.split(",")
+                if url.strip()
+            ]
+        )
+
+    def candidates(self) -> List[Engine]:
+        """replica های سالم، از replica بعدی در نوبت."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [e for e in self.engines if self._down_until.get(e, 0.0) <= now]
+            if not healthy:
+                return []
+            start = self._next % len(healthy)
+            self._next += 1
+            return healthy[start:] + healthy[:start]
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.retry_seconds
+        logger.warning(
+            f"Read replica {replica.url.render_as_string(hide_password=True)} "
+            f"marked down for {self.retry_seconds}s"
+        )
+
+    def is_down(self, replica: Engine) -> bool:
+        return self._down_until.get(replica, 0.0) > time.monotonic()
+
+    def _on_error(self, context) -> None:
+        # قطع اتصال وسط کوئری: replica تا retry_seconds کنار گذاشته می‌شود
+        if context.is_disconnect:
+            self.mark_down(context.engine)
+
+
+replicas = ReplicaSet.from_urls(settings.DATABASE_REPLICA_URLS)
+
+
+@dataclass
+class RequestRouting:
+    """وضعیت مسیریابی یک درخواست HTTP (بین thread های همان درخواست مشترک است)."""
+
+    read_primary: bool = False
+    wrote: bool = False
+
+
+_routing: ContextVar[Optional[RequestRouting]] = ContextVar("db_routing", default=None)
+
+
+def begin_request_routing(read_primary_until: Optional[str]) -> RequestRouting:
+    """
+    شروع درخواست: اگر client اخیرا نوشته باشد (کوکی READ_PRIMARY_COOKIE)
+    خواندن‌هایش روی primary انجام می‌شوند.
+    """
+    try:
+        read_primary = float(read_primary_until or 0) > time.time()
+    except ValueError:
+        read_primary = False
+    routing = RequestRouting(read_primary=read_primary)
+    _routing.set(routing)
+    return routing
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_write(session: Session) -> None:
+    routing = _routing.get()
+    if routing is not None:
+        routing.wrote = True
+        routing.read_primary = True
+
+
+class ReadYourWritesMiddleware:
+    """
+    middleware ASGI: وضعیت مسیریابی هر درخواست را می‌سازد و اگر درخواست
+    روی primary commit کرده باشد، کوکی READ_PRIMARY_COOKIE را ست می‌کند.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        routing = begin_request_routing(
+            HTTPConnection(scope).cookies.get(READ_PRIMARY_COOKIE)
+        )
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and routing.wrote:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + window:.3f}; "
+                    f"Max-Age={int(window) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -33,8 +183,32 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def _read_session() -> Session:
+    routing = _routing.get()
+    if routing is None or not routing.read_primary:
+        for replica in replicas.candidates():
+            db = ReadSessionLocal(bind=replica)
+            try:
+                # اتصال همین حالا گرفته می‌شود تا replica خراب کنار گذاشته شود
+                db.connection()
+                return db
+            except DBAPIError:
+                db.close()
+                replicas.mark_down(replica)
+    return SessionLocal()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """session فقط-خواندنی: replica سالم، وگرنه primary."""
+    db = _read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db() -> None:
-    # این import خیلی مهمه که مدل‌ها رجیستر بشن
-    from app import models  # noqa: F401
+    # اسکیما با migration های Alembic ساخته/به‌روز می‌شود (migrations/)
+    from app.db.migrations import upgrade_db
 
-    Base.metadata.create_all(bind=engine)
+    upgrade_db(engine)
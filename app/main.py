@@ -8,7 +8,11 @@ from app.api.v1.routes_health import router as health_router
 from app.api.v1.routes_auth import router as auth_router
 from app.api.v1.routes_jobs import router as jobs_router
 from app.api.v1.routes_admin_jobs import router as admin_jobs_router
-from app.db.session import init_db
+from app.api.v1.routes_admin_stats import router as admin_stats_router
+from app.core.security import password_hasher
+from app.db.session import engine, init_db, ReadYourWritesMiddleware, SessionLocal
+from app.services.job_events import start_event_listener
+from app.services.placement import seed_inventory
 
 
 def create_app() -> FastAPI:
@@ -25,8 +29,18 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # اطلاعات صفحه‌بندی لیست Job ها
+        expose_headers=[
+            "X-Next-Cursor",
+            "X-Total-Count",
+            "X-Total-Count-Estimated",
+            "ETag",
+        ],
     )
 
+    # خواندن از replica ها، با read-your-writes برای client هایی که تازه نوشته‌اند
+    app.add_middleware(ReadYourWritesMiddleware)
+
     # ✅ Mount static files (frontend)
     app.mount("/ui", StaticFiles(directory="frontend"), name="frontend")
 
@@ -35,6 +49,7 @@ def create_app() -> FastAPI:
     app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
     app.include_router(jobs_router, prefix=settings.API_V1_PREFIX)
     app.include_router(admin_jobs_router, prefix=settings.API_V1_PREFIX)
+    app.include_router(admin_stats_router, prefix=settings.API_V1_PREFIX)
 
     @app.get("/", tags=["Root"])
     def read_root():
@@ -47,10 +62,24 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     def on_startup() -> None:
         init_db()
+        db = SessionLocal()
+        try:
+            seed_inventory(db, settings.GPU_INVENTORY)
+        finally:
+            db.close()
+        # رویدادهای Job ها از process های دیگر (worker ها) با LISTEN/NOTIFY
+        app.state.job_events_listener = start_event_listener(engine)
         print("✅ Database initialized")
         print(f"📄 API Docs: http://localhost:8000/docs")
         print(f"🌐 Frontend: http://localhost:8000/ui/index.html")
 
+    @app.on_event("shutdown")
+    def on_shutdown() -> None:
+        listener = getattr(app.state, "job_events_listener", None)
+        if listener is not None:
+            listener.stop()
+        password_hasher.shutdown()
+
     return app
 
 
@@ -1,12 +1,29 @@
 # app/models/__init__.py
 
 from app.models.user import User
-from app.models.job import Job, JobStatus
-from app.models.quota import UserQuota
+from app.models.job import Job, JobPriority, JobStatus
+from app.models.job_array import JobArray
+from app.models.quota import QuotaLedgerEntry, UserQuota
+from app.models.job_queue import JobQueueEntry
+from app.models.gpu import GpuNode, Gpu
+from app.models.change_version import JobChangeVersion
+from app.models.job_stats import JobStatsRollup
+from app.models.api_key import ApiKey
+from app.models.rate_limit import RateLimitBucket
 
 __all__ = [
     "User",
     "Job",
     "JobStatus",
+    "JobPriority",
+    "JobArray",
     "UserQuota",
+    "QuotaLedgerEntry",
+    "JobQueueEntry",
+    "GpuNode",
+    "Gpu",
+    "JobChangeVersion",
+    "JobStatsRollup",
+    "ApiKey",
+    "RateLimitBucket",
 ]
@@ -0,0 +1,40 @@
+# app/models/api_key.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class ApiKey(Base):
+    """
+    کلید API یک کاربر برای client های ماشینی (CI، notebook).
+
+    خود کلید ذخیره نمی‌شود: prefix (بخش عمومی کلید، با ایندکس یکتا) برای
+    پیدا کردن ردیف و key_hash = HMAC-SHA256 کل کلید برای بررسی آن.
+    """
+
+    __tablename__ = "api_keys"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+    name: Mapped[str] = mapped_column(String(100))
+    prefix: Mapped[str] = mapped_column(String(16), unique=True, index=True)
+    key_hash: Mapped[str] = mapped_column(String(64))
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+    )
+    # کلید باطل‌شده دیگر پذیرفته نمی‌شود (ردیف برای سابقه می‌ماند)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
@@ -0,0 +1,23 @@
+# app/models/change_version.py
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class JobChangeVersion(Base):
+    """
+    شمارنده تغییرات Job ها برای ETag لیست‌ها.
+
+    scope برابر "user:<id>" (Job های یک کاربر) است و با هر ساخت یا تغییر
+    وضعیت Job آن کاربر یکی زیاد می‌شود. نسخه "global" (لیست ادمین) ردیف
+    ندارد و مجموع همین شمارنده‌هاست؛ پس پاسخ 304 فقط با خواندن همین جدول
+    کوچک داده می‌شود.
+    """
+
+    __tablename__ = "job_change_versions"
+
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
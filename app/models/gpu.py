@@ -0,0 +1,70 @@
+# app/models/gpu.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import (
+    String,
+    Integer,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.session import Base
+
+
+class GpuNode(Base):
+    """یک سرور فیزیکی (یا شبیه‌سازی‌شده) که تعدادی GPU هم‌نوع دارد."""
+
+    __tablename__ = "gpu_nodes"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), unique=True)
+    gpu_type: Mapped[str] = mapped_column(String(50), index=True)  # مثلا: "A100"
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+    )
+
+    gpus: Mapped[List["Gpu"]] = relationship(
+        back_populates="node",
+        cascade="all, delete-orphan",
+    )
+
+
+class Gpu(Base):
+    """
+    یک GPU روی یک node.
+
+    GPU هایی که nvlink_island یکسان دارند با NVLink به هم وصل‌اند؛
+    Job های چند GPU ای ترجیحا روی یک island کامل قرار می‌گیرند.
+    """
+
+    __tablename__ = "gpus"
+    __table_args__ = (
+        UniqueConstraint("node_id", "device_index", name="uq_gpu_node_device"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    node_id: Mapped[int] = mapped_column(
+        ForeignKey("gpu_nodes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    device_index: Mapped[int] = mapped_column(Integer)
+    nvlink_island: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Job ای که فعلا این GPU را در اختیار دارد (NULL یعنی آزاد)
+    job_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("jobs.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+
+    node: Mapped["GpuNode"] = relationship(back_populates="gpus")
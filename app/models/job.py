@@ -14,6 +14,7 @@ from sqlalchemy import (
     Text,
     Enum,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -29,16 +30,32 @@ class JobStatus(str, enum.Enum):
     FAILED = "FAILED"             # با خطا تمام شده
 
 
+class JobPriority(str, enum.Enum):
+    LOW = "LOW"                   # batch؛ اولین گزینه برای preempt
+    NORMAL = "NORMAL"
+    HIGH = "HIGH"                 # می‌تواند Job های LOW/NORMAL را preempt کند
+
+    @property
+    def rank(self) -> int:
+        """ترتیب عددی کلاس (بزرگ‌تر = مهم‌تر)."""
+        return _PRIORITY_ORDER.index(self)
+
+
+_PRIORITY_ORDER = [JobPriority.LOW, JobPriority.NORMAL, JobPriority.HIGH]
+
+# وضعیت‌هایی که هنوز تمام نشده‌اند (زمان‌بند و worker ها فقط با این‌ها کار دارند)
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.APPROVED, JobStatus.RUNNING)
+
+
 class Job(Base):
     __tablename__ = "jobs"
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
 
     # مالک Job
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     # اطلاعات Job
@@ -46,6 +63,10 @@ class Job(Base):
     gpu_type: Mapped[str] = mapped_column(String(50))  # مثلا: "A100", "V100"
     num_gpus: Mapped[int] = mapped_column(Integer, default=1)
     estimated_hours: Mapped[float] = mapped_column(Float, default=1.0)
+    priority: Mapped[JobPriority] = mapped_column(
+        Enum(JobPriority, name="job_priority_enum"),
+        default=JobPriority.NORMAL,
+    )
 
     command: Mapped[str] = mapped_column(Text)  # دستور اجرا (مثلا docker command / script)
     data_location: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -54,7 +75,6 @@ class Job(Base):
     status: Mapped[JobStatus] = mapped_column(
         Enum(JobStatus, name="job_status_enum"),
         default=JobStatus.PENDING,
-        index=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -77,5 +97,53 @@ class Job(Base):
 
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # پیشرفت ذخیره‌شده در checkpoint (ساعت) و تعداد دفعات preempt شدن
+    progress_hours: Mapped[float] = mapped_column(Float, default=0.0)
+    preemptions: Mapped[int] = mapped_column(Integer, default=0)
+
+    # عضو Job آرایه‌ای (app.models.job_array)؛ برای Job های تکی خالی
+    array_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("job_arrays.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    array_index: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
     # رابطه با User
     user: Mapped["User"] = relationship(back_populates="jobs")
+
+
+# ایندکس‌های کوئری‌های پرتکرار (همگام با migrations/versions)؛ ترتیب
+# ستون‌ها با ORDER BY صفحه‌بندی keyset (created_at DESC, id DESC) یکی است تا
+# لیست‌ها بدون sort و بدون اسکن کامل جدول خوانده شوند.
+Index(
+    "ix_jobs_user_created",
+    Job.user_id,
+    Job.created_at.desc(),
+    Job.id.desc(),
+)
+Index(
+    "ix_jobs_user_status_created",
+    Job.user_id,
+    Job.status,
+    Job.created_at.desc(),
+    Job.id.desc(),
+)
+Index("ix_jobs_created", Job.created_at.desc(), Job.id.desc())
+# عضوهای یک Job آرایه‌ای به ترتیب index (و یکتا بودن هر index)
+Index("ix_jobs_array_index", Job.array_id, Job.array_index, unique=True)
+Index(
+    "ix_jobs_status_created",
+    Job.status,
+    Job.created_at.desc(),
+    Job.id.desc(),
+)
+# فقط Job های فعال: sync زمان‌بند (APPROVED به ترتیب updated_at) و کوئری‌های
+# RUNNING زمان‌بند؛ Job های تمام‌شده که بیشتر جدول‌اند در آن نیستند
+Index(
+    "ix_jobs_active_updated",
+    Job.status,
+    Job.updated_at,
+    Job.id,
+    postgresql_where=Job.status.in_(ACTIVE_STATUSES),
+    sqlite_where=Job.status.in_(ACTIVE_STATUSES),
+)
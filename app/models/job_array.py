@@ -0,0 +1,35 @@
+# app/models/job_array.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class JobArray(Base):
+    """
+    Job آرایه‌ای (parameter sweep): یک قالب command که روی شبکه parameters
+    باز می‌شود. هر عضو یک Job معمولی با array_id و array_index است.
+    """
+
+    __tablename__ = "job_arrays"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+    name: Mapped[str] = mapped_column(String(255))
+    # تعداد عضوها (حاصل‌ضرب طول لیست‌های parameters)
+    size: Mapped[int] = mapped_column(Integer)
+    # نام پارامتر -> لیست مقادیر، به همان ترتیبی که شبکه باز شده
+    parameters: Mapped[Dict[str, List[Any]]] = mapped_column(JSON)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+    )
@@ -0,0 +1,47 @@
+# app/models/job_queue.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class JobQueueEntry(Base):
+    """
+    صف پایدار اجرای Job ها.
+
+    هر Job ای که شروع می‌شود یک ردیف در این جدول می‌گیرد و worker ها
+    آن را claim می‌کنند. اگر worker وسط اجرا از بین برود، بعد از تمام شدن
+    lease ردیف دوباره قابل claim می‌شود؛ پس با ری‌استارت API چیزی گم نمی‌شود.
+    """
+
+    __tablename__ = "job_queue"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    job_id: Mapped[int] = mapped_column(
+        ForeignKey("jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+
+    enqueued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+    )
+
+    # worker ای که فعلا این ردیف را در اختیار دارد
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    # تا این زمان ردیف متعلق به claimed_by است؛ بعد از آن دوباره آزاد می‌شود
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        index=True,
+    )
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
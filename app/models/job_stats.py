@@ -0,0 +1,37 @@
+# app/models/job_stats.py
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Enum, Float, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+from app.models.job import JobStatus
+
+
+class JobStatsRollup(Base):
+    """
+    تعداد Job ها و GPU-hour مصرف‌شده (فقط Job های COMPLETED / FAILED، همان
+    مقداری که در دفتر سهمیه تسویه می‌شود) به تفکیک روز ثبت (UTC)، کاربر،
+    نوع GPU و وضعیت فعلی.
+
+    با هر ساخت یا تغییر وضعیت Job به صورت افزایشی به‌روز می‌شود
+    (app.services.job_stats)؛ پس آمار بدون اسکن جدول jobs خوانده می‌شود.
+    """
+
+    __tablename__ = "job_stats_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    gpu_type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus, name="job_status_enum"),
+        primary_key=True,
+    )
+
+    job_count: Mapped[int] = mapped_column(BigInteger, default=0)
+    gpu_hours: Mapped[float] = mapped_column(Float, default=0.0)
@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Float, DateTime, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -14,6 +14,8 @@ class UserQuota(Base):
     __tablename__ = "user_quotas"
     __table_args__ = (
         UniqueConstraint("user_id", name="uq_user_quota_user_id"),
+        # rollover ماهانه فقط ردیف‌هایی را می‌خواند که دوره‌شان تمام شده
+        Index("ix_user_quotas_period_end", "period_end"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -28,16 +30,53 @@ class UserQuota(Base):
     # میزان مصرف‌شده در این ماه
     used_hours_this_month: Mapped[float] = mapped_column(Float, default=0.0)
 
-    # شروع دوره (مثلا اول ماه جاری - فعلا ساده: همون زمان ایجاد رکورد)
+    # شروع دوره (اول ماه UTC؛ app.services.quota.rollover_quota_periods)
     period_start: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
     )
 
-    # اگر خواستیم بعداً reset کنیم می‌تونیم این فیلد رو آپدیت کنیم
+    # پایان دوره؛ بعد از آن مصرف صفر و دوره ماه بعد شروع می‌شود
     period_end: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
     )
 
     user: Mapped["User"] = relationship(back_populates="quota")
+
+
+class QuotaLedgerEntry(Base):
+    """
+    دفتر append-only تغییرات سهمیه (app.services.quota).
+
+    hours علامت‌دار است: مثبت = برداشت از سهمیه (reserve هنگام ثبت Job)،
+    منفی = برگشت (refund بعد از reject). "usage" اختلاف مصرف واقعی Job
+    (GPU-hour اجراشده) با رزرو آن است و هر دو علامت را دارد؛ پس جمع ردیف‌های
+    هر Job همان مصرف اندازه‌گیری‌شده آن است. جمع hours هر کاربر در دوره
+    period_start برابر used_hours_this_month او است ("opening" مانده قبل از
+    شروع دفتر را ثبت می‌کند).
+    """
+
+    __tablename__ = "quota_ledger"
+    __table_args__ = (
+        Index("ix_quota_ledger_user_created", "user_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+    )
+    job_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("jobs.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    # reserve، refund، usage یا opening
+    kind: Mapped[str] = mapped_column(String(20))
+    hours: Mapped[float] = mapped_column(Float)
+    # دوره سهمیه‌ای که این ردیف به آن تعلق دارد (UserQuota.period_start)
+    period_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+    )
@@ -0,0 +1,23 @@
+# app/models/rate_limit.py
+from __future__ import annotations
+
+from sqlalchemy import Boolean, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class RateLimitBucket(Base):
+    """
+    token bucket مشترک بین process ها (RATE_LIMIT_BACKEND=database).
+
+    key برابر "<endpoint>:<user_id>" است؛ updated_at زمان epoch (ثانیه)
+    آخرین بررسی و allowed نتیجه همان بررسی است (برای RETURNING).
+    """
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float)
+    updated_at: Mapped[float] = mapped_column(Float)
+    allowed: Mapped[bool] = mapped_column(Boolean)
@@ -0,0 +1,25 @@
+# app/schemas/api_key.py
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class ApiKeyRead(BaseModel):
+    id: int
+    name: str
+    # بخش عمومی کلید (gpk_<prefix>_...) برای تشخیص کلید در لیست
+    prefix: str
+    created_at: datetime
+    revoked_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ApiKeyCreated(ApiKeyRead):
+    # فقط در پاسخ ساخت کلید؛ بعدا قابل بازیابی نیست
+    key: str
@@ -1,10 +1,11 @@
 # app/schemas/job.py
+import math
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Union
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, create_model, model_validator
 
-from app.models.job import JobStatus
+from app.models.job import JobPriority, JobStatus
 
 
 class JobBase(BaseModel):
@@ -12,6 +13,7 @@ class JobBase(BaseModel):
     gpu_type: str
     num_gpus: int = 1
     estimated_hours: float = 1.0
+    priority: JobPriority = JobPriority.NORMAL
     command: str
     data_location: Optional[str] = None
     is_sensitive: bool = False
@@ -29,6 +31,126 @@ class JobRead(JobBase):
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    progress_hours: float = 0.0
+    preemptions: int = 0
+    array_id: Optional[int] = None
+    array_index: Optional[int] = None
 
     # Pydantic v2 – جایگزین orm_mode
     model_config = ConfigDict(from_attributes=True)
+
+
+# یک ردیف از لیست‌های GET /jobs و /admin/jobs: فقط فیلدهای fields= در خروجی
+# می‌آیند (پیش‌فرض همه به جز ستون‌های Text سنگین)، پس هیچ فیلدی اجباری نیست
+JobListItem = create_model(
+    "JobListItem",
+    __doc__="Job در لیست‌ها؛ با ?fields= فقط زیرمجموعه‌ای از فیلدهای JobRead.",
+    **{
+        name: (Optional[field.annotation], None)
+        for name, field in JobRead.model_fields.items()
+    },
+)
+
+# لیست‌ها JSON را مستقیما می‌سازند (response_model=None)؛ این فقط مستندات است
+JOB_LIST_RESPONSES = {
+    200: {
+        "model": List[JobListItem],
+        "description": "Job ها؛ با ?fields= فقط فیلدهای خواسته‌شده در هر ردیف",
+    },
+}
+
+
+# حداکثر تعداد شناسه در یک درخواست دسته‌ای
+MAX_BULK_IDS = 10000
+
+
+class JobBulkFilter(BaseModel):
+    """حداقل یک شرط لازم است؛ filter خالی روی همه Job ها اعمال می‌شد."""
+
+    status: Optional[JobStatus] = None
+    user_id: Optional[int] = None
+    gpu_type: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _at_least_one_condition(self) -> "JobBulkFilter":
+        if self.status is None and self.user_id is None and self.gpu_type is None:
+            raise ValueError("Filter needs at least one of status, user_id or gpu_type")
+        return self
+
+
+class JobBulkRequest(BaseModel):
+    """دقیقا یکی از job_ids یا filter باید داده شود."""
+
+    job_ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=MAX_BULK_IDS)
+    filter: Optional[JobBulkFilter] = None
+
+    @model_validator(mode="after")
+    def _exactly_one_selector(self) -> "JobBulkRequest":
+        if (self.job_ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of job_ids or filter")
+        return self
+
+
+class JobBulkSkipped(BaseModel):
+    id: int
+    reason: str
+
+
+class JobBulkResult(BaseModel):
+    action: str
+    succeeded: List[int]
+    skipped: List[JobBulkSkipped]
+
+
+# حداکثر تعداد Job در یک POST /jobs/batch (یا عضوهای یک Job آرایه‌ای)
+MAX_BATCH_JOBS = 1000
+
+ParameterValue = Union[bool, int, float, str]
+
+
+class JobArrayCreate(JobBase):
+    """
+    Job آرایه‌ای: command قالب است و {name} در آن با مقدار پارامتر name
+    جایگزین می‌شود؛ برای هر ترکیب parameters (حاصل‌ضرب دکارتی، به ترتیب
+    کلیدها) یک Job ساخته می‌شود.
+    """
+
+    parameters: Dict[str, List[ParameterValue]] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def _valid_grid(self) -> "JobArrayCreate":
+        for name, values in self.parameters.items():
+            if not name.isidentifier():
+                raise ValueError(f"Invalid parameter name: {name!r}")
+            if not values:
+                raise ValueError(f"Parameter {name!r} has no values")
+            if f"{{{name}}}" not in self.command:
+                raise ValueError(f"Parameter {name!r} is not used in command")
+        if self.size > MAX_BATCH_JOBS:
+            raise ValueError(f"Array has {self.size} jobs; at most {MAX_BATCH_JOBS}")
+        return self
+
+    @property
+    def size(self) -> int:
+        return math.prod(len(values) for values in self.parameters.values())
+
+
+class JobBatchCreate(BaseModel):
+    """دقیقا یکی از jobs یا array باید داده شود."""
+
+    jobs: Optional[List[JobCreate]] = Field(
+        default=None, min_length=1, max_length=MAX_BATCH_JOBS
+    )
+    array: Optional[JobArrayCreate] = None
+
+    @model_validator(mode="after")
+    def _exactly_one_form(self) -> "JobBatchCreate":
+        if (self.jobs is None) == (self.array is None):
+            raise ValueError("Provide exactly one of jobs or array")
+        return self
+
+
+class JobBatchRead(BaseModel):
+    # فقط برای Job آرایه‌ای
+    array_id: Optional[int] = None
+    jobs: List[JobRead]
@@ -0,0 +1,29 @@
+# app/schemas/stats.py
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.models.job import JobStatus
+
+
+class JobStatsGroup(BaseModel):
+    # فقط ستون‌های group_by پر می‌شوند
+    day: Optional[date] = None
+    user_id: Optional[int] = None
+    gpu_type: Optional[str] = None
+    status: Optional[JobStatus] = None
+
+    job_count: int
+    # GPU-hour مصرف‌شده Job های COMPLETED / FAILED (همان مقدار تسویه سهمیه)؛
+    # برای وضعیت‌های دیگر صفر
+    gpu_hours: float
+
+
+class JobStatsResponse(BaseModel):
+    group_by: List[str]
+    since: Optional[date] = None
+    until: Optional[date] = None
+    groups: List[JobStatsGroup]
+    total_jobs: int
+    total_gpu_hours: float
@@ -0,0 +1,252 @@
+# app/services/approval_policy.py
+"""
+موتور قوانین تایید خودکار Job ها.
+
+قوانین در یک فایل JSON تعریف می‌شوند (مسیر: AUTO_APPROVAL_POLICY_FILE):
+
+    {
+      "rules": [
+        {
+          "name": "small-t4",
+          "gpu_types": ["T4", "RTX4090"],
+          "max_gpus": 2,
+          "max_hours": 4,
+          "allow_sensitive": false,
+          "data_location_prefixes": ["s3://public/"],
+          "min_quota_headroom_hours": 10
+        }
+      ]
+    }
+
+هر قانون یک AND از شرط‌های داده‌شده است (شرط نیامده = بدون محدودیت) و
+Job اگر با اولین قانونی که جور شود تایید می‌شود. allow_sensitive فقط
+اصلاح‌کننده است؛ قانونی که جز آن شرطی ندارد پذیرفته نمی‌شود. نوع مقدار
+هر شرط دقیقا بررسی می‌شود (bool، عدد، لیست رشته‌ها). هر قانون یک بار به
+لیستی از predicate ها compile می‌شود؛ پس ارزیابی داخل create_job فقط چند
+مقایسه ساده است. با تغییر mtime فایل، قوانین بدون ری‌استارت دوباره
+خوانده می‌شوند.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.logging import logger
+
+
+@dataclass(frozen=True)
+class JobFacts:
+    """اطلاعاتی از Job جدید که قوانین روی آن‌ها ارزیابی می‌شوند."""
+
+    gpu_type: str
+    num_gpus: int
+    estimated_hours: float
+    is_sensitive: bool
+    data_location: Optional[str]
+    # سهمیه باقی‌مانده کاربر بعد از کم کردن همین Job (ساعت)
+    quota_headroom_hours: float
+
+
+Predicate = Callable[[JobFacts], bool]
+
+
+# مقادیر شرط‌ها سخت‌گیرانه بررسی می‌شوند: مثلا bool("false") درست است و
+# رشته "s3://public/" به پیشوندهای تک‌حرفی تبدیل می‌شد؛ هر دو بیش از حد
+# تایید می‌کردند
+def _string_list(value: Any) -> Tuple[str, ...]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError("expected a list of strings")
+    return tuple(value)
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("expected a number")
+    return float(value)
+
+
+def _integer(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("expected an integer")
+    return value
+
+
+def _boolean(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError("expected true or false")
+    return value
+
+
+def _gpu_types(value: Any) -> Predicate:
+    allowed = frozenset(_string_list(value))
+    return lambda job: job.gpu_type in allowed
+
+
+def _max_gpus(value: Any) -> Predicate:
+    limit = _integer(value)
+    return lambda job: job.num_gpus <= limit
+
+
+def _max_hours(value: Any) -> Predicate:
+    limit = _number(value)
+    return lambda job: job.estimated_hours <= limit
+
+
+def _allow_sensitive(value: Any) -> Predicate:
+    if _boolean(value):
+        return lambda job: True
+    return lambda job: not job.is_sensitive
+
+
+def _data_location_prefixes(value: Any) -> Predicate:
+    # Job بدون داده ورودی چیزی برای بررسی ندارد
+    prefixes = _string_list(value)
+    return lambda job: (
+        job.data_location is None or job.data_location.startswith(prefixes)
+    )
+
+
+def _min_quota_headroom_hours(value: Any) -> Predicate:
+    limit = _number(value)
+    return lambda job: job.quota_headroom_hours >= limit
+
+
+_CONDITIONS: Dict[str, Callable[[Any], Predicate]] = {
+    "gpu_types": _gpu_types,
+    "max_gpus": _max_gpus,
+    "max_hours": _max_hours,
+    "allow_sensitive": _allow_sensitive,
+    "data_location_prefixes": _data_location_prefixes,
+    "min_quota_headroom_hours": _min_quota_headroom_hours,
+}
+
+# شرط‌هایی که Job ای را محدود نمی‌کنند؛ قانونی که فقط این‌ها را دارد (مثلا
+# "allow_sensitive": true) همه Job ها را تایید می‌کرد
+_MODIFIERS = frozenset({"allow_sensitive"})
+
+
+@dataclass
+class ApprovalPolicy:
+    rules: List[Tuple[str, List[Predicate]]] = field(default_factory=list)
+    source: Optional[dict] = None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def evaluate(self, job: JobFacts) -> Optional[str]:
+        """
+        Returns:
+            نام اولین قانونی که Job را تایید می‌کند، یا None
+        """
+        for name, predicates in self.rules:
+            if all(predicate(job) for predicate in predicates):
+                return name
+        return None
+
+
+def compile_policy(spec: dict) -> ApprovalPolicy:
+    """
+    تبدیل JSON قوانین به ApprovalPolicy.
+
+    Raises:
+        ValueError: اگر ساختار قوانین یا نوع مقدار یک شرط نامعتبر باشد، یا
+            قانونی جز allow_sensitive شرطی نداشته باشد
+    """
+    rules = spec.get("rules")
+    if not isinstance(rules, list):
+        raise ValueError("Approval policy must have a 'rules' list")
+
+    compiled = []
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule #{i} must be an object")
+        name = str(rule.get("name") or f"rule-{i}")
+        predicates = []
+        restricting = False
+        for key, value in rule.items():
+            if key == "name":
+                continue
+            factory = _CONDITIONS.get(key)
+            if factory is None:
+                raise ValueError(f"Rule '{name}': unknown condition '{key}'")
+            try:
+                predicates.append(factory(value))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Rule '{name}': invalid value for '{key}': {e}")
+            restricting = restricting or key not in _MODIFIERS
+        # قانون بدون شرط محدودکننده همه Job ها را تایید می‌کرد
+        if not restricting:
+            raise ValueError(f"Rule '{name}' has no conditions")
+        compiled.append((name, predicates))
+    return ApprovalPolicy(rules=compiled, source=spec)
+
+
+def load_policy(path: str) -> ApprovalPolicy:
+    with open(path) as f:
+        return compile_policy(json.load(f))
+
+
+# -----------------------------
+#  نمونه مشترک در هر process
+# -----------------------------
+_lock = threading.Lock()
+_policy = ApprovalPolicy()
+_loaded_path: Optional[str] = None
+_loaded_mtime: Optional[float] = None
+_checked_at = 0.0
+
+
+def reload_approval_policy() -> ApprovalPolicy:
+    """
+    خواندن دوباره فایل قوانین. اگر فایل نامعتبر باشد، قوانین قبلی
+    دست‌نخورده می‌مانند و خطا بالا داده می‌شود.
+
+    Raises:
+        ValueError / OSError: اگر فایل خوانده یا compile نشود
+    """
+    global _policy, _loaded_path, _loaded_mtime, _checked_at
+    path = settings.AUTO_APPROVAL_POLICY_FILE
+    with _lock:
+        _checked_at = time.monotonic()
+        if not path:
+            _policy, _loaded_path, _loaded_mtime = ApprovalPolicy(), None, None
+            return _policy
+        mtime = os.stat(path).st_mtime
+        policy = load_policy(path)
+        _policy, _loaded_path, _loaded_mtime = policy, path, mtime
+    logger.info(f"Loaded {len(policy)} auto-approval rules from {path}")
+    return policy
+
+
+def get_approval_policy() -> ApprovalPolicy:
+    """
+    قوانین فعلی؛ هر AUTO_APPROVAL_RELOAD_SECONDS یک بار mtime فایل چک
+    می‌شود و در صورت تغییر دوباره خوانده می‌شود.
+    """
+    path = settings.AUTO_APPROVAL_POLICY_FILE or None
+    fresh = time.monotonic() - _checked_at < settings.AUTO_APPROVAL_RELOAD_SECONDS
+    if fresh and path == _loaded_path:
+        return _policy
+
+    try:
+        if path is None and _loaded_path is None:
+            _touch()
+            return _policy
+        if path == _loaded_path and os.stat(path).st_mtime == _loaded_mtime:
+            _touch()
+            return _policy
+        return reload_approval_policy()
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load auto-approval policy {path}: {e}")
+        _touch()
+        return _policy
+
+
+def _touch() -> None:
+    global _checked_at
+    _checked_at = time.monotonic()
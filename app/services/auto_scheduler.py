@@ -0,0 +1,316 @@
+# app/services/auto_scheduler.py
+"""
+زمان‌بند خودکار Job های APPROVED با FairSharePolicy.
+
+فقط یک نمونه از این process باید اجرا شود:
+    python -m app.services.auto_scheduler
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.clock import Clock, system_clock
+from app.core.logging import logger
+from app.db.session import SessionLocal
+from app.models.gpu import Gpu
+from app.models.job import Job, JobPriority, JobStatus
+from app.models.quota import UserQuota
+from app.services.job_queue import dequeue_job, enqueue_job
+from app.services.lifecycle import preempted_progress, transition
+from app.services.placement import allocate_gpus, get_placement_engine, release_gpus
+from app.services.scheduler import (
+    FairSharePolicy,
+    Reservation,
+    choose_victims,
+    compute_reservation,
+    priority_rank,
+)
+
+
+class _DbContext:
+    """SchedulingContext واقعی: رزرو GPU، RUNNING کردن و قرار دادن در صف اجرا."""
+
+    def __init__(self, db: Session, scheduler: "AutoScheduler") -> None:
+        self.db = db
+        self.scheduler = scheduler
+        self.clock = scheduler.clock
+
+    @property
+    def now(self) -> datetime:
+        return self.clock.now()
+
+    def try_start(self, queued: Job, *, avoid_nodes: Optional[Set[int]] = None) -> bool:
+        # اول Job با UPDATE شرطی گرفته می‌شود و بعد GPU؛ پس اگر ادمین یا
+        # process دیگری همزمان آن را تغییر داده باشد، چیزی رزرو نمی‌شود
+        result = transition(self.db, queued.id, "start", now=self.now)
+        if not result.applied:
+            self.db.rollback()
+            self.scheduler.forget(queued.id)
+            return False
+
+        job = result.job
+        if allocate_gpus(self.db, job, exclude_nodes=avoid_nodes) is None:
+            self.db.rollback()
+            return False
+
+        enqueue_job(self.db, job.id)
+        self.db.commit()
+        self.scheduler.forget(job.id, removed=False)
+        logger.info(f"Scheduler started job {job.id} for user {job.user_id}")
+        return True
+
+    def free_gpus(self, gpu_type: str) -> int:
+        return get_placement_engine(self.db).free_gpus(gpu_type)
+
+    def reservation_for(self, job: Job) -> Optional[Reservation]:
+        rows = (
+            self.db.query(
+                Gpu.node_id,
+                Job.num_gpus,
+                Job.started_at,
+                Job.estimated_hours,
+                Job.progress_hours,
+            )
+            .join(Gpu, Gpu.job_id == Job.id)
+            .filter(Job.status == JobStatus.RUNNING, Job.gpu_type == job.gpu_type)
+            .distinct()
+            .all()
+        )
+        running = [
+            (
+                node_id,
+                num_gpus,
+                _naive(started_at or self.now)
+                + timedelta(hours=max(estimated_hours - (progress_hours or 0.0), 0.0)),
+            )
+            for node_id, num_gpus, started_at, estimated_hours, progress_hours in rows
+        ]
+        return compute_reservation(
+            num_gpus=job.num_gpus,
+            now=self.now,
+            node_free=get_placement_engine(self.db).node_free_counts(job.gpu_type),
+            running=running,
+        )
+
+
+    def preempt_for(self, job: Job) -> bool:
+        """
+        Job های کلاس پایین‌تر روی بهترین node با checkpoint متوقف و به
+        APPROVED برمی‌گردند؛ GPU هایشان همین‌جا آزاد می‌شود و هزینه
+        checkpoint موقع ادامه اجرا (restore) حساب می‌شود. sync بعدی آن‌ها را
+        با پیشرفت ذخیره‌شده دوباره در صف قرار می‌دهد.
+        """
+        rank = priority_rank(job)
+        lower = [p for p in JobPriority if p.rank < rank]
+        if not lower:
+            return False
+
+        rows = (
+            self.db.query(
+                Job.id,
+                Gpu.node_id,
+                Job.num_gpus,
+                Job.priority,
+                Job.started_at,
+                Job.progress_hours,
+            )
+            .join(Gpu, Gpu.job_id == Job.id)
+            .filter(
+                Job.status == JobStatus.RUNNING,
+                Job.gpu_type == job.gpu_type,
+                Job.priority.in_(lower),
+            )
+            .distinct()
+            .all()
+        )
+        plan = choose_victims(
+            num_gpus=job.num_gpus,
+            priority=rank,
+            node_free=get_placement_engine(self.db).node_free_counts(job.gpu_type),
+            running=[
+                (job_id, node_id, num_gpus, priority.rank, _naive(started_at or self.now))
+                for job_id, node_id, num_gpus, priority, started_at, _ in rows
+            ],
+        )
+        if plan is None or not plan.victims:
+            return False
+
+        victims = {row.id: row for row in rows}
+        for victim_id in plan.victims:
+            result = transition(
+                self.db,
+                victim_id,
+                "preempt",
+                now=self.now,
+                progress_hours=preempted_progress(victims[victim_id], self.now),
+            )
+            if not result.applied:
+                continue  # همین حالا تمام شده است
+            release_gpus(self.db, victim_id)
+            dequeue_job(self.db, victim_id)
+        self.db.commit()
+        logger.info(
+            f"Scheduler preempted jobs {plan.victims} on node {plan.node_id} "
+            f"for job {job.id}"
+        )
+        return True
+
+
+def _naive(moment: datetime) -> datetime:
+    """PostgreSQL برای ستون‌های timezone=True زمان aware برمی‌گرداند."""
+    return moment.replace(tzinfo=None) if moment.tzinfo else moment
+
+
+class AutoScheduler:
+    """
+    وضعیت درون‌حافظه‌ای زمان‌بند. Job های جدید APPROVED به صورت
+    افزایشی (با watermark روی updated_at) خوانده می‌شوند و وزن هر کاربر
+    فقط اولین بار از UserQuota بارگذاری می‌شود.
+
+    updated_at در برنامه و قبل از commit پر می‌شود؛ پس ردیفی می‌تواند
+    بعد از ردیف جدیدتری commit شود. هر sync پنجره sync_overlap_seconds
+    قبل از watermark را دوباره می‌خواند و Job های تکراری با _known کنار
+    گذاشته می‌شوند. Job هایی که جای دیگری (ادمین، process دیگر) از APPROVED
+    خارج یا حذف شده‌اند هم در هر sync از _known و backlog حذف می‌شوند.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Optional[Callable[[], Session]] = None,
+        policy: Optional[FairSharePolicy] = None,
+        clock: Clock = system_clock,
+        batch_size: int = 5000,
+        sync_overlap_seconds: Optional[float] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        if policy is None:
+            policy = FairSharePolicy(
+                half_life_hours=settings.FAIR_SHARE_HALF_LIFE_HOURS,
+                backfill=settings.SCHEDULER_BACKFILL,
+                preempt=settings.SCHEDULER_PREEMPTION,
+            )
+        self.policy = policy
+        self.clock = clock
+        self._batch_size = batch_size
+        if sync_overlap_seconds is None:
+            sync_overlap_seconds = settings.SCHEDULER_SYNC_OVERLAP_SECONDS
+        self._sync_overlap = timedelta(seconds=sync_overlap_seconds)
+        # بیشترین updated_at دیده‌شده
+        self._watermark: Optional[datetime] = None
+        self._known: set = set()
+
+    def _session(self) -> Session:
+        return (self._session_factory or SessionLocal)()
+
+    def _load_user(self, db: Session, user_id: int) -> None:
+        quota = db.query(UserQuota).filter(UserQuota.user_id == user_id).first()
+        weight = quota.monthly_quota_hours if quota else 1.0
+        self.policy.set_weight(user_id, weight)
+        if quota and quota.used_hours_this_month:
+            self.policy.charge(user_id, quota.used_hours_this_month, self.clock.now())
+
+    def _prune(self, db: Session) -> int:
+        """حذف Job های _known که دیگر APPROVED نیستند (با جستجو روی کلید اصلی)."""
+        known = sorted(self._known)
+        gone: List[int] = []
+        for start in range(0, len(known), self._batch_size):
+            chunk = known[start : start + self._batch_size]
+            approved = {
+                job_id
+                for (job_id,) in db.query(Job.id).filter(
+                    Job.id.in_(chunk), Job.status == JobStatus.APPROVED
+                )
+            }
+            gone.extend(job_id for job_id in chunk if job_id not in approved)
+        for job_id in gone:
+            self.forget(job_id)
+        return len(gone)
+
+    def sync(self, db: Session) -> int:
+        """خواندن Job های APPROVED جدید از watermark منهای پنجره overlap."""
+        self._prune(db)
+        added = 0
+        if self._watermark is None:
+            cursor = (datetime.min, 0)
+        else:
+            cursor = (self._watermark - self._sync_overlap, 0)
+        while True:
+            ts, last_id = cursor
+            jobs: List[Job] = (
+                db.query(Job)
+                .filter(
+                    Job.status == JobStatus.APPROVED,
+                    or_(
+                        Job.updated_at > ts,
+                        and_(Job.updated_at == ts, Job.id > last_id),
+                    ),
+                )
+                .order_by(Job.updated_at, Job.id)
+                .limit(self._batch_size)
+                .all()
+            )
+            for job in jobs:
+                if job.id in self._known:
+                    continue
+                if not self.policy.has_user(job.user_id):
+                    self._load_user(db, job.user_id)
+                db.expunge(job)
+                self.policy.submit(job)
+                self._known.add(job.id)
+                added += 1
+            if jobs:
+                cursor = (jobs[-1].updated_at, jobs[-1].id)
+                if self._watermark is None or cursor[0] > self._watermark:
+                    self._watermark = cursor[0]
+            if len(jobs) < self._batch_size:
+                return added
+
+    def forget(self, job_id: int, *, removed: bool = True) -> None:
+        """Job دیگر در backlog نیست (شروع شده یا دستی تغییر کرده)."""
+        self._known.discard(job_id)
+        if removed:
+            self.policy.remove(job_id)
+
+    def tick(self) -> int:
+        """یک دور: sync و سپس شروع هر تعداد Job که جا می‌شود."""
+        db = self._session()
+        try:
+            self.sync(db)
+            return self.policy.dispatch(_DbContext(db, self))
+        finally:
+            db.close()
+
+    def run(self, *, poll_seconds: float, stop_event: Optional[threading.Event] = None) -> None:
+        stop_event = stop_event or threading.Event()
+        logger.info("Auto scheduler started")
+        while not stop_event.is_set():
+            try:
+                started = self.tick()
+                if started:
+                    logger.info(f"Auto scheduler started {started} jobs")
+            except Exception as e:
+                logger.error(f"Auto scheduler tick failed: {e}")
+            stop_event.wait(poll_seconds)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fair-share auto scheduler")
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=settings.SCHEDULER_POLL_SECONDS,
+    )
+    args = parser.parse_args(argv)
+    AutoScheduler().run(poll_seconds=args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# app/services/change_versions.py
+"""
+شمارنده تغییرات Job ها و ETag لیست‌ها.
+
+هر تغییر وضعیت (app.services.lifecycle) و هر Job جدید، scope
+"user:<id>" صاحب Job را در session علامت می‌زند؛ درست قبل از commit
+شمارنده‌ها با یک upsert زیاد می‌شوند. پس:
+- در همان تراکنش تغییر انجام می‌شوند و با rollback برمی‌گردند
+- قفل ردیف شمارنده فقط تا commit (نه در طول کل تراکنش) نگه داشته می‌شود
+
+scope "global" (لیست ادمین) ردیف ندارد و مجموع شمارنده‌های کاربران است؛
+وگرنه همه نویسنده‌ها پشت قفل یک ردیف مشترک صف می‌کشیدند. شمارنده‌ها فقط
+زیاد می‌شوند، پس هر تغییری مجموع را هم عوض می‌کند.
+
+GET های لیست/جزئیات با همین شمارنده ETag می‌سازند و به If-None-Match بدون
+خواندن جدول jobs پاسخ 304 می‌دهند.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.change_version import JobChangeVersion
+
+GLOBAL_SCOPE = "global"
+_PENDING_KEY = "job_change_scopes"
+
+# پاسخ‌ها cache می‌شوند ولی مرورگر باید هر بار با If-None-Match چک کند
+CACHE_CONTROL = "private, no-cache"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def mark_jobs_changed(db: Session, user_ids: Iterable[int]) -> None:
+    """Job های این کاربران تغییر کرده‌اند؛ شمارنده‌ها موقع commit زیاد می‌شوند."""
+    pending = db.info.setdefault(_PENDING_KEY, set())
+    pending.update(user_scope(user_id) for user_id in user_ids)
+
+
+def bump_versions(db: Session, scopes: Iterable[str]) -> None:
+    """یک واحد اضافه کردن شمارنده scope ها (ردیف نبود = ساخته می‌شود)."""
+    rows = [{"scope": scope, "version": 1} for scope in sorted(set(scopes))]
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(JobChangeVersion).values(rows)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[JobChangeVersion.scope],
+                set_={"version": JobChangeVersion.version + 1},
+            )
+        )
+        return
+
+    # دیتابیس‌های دیگر: UPDATE و سپس INSERT برای scope های جدید
+    scopes = [row["scope"] for row in rows]
+    db.execute(
+        update(JobChangeVersion)
+        .where(JobChangeVersion.scope.in_(scopes))
+        .values(version=JobChangeVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    existing = set(
+        db.execute(
+            select(JobChangeVersion.scope).where(JobChangeVersion.scope.in_(scopes))
+        ).scalars()
+    )
+    missing = [row for row in rows if row["scope"] not in existing]
+    if missing:
+        db.execute(JobChangeVersion.__table__.insert(), missing)
+
+
+def get_versions(db: Session, scopes: Iterable[str]) -> Dict[str, int]:
+    scopes = list(scopes)
+    versions = dict(
+        db.execute(
+            select(JobChangeVersion.scope, JobChangeVersion.version).where(
+                JobChangeVersion.scope.in_(scopes)
+            )
+        ).all()
+    )
+    if GLOBAL_SCOPE in scopes:
+        # ردیف "global" قدیمی (اگر مانده باشد) نادیده گرفته می‌شود
+        versions[GLOBAL_SCOPE] = db.execute(
+            select(func.coalesce(func.sum(JobChangeVersion.version), 0)).where(
+                JobChangeVersion.scope.like(user_scope("%"))
+            )
+        ).scalar_one()
+    return {scope: versions.get(scope, 0) for scope in scopes}
+
+
+def job_list_etag(db: Session, scope: str, *variant: Any) -> str:
+    """
+    ETag (weak) برای پاسخی که فقط به Job های این scope وابسته است.
+
+    variant پارامترهایی است که محتوای پاسخ را عوض می‌کنند (فیلتر، cursor،
+    شناسه Job و ...) تا ETag یک پاسخ برای پاسخ دیگری 304 نگیرد.
+    """
+    version = get_versions(db, [scope])[scope]
+    digest = hashlib.blake2b(repr(variant).encode(), digest_size=6).hexdigest()
+    return f'W/"{scope}:{version}:{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # مقایسه weak: W/ در نظر گرفته نمی‌شود
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == bare for tag in candidates)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_pending_versions(session: Session) -> None:
+    scopes = session.info.pop(_PENDING_KEY, None)
+    if scopes:
+        bump_versions(session, scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_versions(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,116 @@
+# app/services/job_batches.py
+"""
+ثبت دسته‌ای Job ها (POST /jobs/batch) و Job های آرایه‌ای.
+
+همه Job های یک دسته با یک INSERT چندردیفی (`INSERT ... VALUES (...), (...)
+RETURNING`) ساخته می‌شوند. Job آرایه‌ای یک ردیف job_arrays دارد و هر عضو
+آن یک Job معمولی با array_id و array_index (ترتیب حاصل‌ضرب دکارتی
+parameters) است.
+"""
+from __future__ import annotations
+
+import itertools
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.job import Job, JobStatus
+from app.models.job_array import JobArray
+from app.schemas.job import JobArrayCreate, JobBase
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def render_command(template: str, params: Dict[str, Any]) -> str:
+    """
+    جایگزینی {name} با مقدار پارامتر؛ آکولادهای دیگر (مثلا ${HOME} یا
+    awk '{print}') دست نمی‌خورند.
+    """
+    return _PLACEHOLDER.sub(
+        lambda m: str(params[m.group(1)]) if m.group(1) in params else m.group(0),
+        template,
+    )
+
+
+def expand_job_array(array_in: JobArrayCreate) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """(پارامترها، command) برای هر عضو، به ترتیب array_index."""
+    names = list(array_in.parameters)
+    for values in itertools.product(*array_in.parameters.values()):
+        params = dict(zip(names, values))
+        yield params, render_command(array_in.command, params)
+
+
+def _job_row(user_id: int, job_in: JobBase, **overrides: Any) -> Dict[str, Any]:
+    row = {
+        "user_id": user_id,
+        "name": job_in.name,
+        "gpu_type": job_in.gpu_type,
+        "num_gpus": job_in.num_gpus,
+        "estimated_hours": job_in.estimated_hours,
+        "priority": job_in.priority,
+        "command": job_in.command,
+        "data_location": job_in.data_location,
+        "is_sensitive": job_in.is_sensitive,
+        "status": JobStatus.PENDING,
+        "array_id": None,
+        "array_index": None,
+    }
+    row.update(overrides)
+    return row
+
+
+def insert_jobs(db: Session, rows: Sequence[Dict[str, Any]]) -> List[Job]:
+    """
+    INSERT چندردیفی با RETURNING (بدون commit)؛ Job ها به ترتیب rows.
+
+    ترتیب ردیف‌های RETURNING تضمین نشده است؛ ولی شناسه‌های یک INSERT به
+    ترتیب VALUES داده می‌شوند، پس مرتب‌سازی با id همان ترتیب rows است.
+    (sort_by_parameter_order روی SQLite به یک INSERT برای هر ردیف برمی‌گردد.)
+    """
+    jobs = db.execute(insert(Job).returning(Job), list(rows)).scalars().all()
+    return sorted(jobs, key=lambda job: job.id)
+
+
+def create_jobs(db: Session, user_id: int, jobs_in: Sequence[JobBase]) -> List[Job]:
+    """ساخت چند Job مستقل در وضعیت PENDING (بدون commit)."""
+    return insert_jobs(db, [_job_row(user_id, job_in) for job_in in jobs_in])
+
+
+def create_job_array(
+    db: Session, user_id: int, array_in: JobArrayCreate
+) -> Tuple[JobArray, List[Job]]:
+    """
+    ساخت ردیف job_arrays و همه عضوهای آن در وضعیت PENDING (بدون commit).
+
+    نام هر عضو "<name>[<index>]" است.
+    """
+    array = JobArray(
+        user_id=user_id,
+        name=array_in.name,
+        size=array_in.size,
+        parameters=array_in.parameters,
+    )
+    db.add(array)
+    db.flush()
+    rows = [
+        _job_row(
+            user_id,
+            array_in,
+            name=f"{array_in.name}[{index}]",
+            command=command,
+            array_id=array.id,
+            array_index=index,
+        )
+        for index, (_, command) in enumerate(expand_job_array(array_in))
+    ]
+    return array, insert_jobs(db, rows)
+
+
+def get_array_job(db: Session, array_id: int, index: int) -> Optional[Job]:
+    return (
+        db.query(Job)
+        .filter(Job.array_id == array_id, Job.array_index == index)
+        .first()
+    )
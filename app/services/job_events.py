@@ -0,0 +1,309 @@
+# app/services/job_events.py
+"""
+pub/sub تغییرات Job ها برای push به داشبوردها (Server-Sent Events).
+
+هر تغییر وضعیت (app.services.lifecycle) و هر Job جدید یک JobEvent در
+session ثبت می‌کند؛ رویدادها فقط بعد از commit به subscriber ها می‌رسند و
+با rollback دور ریخته می‌شوند:
+- روی PostgreSQL (JOB_EVENTS_BACKEND=auto) رویدادها قبل از commit با
+  pg_notify در همان تراکنش فرستاده می‌شوند. PostgreSQL آن‌ها را بعد از
+  commit به همه process هایی که LISTEN کرده‌اند (PostgresEventListener در
+  هر process API) می‌رساند؛ پس تغییرات worker ها و API های دیگر هم دیده
+  می‌شوند.
+- در غیر این صورت (SQLite، تست‌ها یا JOB_EVENTS_BACKEND=local) رویدادها
+  بعد از commit مستقیما به subscriber های همین process داده می‌شوند.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import select
+import threading
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.logging import logger
+from app.models.job import Job, JobStatus
+
+JOB_EVENTS_CHANNEL = "job_events"
+_PENDING_KEY = "job_events"
+
+# هدرهای پاسخ SSE (X-Accel-Buffering: بافر نکردن پشت nginx)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@dataclass(frozen=True)
+class JobEvent:
+    job_id: int
+    user_id: int
+    action: str
+    status: str
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def for_job(cls, job: Job, action: str) -> "JobEvent":
+        return cls(
+            job_id=job.id,
+            user_id=job.user_id,
+            action=action,
+            status=JobStatus(job.status).value,
+            updated_at=job.updated_at.isoformat() if job.updated_at else None,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "JobEvent":
+        return cls(**json.loads(payload))
+
+
+class Subscription:
+    """صف رویدادهای یک اتصال SSE (روی event loop همان اتصال)."""
+
+    def __init__(
+        self,
+        broker: "JobEventBroker",
+        loop: asyncio.AbstractEventLoop,
+        user_id: Optional[int],
+        maxsize: int,
+    ):
+        self.broker = broker
+        self.loop = loop
+        # None = همه Job ها (ادمین)
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def wants(self, job_event: JobEvent) -> bool:
+        return self.user_id is None or job_event.user_id == self.user_id
+
+    def _put_many(self, events: List[JobEvent]) -> None:
+        for job_event in events:
+            try:
+                self.queue.put_nowait(job_event)
+            except asyncio.QueueFull:
+                # client عقب مانده؛ به جای نگه داشتن همه رویدادها resync می‌گیرد
+                self._mark_overflow()
+                return
+
+    def _mark_overflow(self) -> None:
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def take_overflow(self) -> bool:
+        overflowed, self.overflowed = self.overflowed, False
+        return overflowed
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[JobEvent]:
+        """رویداد بعدی؛ None اگر تا timeout رویدادی نرسد."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class JobEventBroker:
+    """pub/sub داخل process؛ publish از هر thread قابل صدا زدن است."""
+
+    def __init__(self, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.JOB_EVENTS_QUEUE_SIZE
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+
+    def subscribe(self, user_id: Optional[int] = None) -> Subscription:
+        """باید داخل event loop اتصال صدا زده شود."""
+        subscription = Subscription(
+            self, asyncio.get_running_loop(), user_id, self.queue_size
+        )
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _each(self) -> List[Subscription]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, events: Iterable[JobEvent]) -> None:
+        events = list(events)
+        for subscription in self._each():
+            wanted = [e for e in events if subscription.wants(e)]
+            if not wanted:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put_many, wanted)
+            except RuntimeError:
+                # event loop اتصال بسته شده است
+                self.unsubscribe(subscription)
+
+    def resync(self) -> None:
+        """همه client ها باید لیستشان را دوباره بخوانند (رویدادی گم شده است)."""
+        for subscription in self._each():
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._mark_overflow)
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+broker = JobEventBroker()
+
+
+def publish_job_events(db: Session, events: Iterable[JobEvent]) -> None:
+    """رویدادها همراه با commit همین session منتشر می‌شوند."""
+    db.info.setdefault(_PENDING_KEY, []).extend(events)
+
+
+def _uses_notify(session: Session) -> bool:
+    if settings.JOB_EVENTS_BACKEND == "local":
+        return False
+    return session.get_bind().dialect.name == "postgresql"
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_pending_events(session: Session) -> None:
+    events = session.info.get(_PENDING_KEY)
+    if not events or not _uses_notify(session):
+        return
+    session.info.pop(_PENDING_KEY)
+    # NOTIFY تراکنشی است: فقط بعد از commit تحویل داده می‌شود
+    session.execute(
+        text(
+            "SELECT pg_notify(:channel, payload) "
+            "FROM unnest(CAST(:payloads AS text[])) AS payload"
+        ),
+        {"channel": JOB_EVENTS_CHANNEL, "payloads": [e.to_json() for e in events]},
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        broker.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def event_stream(
+    subscription: Subscription,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    *,
+    heartbeat_seconds: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """
+    بدنه پاسخ text/event-stream برای یک subscription.
+
+    رویدادها با نام "job" و JobEvent به صورت JSON ارسال می‌شوند؛ "resync"
+    یعنی client باید لیست را دوباره بخواند. وقتی رویدادی نیست، هر
+    heartbeat_seconds یک comment فرستاده می‌شود تا proxy ها اتصال را
+    نبندند و قطع شدن client تشخیص داده شود.
+    """
+    heartbeat = heartbeat_seconds or settings.JOB_EVENTS_HEARTBEAT_SECONDS
+    try:
+        yield b"retry: 5000\n\n"
+        while not await is_disconnected():
+            if subscription.take_overflow():
+                yield b"event: resync\ndata: {}\n\n"
+                continue
+            job_event = await subscription.get(timeout=heartbeat)
+            if job_event is None:
+                yield b": ping\n\n"
+            else:
+                yield f"event: job\ndata: {job_event.to_json()}\n\n".encode()
+    finally:
+        subscription.close()
+
+
+class PostgresEventListener:
+    """
+    LISTEN روی کانال job_events در یک thread جدا و انتشار رویدادها به
+    broker همین process. بعد از قطع و وصل شدن اتصال، چون ممکن است رویدادی
+    گم شده باشد، به همه client ها resync داده می‌شود.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        event_broker: JobEventBroker = broker,
+        *,
+        channel: str = JOB_EVENTS_CHANNEL,
+        poll_seconds: float = 5.0,
+    ):
+        self.engine = engine
+        self.broker = event_broker
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="job-events-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 1)
+
+    def _run(self) -> None:
+        connected_before = False
+        while not self._stop.is_set():
+            try:
+                self._listen(resync=connected_before)
+            except Exception:
+                logger.exception("Job events listener failed; reconnecting")
+                self._stop.wait(self.poll_seconds)
+            connected_before = True
+
+    def _listen(self, *, resync: bool) -> None:
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            if resync:
+                self.broker.resync()
+            while not self._stop.is_set():
+                if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                conn.poll()
+                events = []
+                while conn.notifies:
+                    events.append(JobEvent.from_json(conn.notifies.pop(0).payload))
+                if events:
+                    self.broker.publish(events)
+        finally:
+            # اتصالی که LISTEN کرده به pool برنمی‌گردد
+            raw.invalidate()
+
+
+def start_event_listener(engine: Engine) -> Optional[PostgresEventListener]:
+    """شروع listener برای process API (فقط وقتی رویدادها با NOTIFY می‌آیند)."""
+    if settings.JOB_EVENTS_BACKEND == "local" or engine.dialect.name != "postgresql":
+        return None
+    listener = PostgresEventListener(engine)
+    listener.start()
+    return listener
@@ -0,0 +1,124 @@
+# app/services/job_queue.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.job_queue import JobQueueEntry
+
+
+def enqueue_job(db: Session, job_id: int) -> JobQueueEntry:
+    """
+    اضافه کردن Job به صف اجرا.
+
+    commit نمی‌کند؛ صدا زننده باید همراه با تغییر وضعیت Job به RUNNING
+    commit کند تا این دو با هم اتمیک باشند.
+    """
+    entry = JobQueueEntry(job_id=job_id, attempts=0)
+    db.add(entry)
+    return entry
+
+
+def enqueue_jobs(db: Session, job_ids: List[int]) -> None:
+    """نسخه دسته‌ای enqueue_job با یک INSERT چندردیفی (بدون commit)."""
+    if not job_ids:
+        return
+    now = datetime.utcnow()
+    db.execute(
+        insert(JobQueueEntry),
+        [{"job_id": job_id, "attempts": 0, "enqueued_at": now} for job_id in job_ids],
+    )
+
+
+def claim_jobs(
+    db: Session,
+    *,
+    worker_id: str,
+    limit: int,
+    lease_seconds: int,
+) -> List[JobQueueEntry]:
+    """
+    claim کردن حداکثر `limit` ردیف آزاد از صف برای یک worker.
+
+    روی PostgreSQL از `SELECT ... FOR UPDATE SKIP LOCKED` استفاده می‌شود تا
+    worker ها منتظر هم نمانند. روی SQLite این بخش نادیده گرفته می‌شود، پس
+    خود UPDATE هم شرط آزاد بودن را دوباره چک می‌کند و فقط ردیف‌هایی که
+    واقعا claim شده‌اند برگردانده می‌شوند.
+    """
+    if limit <= 0:
+        return []
+
+    now = datetime.utcnow()
+    is_free = or_(
+        JobQueueEntry.lease_expires_at.is_(None),
+        JobQueueEntry.lease_expires_at < now,
+    )
+
+    candidate_ids = db.execute(
+        select(JobQueueEntry.id)
+        .where(is_free)
+        .order_by(JobQueueEntry.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    if not candidate_ids:
+        db.commit()
+        return []
+
+    claimed_ids = db.execute(
+        update(JobQueueEntry)
+        .where(JobQueueEntry.id.in_(candidate_ids), is_free)
+        .values(
+            claimed_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=JobQueueEntry.attempts + 1,
+        )
+        .returning(JobQueueEntry.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+
+    if not claimed_ids:
+        return []
+
+    return (
+        db.query(JobQueueEntry)
+        .filter(JobQueueEntry.id.in_(claimed_ids))
+        .order_by(JobQueueEntry.id)
+        .all()
+    )
+
+
+def ack_job(db: Session, *, entry_id: int, worker_id: str) -> None:
+    """
+    حذف ردیف از صف بعد از پایان اجرا.
+
+    فقط worker ای که هنوز صاحب lease است می‌تواند ردیف را حذف کند.
+    """
+    db.execute(
+        delete(JobQueueEntry)
+        .where(
+            JobQueueEntry.id == entry_id,
+            JobQueueEntry.claimed_by == worker_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def dequeue_job(db: Session, job_id: int) -> None:
+    """
+    حذف ردیف صف یک Job (مثلا موقع preempt) بدون commit.
+
+    worker ای که Job را claim کرده بود دیگر ردیفی برای ack ندارد، پس
+    نتیجه اجرای قدیمی‌اش نادیده گرفته می‌شود (write_outcomes).
+    """
+    db.execute(
+        delete(JobQueueEntry)
+        .where(JobQueueEntry.job_id == job_id)
+        .execution_options(synchronize_session=False)
+    )
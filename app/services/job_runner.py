@@ -1,63 +1,282 @@
 # app/services/job_runner.py
 from __future__ import annotations
 
+import asyncio
 import random
-import time
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
-from app.models.job import Job, JobStatus
+from app.models.job import Job
+from app.models.job_queue import JobQueueEntry
 from app.core.logging import logger
+from app.services.lifecycle import bulk_apply_transition
+from app.services.placement import release_gpus_for_jobs
 
+SUCCESS_RATE = 0.8
+MAX_SIMULATED_SECONDS = 10
 
-def simulate_job_run(job_id: int, estimated_hours: float, num_gpus: int) -> None:
+# ردیف صفی که اجرای Job برایش claim شده: (id، enqueued_at)
+_Claim = Tuple[Optional[int], Optional[datetime]]
+
+
+def simulated_seconds(estimated_hours: float, num_gpus: int) -> float:
+    """مدت شبیه‌سازی (ثانیه واقعی) برای یک Job."""
+    seconds = int(estimated_hours * num_gpus)
+    return max(1, min(seconds, MAX_SIMULATED_SECONDS))
+
+
+@dataclass
+class JobOutcome:
+    job_id: int
+    succeeded: bool
+    finished_at: datetime
+    queue_entry_id: Optional[int] = None
+    worker_id: Optional[str] = None
+    # enqueued_at ردیف صف claim‌شده؛ SQLite شناسه ردیف حذف‌شده را دوباره
+    # استفاده می‌کند، پس id به تنهایی اجرای قدیمی را از جدید جدا نمی‌کند
+    enqueued_at: Optional[datetime] = None
+
+
+def _owns(outcome: JobOutcome, entry: Optional[tuple]) -> bool:
+    """entry: (claimed_by، enqueued_at) ردیف صف فعلی با همان id، یا None"""
+    if entry is None or entry[0] != outcome.worker_id:
+        return False
+    return outcome.enqueued_at is None or entry[1] == outcome.enqueued_at
+
+
+def write_outcomes(db: Session, outcomes: List[JobOutcome]) -> int:
     """
-    شبیه‌سازی اجرای Job در بک‌گراند.
+    ثبت دسته‌ای نتیجه Job ها: یک UPDATE برای موفق‌ها، یک UPDATE برای
+    ناموفق‌ها، آزادسازی GPU ها و حذف ردیف‌های صف، همه در یک تراکنش.
+
+    فقط Job هایی که هنوز RUNNING هستند تغییر می‌کنند (مثلا اگر ادمین
+    وسط اجرا Job را دستی complete کرده باشد دست نمی‌خورد). نتیجه‌ای که
+    ردیف صفش دیگر متعلق به این worker نیست (Job وسط اجرا preempt شده یا
+    lease به worker دیگری رسیده، یا ردیف با همان id برای اجرای بعدی دوباره
+    ساخته شده) کنار گذاشته می‌شود تا GPU های اجرای جدید آزاد نشوند.
+
+    Returns:
+        تعداد Job هایی که وضعیتشان تغییر کرد
     """
-    try:
-        logger.info(f"Job {job_id} started | GPUs={num_gpus} | hours={estimated_hours}")
+    if not outcomes:
+        return 0
+
+    claimed = [o for o in outcomes if o.queue_entry_id]
+    if claimed:
+        owned = {
+            entry_id: (claimed_by, enqueued_at)
+            for entry_id, claimed_by, enqueued_at in db.query(
+                JobQueueEntry.id, JobQueueEntry.claimed_by, JobQueueEntry.enqueued_at
+            ).filter(JobQueueEntry.id.in_([o.queue_entry_id for o in claimed]))
+        }
+        outcomes = [
+            o
+            for o in outcomes
+            if not o.queue_entry_id or _owns(o, owned.get(o.queue_entry_id))
+        ]
+        if not outcomes:
+            db.commit()
+            return 0
 
+    finished_at = max(o.finished_at for o in outcomes)
+    changed: List[int] = []
+    for succeeded, action, error in (
+        (True, "complete", None),
+        (False, "fail", "Simulated GPU failure"),
+    ):
+        ids = [o.job_id for o in outcomes if o.succeeded is succeeded]
+        if not ids:
+            continue
+        changed += bulk_apply_transition(
+            db, action, Job.id.in_(ids), now=finished_at, error_message=error
+        )
 
-        print(f"[JOB-RUNNER] Starting simulation for job_id={job_id} "
-              f"(estimated_hours={estimated_hours}, num_gpus={num_gpus})",
-              flush=True)
+    # GPU های Job هایی که دستی تمام شده‌اند قبلا آزاد شده‌اند
+    release_gpus_for_jobs(db, changed)
 
-        simulated_seconds = int(estimated_hours * num_gpus)
-        simulated_seconds = max(1, min(simulated_seconds, 10))
+    for worker_id in {o.worker_id for o in outcomes if o.queue_entry_id}:
+        entry_ids = [
+            o.queue_entry_id
+            for o in outcomes
+            if o.queue_entry_id and o.worker_id == worker_id
+        ]
+        db.execute(
+            delete(JobQueueEntry)
+            .where(
+                JobQueueEntry.id.in_(entry_ids),
+                JobQueueEntry.claimed_by == worker_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
-        print(f"[JOB-RUNNER] Sleeping for {simulated_seconds} seconds", flush=True)
-        time.sleep(simulated_seconds)
+    db.commit()
+    return len(changed)
 
-        db: Session = SessionLocal()
-        try:
-            job = db.query(Job).filter(Job.id == job_id).first()
-            if job is None:
-                print(f"[JOB-RUNNER] Job {job_id} not found in DB", flush=True)
-                return
 
-            if job.status != JobStatus.RUNNING:
-                print(f"[JOB-RUNNER] Job {job_id} status is {job.status}, "
-                      f"not RUNNING. Skipping.", flush=True)
+class AsyncJobRunner:
+    """
+    موتور شبیه‌سازی مبتنی بر asyncio.
+
+    هر Job فقط یک timer (`loop.call_later`) روی event loop است، نه یک
+    thread؛ پس ده‌ها هزار Job همزمان روی یک loop جا می‌شوند. نتیجه‌ها در
+    یک بافر جمع می‌شوند و یک task جداگانه آن‌ها را دسته‌ای (هر
+    `flush_interval` ثانیه یا با پر شدن `batch_size`) در دیتابیس می‌نویسد.
+    نوشتن در thread جدا (`asyncio.to_thread`) انجام می‌شود تا loop بلاک نشود.
+
+    timer هر Job همراه با ردیف صفی که برایش claim شده (id و enqueued_at؛
+    SQLite شناسه ردیف حذف‌شده را دوباره استفاده می‌کند) نگه داشته می‌شود:
+    اگر Job وسط اجرا preempt شود و همین worker ردیف صف اجرای بعدی را claim
+    کند، timer قدیمی لغو و با timer اجرای جدید جایگزین می‌شود.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Optional[Callable[[], Session]] = None,
+        duration_fn: Callable[[float, int], float] = simulated_seconds,
+        flush_interval: float = 0.2,
+        batch_size: int = 500,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._duration_fn = duration_fn
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._rng = rng or random.Random()
+
+        # job_id -> ((id، enqueued_at) ردیف صف، timer)
+        self._timers: Dict[int, Tuple[_Claim, asyncio.TimerHandle]] = {}
+        self._pending: List[JobOutcome] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.completed = 0
+        self.batches_written = 0
+        self.peak_in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._timers)
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    def submit(
+        self,
+        *,
+        job_id: int,
+        estimated_hours: float,
+        num_gpus: int,
+        queue_entry_id: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        enqueued_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        زمان‌بندی پایان یک Job روی event loop. claim دوباره همان ردیف صف
+        نادیده گرفته می‌شود؛ ردیف صف جدید (اجرای بعد از preempt) timer قبلی
+        را جایگزین می‌کند.
+        """
+        claim = (queue_entry_id, enqueued_at)
+        current = self._timers.get(job_id)
+        if current is not None:
+            if current[0] == claim:
                 return
+            # ردیف صف قبلی حذف شده و نتیجه‌اش به هر حال نوشته نمی‌شد
+            current[1].cancel()
+        loop = asyncio.get_running_loop()
+        delay = self._duration_fn(estimated_hours, num_gpus)
+        self._timers[job_id] = (
+            claim,
+            loop.call_later(delay, self._finish, job_id, claim, worker_id),
+        )
+        self.peak_in_flight = max(self.peak_in_flight, len(self._timers))
+        logger.info(f"Job {job_id} started | GPUs={num_gpus} | hours={estimated_hours}")
+
+    def _finish(
+        self,
+        job_id: int,
+        claim: _Claim,
+        worker_id: Optional[str],
+    ) -> None:
+        current = self._timers.get(job_id)
+        if current is not None and current[0] == claim:
+            del self._timers[job_id]
+        queue_entry_id, enqueued_at = claim
+        succeeded = self._rng.random() < SUCCESS_RATE
+        self._pending.append(
+            JobOutcome(
+                job_id=job_id,
+                succeeded=succeeded,
+                finished_at=datetime.utcnow(),
+                queue_entry_id=queue_entry_id,
+                worker_id=worker_id,
+                enqueued_at=enqueued_at,
+            )
+        )
+        if len(self._pending) >= self._batch_size and self._wakeup is not None:
+            self._wakeup.set()
 
-            if random.random() < 0.8:
-                job.status = JobStatus.COMPLETED
-                logger.info(f"Job {job_id} completed successfully")
+    async def _flush_loop(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self._stopping and not self._timers and not self._pending:
+                return
 
-                job.error_message = None
-                print(f"[JOB-RUNNER] Job {job_id} COMPLETED", flush=True)
-            else:
-                job.status = JobStatus.FAILED
-                logger.error(f"Job {job_id} failed")
-                job.error_message = "Simulated GPU failure"
-                print(f"[JOB-RUNNER] Job {job_id} FAILED", flush=True)
+    async def flush(self) -> None:
+        while self._pending:
+            batch = self._pending[: self._batch_size]
+            del self._pending[: self._batch_size]
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                # ردیف‌های صف ack نشده‌اند؛ بعد از پایان lease دوباره اجرا می‌شوند
+                logger.error(f"Failed to write {len(batch)} job outcomes: {e}")
+                continue
+            self.completed += len(batch)
+            self.batches_written += 1
 
-            job.finished_at = datetime.utcnow()
-            db.commit()
+    def _write_batch(self, batch: List[JobOutcome]) -> None:
+        factory = self._session_factory or SessionLocal
+        db = factory()
+        try:
+            write_outcomes(db, batch)
         finally:
             db.close()
-    except Exception as e:
-        print(f"[JOB-RUNNER] Exception in simulate_job_run(job_id={job_id}): {e}",
-              flush=True)
+        for outcome in batch:
+            status = "COMPLETED" if outcome.succeeded else "FAILED"
+            logger.info(f"Job {outcome.job_id} {status}")
+
+    async def stop(self, *, drain: bool = True) -> None:
+        """
+        توقف موتور. با drain=True منتظر می‌ماند تا همه Job ها تمام و
+        نتیجه‌شان نوشته شود؛ در غیر این صورت timer ها لغو می‌شوند و ردیف‌های
+        صف بعد از پایان lease توسط worker دیگری برداشته می‌شوند.
+        """
+        if not drain:
+            for _, handle in self._timers.values():
+                handle.cancel()
+            self._timers.clear()
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._flusher is not None:
+            await self._flusher
+            self._flusher = None
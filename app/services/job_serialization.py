@@ -0,0 +1,141 @@
+# app/services/job_serialization.py
+"""
+مسیر سریع خروجی لیست Job ها.
+
+به جای ساختن شیء ORM و اعتبارسنجی هر ردیف با JobRead، فقط ستون‌های JobRead
+به صورت tuple خوانده می‌شوند و مستقیما با orjson (در صورت نصب بودن) به JSON
+تبدیل می‌شوند. برای خروجی‌های بزرگ، ردیف‌ها دسته به دسته (keyset) خوانده و
+به صورت NDJSON یا تکه‌های یک آرایه JSON stream می‌شوند تا حافظه به اندازه
+یک دسته محدود بماند.
+
+با fields فقط ستون‌های خواسته‌شده SELECT می‌شوند؛ لیست‌ها به طور پیش‌فرض
+ستون‌های Text سنگین (HEAVY_FIELDS) را نمی‌خوانند.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.schemas.job import JobRead
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson اختیاری است
+    orjson = None
+
+# ستون‌ها به همان ترتیب فیلدهای JobRead
+JOB_FIELDS: Sequence[str] = tuple(JobRead.model_fields)
+JOB_COLUMNS = tuple(getattr(Job, field) for field in JOB_FIELDS)
+
+# ستون‌های Text بدون سقف؛ در لیست‌ها فقط با درخواست صریح (fields=) خوانده می‌شوند
+HEAVY_FIELDS = frozenset({"command", "data_location", "error_message"})
+LIST_FIELDS: Sequence[str] = tuple(f for f in JOB_FIELDS if f not in HEAVY_FIELDS)
+# ستون‌های keyset همیشه خوانده می‌شوند تا cursor صفحه بعد ساخته شود
+_KEYSET_FIELDS = ("created_at", "id")
+
+EXPORT_FORMATS = ("ndjson", "json")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def parse_fields(
+    fields: Optional[str], default: Sequence[str] = LIST_FIELDS
+) -> Tuple[str, ...]:
+    """
+    تبدیل پارامتر `fields=id,name,status` به لیست فیلدهای JobRead.
+
+    Raises:
+        ValueError: اگر فیلد ناشناخته‌ای خواسته شده باشد
+    """
+    requested = [f.strip() for f in (fields or "").split(",") if f.strip()]
+    if not requested:
+        return tuple(default)
+    unknown = sorted(set(requested) - set(JOB_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(requested))
+
+
+def job_columns(fields: Sequence[str] = JOB_FIELDS) -> tuple:
+    """
+    ستون‌های SELECT برای fields؛ ستون‌های keyset اگر خواسته نشده باشند به
+    انتها اضافه می‌شوند (و در خروجی نمی‌آیند، چون zip روی fields است).
+    """
+    extra = tuple(f for f in _KEYSET_FIELDS if f not in fields)
+    return tuple(getattr(Job, field) for field in (*fields, *extra))
+
+
+def row_to_dict(row: Sequence[Any], fields: Sequence[str] = JOB_FIELDS) -> dict:
+    return dict(zip(fields, row))
+
+
+def render_jobs(
+    rows: Iterable[Sequence[Any]], fields: Sequence[str] = JOB_FIELDS
+) -> bytes:
+    """آرایه JSON از ردیف‌های job_columns(fields)."""
+    return dumps([row_to_dict(row, fields) for row in rows])
+
+
+def stream_jobs(
+    bind: Engine | Connection,
+    criteria: List[Any],
+    *,
+    fmt: str = "ndjson",
+    batch_size: int = 1000,
+    cursor: Optional[tuple] = None,
+    fields: Sequence[str] = JOB_FIELDS,
+) -> Iterator[bytes]:
+    """
+    همه Job های منطبق با criteria (جدیدترین اول) به صورت تکه‌های bytes.
+
+    هر دسته یک کوئری keyset جدا روی (created_at, id) است و session خودش را
+    دارد؛ پس stream به session درخواست (که بعد از پاسخ بسته می‌شود) وابسته
+    نیست و هیچ cursor طولانی‌ای روی دیتابیس باز نمی‌ماند.
+    """
+    if fmt == "json":
+        yield b"["
+    first = True
+    columns = job_columns(fields)
+    db = Session(bind=bind, autoflush=False)
+    try:
+        while True:
+            query = db.query(*columns).filter(*criteria)
+            if cursor is not None:
+                query = query.filter(tuple_(Job.created_at, Job.id) < tuple_(*cursor))
+            rows = (
+                query.order_by(Job.created_at.desc(), Job.id.desc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            if fmt == "ndjson":
+                yield b"".join(dumps(row_to_dict(row, fields)) + b"\n" for row in rows)
+            else:
+                chunk = render_jobs(rows, fields)[1:-1]
+                yield chunk if first else b"," + chunk
+            first = False
+            cursor = (rows[-1].created_at, rows[-1].id)
+            if len(rows) < batch_size:
+                break
+    finally:
+        db.close()
+    if fmt == "json":
+        yield b"]"
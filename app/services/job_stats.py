@@ -0,0 +1,293 @@
+# app/services/job_stats.py
+"""
+آمار تجمیعی Job ها (جدول job_stats_rollups).
+
+هر Job جدید و هر تغییر وضعیت (app.services.lifecycle) تغییر آمار را در
+session ثبت می‌کند: 1- از ردیف وضعیت قبلی و 1+ به ردیف وضعیت جدید. gpu_hours
+مصرف واقعی است، همان مقداری که در دفتر سهمیه تسویه می‌شود
+(lifecycle.used_gpu_hours): فقط وقتی Job با complete / fail تمام می‌شود به
+ردیف COMPLETED / FAILED اضافه می‌شود و Job های دیگر GPU-hour ای ندارند.
+درست قبل از commit همه تغییرات با یک upsert اعمال می‌شوند؛ پس آمار در همان تراکنش تغییر Job ها به‌روز می‌شود و با rollback
+برمی‌گردد، و خواندن آمار به تعداد Job ها بستگی ندارد.
+
+بازسازی کامل از روی جدول jobs:
+    python -m app.services.job_stats --backfill
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, event, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.models.job import Job, JobStatus
+from app.models.job_stats import JobStatsRollup
+
+_PENDING_KEY = "job_stats_deltas"
+_UPSERT_CHUNK = 500
+
+# ستون‌هایی که /admin/stats می‌تواند بر اساسشان گروه‌بندی کند
+GROUP_COLUMNS = {
+    "day": JobStatsRollup.day,
+    "user_id": JobStatsRollup.user_id,
+    "gpu_type": JobStatsRollup.gpu_type,
+    "status": JobStatsRollup.status,
+}
+
+# ستون‌های Job که برای محاسبه آمار لازم است (مثلا در RETURNING)
+STATS_COLUMNS = (
+    Job.created_at,
+    Job.user_id,
+    Job.gpu_type,
+    Job.num_gpus,
+)
+
+_Key = Tuple[date, int, str, JobStatus]
+
+
+def _day(created_at: Optional[datetime]) -> date:
+    if created_at is None:
+        return datetime.utcnow().date()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def track_job_stats(
+    db: Session,
+    jobs: Iterable[Any],
+    *,
+    old_status: Optional[JobStatus],
+    new_status: JobStatus,
+    used_hours: Optional[Callable[[Any], float]] = None,
+) -> None:
+    """
+    ثبت تغییر آمار (بدون نوشتن در دیتابیس؛ موقع commit اعمال می‌شود).
+
+    Args:
+        jobs: شیء Job یا ردیف‌هایی با ستون‌های STATS_COLUMNS
+        old_status: وضعیت قبلی؛ None برای Job جدید. وضعیت‌های پایانی
+            تغییر نمی‌کنند، پس ردیف وضعیت قبلی GPU-hour ای از دست نمی‌دهد
+        used_hours: GPU-hour مصرف‌شده هر Job وقتی تمام می‌شود
+    """
+    deltas: Dict[_Key, List[float]] = db.info.setdefault(
+        _PENDING_KEY, defaultdict(lambda: [0, 0.0])
+    )
+    for job in jobs:
+        day = _day(job.created_at)
+        if old_status is not None:
+            deltas[(day, job.user_id, job.gpu_type, JobStatus(old_status))][0] -= 1
+        delta = deltas[(day, job.user_id, job.gpu_type, JobStatus(new_status))]
+        delta[0] += 1
+        if used_hours is not None:
+            delta[1] += used_hours(job)
+
+
+def _upsert_rows(db: Session, rows: List[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        for start in range(0, len(rows), _UPSERT_CHUNK):
+            stmt = dialect_insert(JobStatsRollup).values(rows[start:start + _UPSERT_CHUNK])
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[
+                        JobStatsRollup.day,
+                        JobStatsRollup.user_id,
+                        JobStatsRollup.gpu_type,
+                        JobStatsRollup.status,
+                    ],
+                    set_={
+                        "job_count": JobStatsRollup.job_count + stmt.excluded.job_count,
+                        "gpu_hours": JobStatsRollup.gpu_hours + stmt.excluded.gpu_hours,
+                    },
+                )
+            )
+        return
+
+    # دیتابیس‌های دیگر: UPDATE و در صورت نبودن ردیف، INSERT
+    for row in rows:
+        result = db.execute(
+            update(JobStatsRollup)
+            .where(
+                JobStatsRollup.day == row["day"],
+                JobStatsRollup.user_id == row["user_id"],
+                JobStatsRollup.gpu_type == row["gpu_type"],
+                JobStatsRollup.status == row["status"],
+            )
+            .values(
+                job_count=JobStatsRollup.job_count + row["job_count"],
+                gpu_hours=JobStatsRollup.gpu_hours + row["gpu_hours"],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(JobStatsRollup).values(**row))
+
+
+def apply_job_stats(db: Session, deltas: Dict[_Key, List[float]]) -> None:
+    # ترتیب ثابت کلیدها: دو تراکنش همزمان روی ردیف‌ها deadlock نمی‌کنند
+    rows = [
+        {
+            "day": day,
+            "user_id": user_id,
+            "gpu_type": gpu_type,
+            "status": status,
+            "job_count": count,
+            "gpu_hours": hours,
+        }
+        for (day, user_id, gpu_type, status), (count, hours) in sorted(deltas.items())
+        if count != 0 or abs(hours) > 1e-9
+    ]
+    if rows:
+        _upsert_rows(db, rows)
+
+
+def used_gpu_hours_sql(dialect: str):
+    """
+    نسخه SQL از lifecycle.used_gpu_hours روی ستون‌های jobs: برای Job های
+    COMPLETED / FAILED پیشرفت قبل از preempt ها به علاوه started_at تا
+    finished_at، ضرب در تعداد GPU؛ برای بقیه صفر.
+    """
+    if dialect == "postgresql":
+        elapsed = func.extract("epoch", Job.finished_at - Job.started_at) / 3600
+    else:
+        elapsed = (func.julianday(Job.finished_at) - func.julianday(Job.started_at)) * 24
+    return case(
+        (
+            Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED]),
+            (func.coalesce(Job.progress_hours, 0.0) + func.coalesce(elapsed, 0.0))
+            * Job.num_gpus,
+        ),
+        else_=0.0,
+    )
+
+
+def rebuild_job_stats(db: Session) -> int:
+    """
+    بازسازی کامل آمار از روی جدول jobs (بدون commit).
+
+    روی PostgreSQL جدول آمار قفل می‌شود: تراکنش‌های همزمانی که Job تغییر
+    می‌دهند قبل از commit (موقع upsert آمار) منتظر می‌مانند و تغییرشان بعد
+    از بازسازی روی نتیجه اعمال می‌شود؛ پس چیزی دو بار یا هیچ بار شمرده
+    نمی‌شود.
+
+    Returns:
+        تعداد ردیف‌های آمار
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(text("LOCK TABLE job_stats_rollups IN EXCLUSIVE MODE"))
+        day = func.date(func.timezone("UTC", Job.created_at))
+    else:
+        day = func.date(Job.created_at)
+
+    db.execute(delete(JobStatsRollup).execution_options(synchronize_session=False))
+    db.execute(
+        insert(JobStatsRollup).from_select(
+            ["day", "user_id", "gpu_type", "status", "job_count", "gpu_hours"],
+            select(
+                day,
+                Job.user_id,
+                Job.gpu_type,
+                Job.status,
+                func.count(),
+                func.sum(used_gpu_hours_sql(dialect)),
+            ).group_by(day, Job.user_id, Job.gpu_type, Job.status),
+        )
+    )
+    return db.query(func.count()).select_from(JobStatsRollup).scalar()
+
+
+def query_job_stats(
+    db: Session,
+    group_by: Sequence[str],
+    *,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    user_id: Optional[int] = None,
+    gpu_type: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+) -> List[dict]:
+    """
+    جمع job_count و gpu_hours (مصرف واقعی) به تفکیک group_by (بازه روزها شامل هر دو سر).
+
+    Raises:
+        KeyError: اگر ستون گروه‌بندی ناشناخته باشد
+    """
+    columns = [GROUP_COLUMNS[name] for name in group_by]
+    query = select(
+        *columns,
+        func.sum(JobStatsRollup.job_count),
+        func.sum(JobStatsRollup.gpu_hours),
+    )
+    if since is not None:
+        query = query.where(JobStatsRollup.day >= since)
+    if until is not None:
+        query = query.where(JobStatsRollup.day <= until)
+    if user_id is not None:
+        query = query.where(JobStatsRollup.user_id == user_id)
+    if gpu_type is not None:
+        query = query.where(JobStatsRollup.gpu_type == gpu_type)
+    if status is not None:
+        query = query.where(JobStatsRollup.status == status)
+    query = (
+        query.group_by(*columns)
+        .having(func.sum(JobStatsRollup.job_count) > 0)
+        .order_by(*columns)
+    )
+
+    groups = []
+    for row in db.execute(query):
+        group = dict(zip(group_by, row[: len(group_by)]))
+        group["job_count"] = int(row[-2])
+        group["gpu_hours"] = round(row[-1] or 0.0, 6)
+        groups.append(group)
+    return groups
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_pending_stats(session: Session) -> None:
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if deltas:
+        apply_job_stats(session, deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_stats(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Job stats rollups")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="آمار را از روی همه Job ها دوباره بساز",
+    )
+    args = parser.parse_args(argv)
+    if not args.backfill:
+        parser.print_help()
+        return
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_job_stats(db)
+        db.commit()
+    finally:
+        db.close()
+    logger.info(f"Rebuilt job stats rollups ({rows} rows)")
+
+
+
+if __name__ == "__main__":
+    main()
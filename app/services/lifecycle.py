@@ -0,0 +1,285 @@
+# app/services/lifecycle.py
+"""
+جدول مرکزی چرخه حیات Job.
+
+همه تغییر وضعیت‌ها (API ادمین، worker ها و شبیه‌ساز) از همین جدول
+استفاده می‌کنند تا قوانین فقط یک جا تعریف شده باشند.
+
+روی دیتابیس، هر تغییر وضعیت یک compare-and-swap است:
+`UPDATE jobs SET ... WHERE id = ? AND status IN (...) RETURNING *`؛ پس
+ادمین‌ها، زمان‌بند و worker های موازی نمی‌توانند تغییر همدیگر را بازنویسی
+کنند و صدا زننده به جای exception یک TransitionResult می‌گیرد. هر تغییر
+موفق شمارنده تغییرات (app.services.change_versions) و آمار تجمیعی
+(app.services.job_stats) را به‌روز می‌کند و بعد از commit به subscriber
+های SSE (app.services.job_events) می‌رسد. reject، fail و complete مصرف
+واقعی Job را برای تسویه سهمیه (app.services.quota) و آمار ثبت می‌کنند.
+"""
+from __future__ import annotations
+
+import enum
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.job import Job, JobStatus
+from app.services.change_versions import mark_jobs_changed
+from app.services.job_events import JobEvent, publish_job_events
+from app.services.job_stats import STATS_COLUMNS, track_job_stats
+from app.services.quota import settle_quota
+
+# action -> (وضعیت‌های مجاز قبلی، وضعیت جدید)
+# هر action دقیقا یک وضعیت مبدا دارد؛ آمار تجمیعی (job_stats) بدون خواندن
+# دوباره ردیف، وضعیت قبلی را از همین جا می‌فهمد
+TRANSITIONS: Dict[str, Tuple[FrozenSet[JobStatus], JobStatus]] = {
+    "approve": (frozenset({JobStatus.PENDING}), JobStatus.APPROVED),
+    "reject": (frozenset({JobStatus.PENDING}), JobStatus.REJECTED),
+    "start": (frozenset({JobStatus.APPROVED}), JobStatus.RUNNING),
+    "complete": (frozenset({JobStatus.RUNNING}), JobStatus.COMPLETED),
+    "fail": (frozenset({JobStatus.RUNNING}), JobStatus.FAILED),
+    # Job با checkpoint متوقف می‌شود و با پیشرفت ذخیره‌شده به صف برمی‌گردد
+    "preempt": (frozenset({JobStatus.RUNNING}), JobStatus.APPROVED),
+}
+
+# action هایی که Job را تمام می‌کنند و مصرفش تسویه می‌شود
+METERED_ACTIONS = frozenset({"reject", "complete", "fail"})
+
+# ستون‌های Job که برای اندازه‌گیری مصرف لازم است (مثلا در RETURNING)
+QUOTA_COLUMNS = (Job.started_at, Job.progress_hours)
+
+
+class InvalidTransition(Exception):
+    """وقتی action در وضعیت فعلی Job مجاز نیست."""
+
+    def __init__(self, job_id: Optional[int], action: str, current: JobStatus):
+        self.job_id = job_id
+        self.action = action
+        self.current = current
+        super().__init__(f"Cannot {action} a job in status {current}")
+
+
+class TransitionOutcome(str, enum.Enum):
+    APPLIED = "APPLIED"
+    CONFLICT = "CONFLICT"        # وضعیت فعلی اجازه این action را نمی‌دهد
+    NOT_FOUND = "NOT_FOUND"
+
+
+@dataclass
+class TransitionResult:
+    outcome: TransitionOutcome
+    job_id: int
+    action: str
+    # Job بعد از تغییر (فقط برای APPLIED، مستقیما از RETURNING)
+    job: Optional[Job] = None
+    # وضعیتی که باعث conflict شد
+    current: Optional[JobStatus] = None
+
+    @property
+    def applied(self) -> bool:
+        return self.outcome == TransitionOutcome.APPLIED
+
+    def error(self) -> InvalidTransition:
+        return InvalidTransition(self.job_id, self.action, self.current)
+
+
+def _source_status(action: str) -> JobStatus:
+    (source,) = TRANSITIONS[action][0]
+    return source
+
+
+def _transition_values(
+    new_status: JobStatus,
+    now: datetime,
+    error_message: Optional[str],
+) -> Dict[str, Any]:
+    """مقادیر ستون‌ها برای رسیدن به new_status (مشترک بین مسیرهای SQL)."""
+    values: Dict[str, Any] = {"status": new_status, "updated_at": now}
+    if new_status == JobStatus.RUNNING:
+        values.update(started_at=now, finished_at=None)
+    elif new_status in (JobStatus.COMPLETED, JobStatus.FAILED):
+        values["finished_at"] = now
+    if new_status == JobStatus.FAILED:
+        values["error_message"] = error_message
+    elif new_status == JobStatus.COMPLETED:
+        values["error_message"] = None
+    return values
+
+
+def preempted_progress(job: Job, now: datetime) -> float:
+    """پیشرفت ذخیره‌شده Job بعد از preempt در لحظه now (ساعت)."""
+    started_at = job.started_at or now
+    if started_at.tzinfo is not None:
+        started_at = started_at.replace(tzinfo=None)
+    elapsed = max((now - started_at).total_seconds() / 3600, 0.0)
+    return (job.progress_hours or 0.0) + elapsed
+
+
+def used_gpu_hours(job: Any, action: str, now: datetime) -> float:
+    """
+    مصرف واقعی Job که با action در لحظه now تمام می‌شود (GPU-hour).
+
+    reject: صفر. complete / fail: زمان اجرا از started_at تا now به علاوه
+    پیشرفت قبل از preempt ها، ضرب در تعداد GPU (بدون سقف estimated_hours).
+    """
+    if action == "reject":
+        return 0.0
+    return preempted_progress(job, now) * job.num_gpus
+
+
+def _usage_of(action: str, now: datetime):
+    """GPU-hour مصرف‌شده هر Job برای آمار؛ None اگر action آن را تمام نمی‌کند."""
+    if action not in ("complete", "fail"):
+        return None
+    return lambda job: used_gpu_hours(job, action, now)
+
+
+def _meter_usage(db: Session, jobs, action: str, now: datetime) -> None:
+    if action in METERED_ACTIONS:
+        settle_quota(
+            db,
+            ((job.user_id, job.id, used_gpu_hours(job, action, now)) for job in jobs),
+            kind="refund" if action == "reject" else "usage",
+        )
+
+
+def apply_transition(
+    job: Job,
+    action: str,
+    *,
+    now: Optional[datetime] = None,
+    error_message: Optional[str] = None,
+) -> Job:
+    """
+    اعمال یک action روی Job (بدون commit) همراه با زمان‌های مربوطه.
+
+    Raises:
+        InvalidTransition: اگر وضعیت فعلی Job اجازه این action را ندهد
+        KeyError: اگر action ناشناخته باشد
+    """
+    allowed_from, new_status = TRANSITIONS[action]
+    if job.status not in allowed_from:
+        raise InvalidTransition(job.id, action, job.status)
+
+    now = now or datetime.utcnow()
+    if action == "preempt":
+        job.progress_hours = preempted_progress(job, now)
+        job.preemptions = (job.preemptions or 0) + 1
+
+    for column, value in _transition_values(new_status, now, error_message).items():
+        setattr(job, column, value)
+    return job
+
+
+def transition(
+    db: Session,
+    job_id: int,
+    action: str,
+    *,
+    now: Optional[datetime] = None,
+    error_message: Optional[str] = None,
+    progress_hours: Optional[float] = None,
+) -> TransitionResult:
+    """
+    اعمال action با یک UPDATE شرطی (compare-and-swap)، بدون commit.
+
+    فقط اگر وضعیت فعلی Job جزو وضعیت‌های مجاز باشد ردیف تغییر می‌کند و
+    Job جدید مستقیما از RETURNING خوانده می‌شود (بدون SELECT/refresh). فقط
+    وقتی تغییری رخ نداده یک SELECT برای تشخیص conflict / not found انجام
+    می‌شود.
+
+    Args:
+        progress_hours: برای preempt لازم است (پیشرفت محاسبه‌شده از همان
+            اجرایی که صدا زننده دیده است، مثلا با preempted_progress)
+
+    Raises:
+        KeyError: اگر action ناشناخته باشد
+    """
+    allowed_from, new_status = TRANSITIONS[action]
+    now = now or datetime.utcnow()
+    values = _transition_values(new_status, now, error_message)
+    if action == "preempt":
+        if progress_hours is None:
+            raise ValueError("preempt requires progress_hours")
+        values.update(progress_hours=progress_hours, preemptions=Job.preemptions + 1)
+
+    job = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status.in_(allowed_from))
+        .values(**values)
+        .returning(Job),
+        execution_options={"populate_existing": True},
+    ).scalars().first()
+    if job is not None:
+        mark_jobs_changed(db, [job.user_id])
+        publish_job_events(db, [JobEvent.for_job(job, action)])
+        track_job_stats(
+            db,
+            [job],
+            old_status=_source_status(action),
+            new_status=new_status,
+            used_hours=_usage_of(action, now),
+        )
+        _meter_usage(db, [job], action, now)
+        return TransitionResult(TransitionOutcome.APPLIED, job_id, action, job=job)
+
+    current = db.query(Job.status).filter(Job.id == job_id).scalar()
+    if current is None:
+        return TransitionResult(TransitionOutcome.NOT_FOUND, job_id, action)
+    return TransitionResult(TransitionOutcome.CONFLICT, job_id, action, current=current)
+
+
+def bulk_apply_transition(
+    db: Session,
+    action: str,
+    *criteria,
+    now: Optional[datetime] = None,
+    error_message: Optional[str] = None,
+) -> List[int]:
+    """
+    نسخه set-based از apply_transition: یک
+    `UPDATE jobs ... WHERE <criteria> AND status IN (...) RETURNING id`
+    (بدون commit). Job هایی که وضعیتشان اجازه action را نمی‌دهد، یا
+    همزمان تغییر کرده‌اند، دست نمی‌خورند.
+
+    preempt به محاسبه پیشرفت هر Job نیاز دارد و اینجا پشتیبانی نمی‌شود.
+
+    Returns:
+        شناسه Job هایی که تغییر کردند
+    """
+    if action == "preempt":
+        raise ValueError("preempt cannot be applied in bulk")
+    allowed_from, new_status = TRANSITIONS[action]
+    now = now or datetime.utcnow()
+    values = _transition_values(new_status, now, error_message)
+    rows = db.execute(
+        update(Job)
+        .where(*criteria, Job.status.in_(allowed_from))
+        .values(**values)
+        .returning(Job.id, *STATS_COLUMNS, *QUOTA_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if rows:
+        mark_jobs_changed(db, {row.user_id for row in rows})
+        publish_job_events(
+            db,
+            (
+                JobEvent(row.id, row.user_id, action, new_status.value, now.isoformat())
+                for row in rows
+            ),
+        )
+        track_job_stats(
+            db,
+            rows,
+            old_status=_source_status(action),
+            new_status=new_status,
+            used_hours=_usage_of(action, now),
+        )
+        _meter_usage(db, rows, action, now)
+    return [row.id for row in rows]
+
+
+def remaining_hours(job: Job) -> float:
+    """کار باقی‌مانده Job (ساعت) با در نظر گرفتن پیشرفت checkpoint شده."""
+    return max(job.estimated_hours - (job.progress_hours or 0.0), 0.0)
@@ -0,0 +1,128 @@
+# app/services/pagination.py
+"""
+صفحه‌بندی keyset برای لیست Job ها.
+
+به جای OFFSET، هر صفحه از آخرین (created_at, id) صفحه قبل ادامه پیدا
+می‌کند:
+    WHERE (created_at, id) < (:created_at, :id)
+    ORDER BY created_at DESC, id DESC LIMIT :limit
+پس هزینه هر صفحه به عمق آن بستگی ندارد و Job های جدیدی که وسط ورق زدن
+ساخته می‌شوند باعث تکرار یا جا افتادن ردیف نمی‌شوند. cursor برای کلاینت
+مبهم است (base64 از همان دو مقدار).
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models.job import Job
+
+
+def encode_cursor(created_at: datetime, job_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), job_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises:
+        ValueError: اگر cursor معتبر نباشد
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(job_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+@dataclass
+class Page:
+    # شیء Job یا ردیف tuple (هر چیزی که created_at و id دارد)
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+    def headers(self) -> Dict[str, str]:
+        """اطلاعات صفحه در header ها تا بدنه پاسخ همان لیست Job ها بماند."""
+        headers = {}
+        if self.next_cursor is not None:
+            headers["X-Next-Cursor"] = self.next_cursor
+        if self.total is not None:
+            headers["X-Total-Count"] = str(self.total)
+            headers["X-Total-Count-Estimated"] = str(self.total_is_estimate).lower()
+        return headers
+
+
+def paginate_jobs(
+    db: Session,
+    query: Query,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> Page:
+    """
+    Raises:
+        ValueError: اگر cursor معتبر نباشد
+    """
+    items, next_cursor = keyset_page(query, limit=limit, cursor=cursor)
+    page = Page(items=items, next_cursor=next_cursor)
+    if include_total:
+        page.total, page.total_is_estimate = count_jobs(db, query)
+    return page
+
+
+def keyset_page(
+    query: Query,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    یک صفحه از query (جدیدترین اول) و cursor صفحه بعد.
+
+    یک ردیف بیشتر از limit خوانده می‌شود تا بدون COUNT معلوم شود صفحه
+    بعدی وجود دارد یا نه.
+
+    Raises:
+        ValueError: اگر cursor معتبر نباشد
+    """
+    if cursor:
+        query = query.filter(
+            tuple_(Job.created_at, Job.id) < tuple_(*decode_cursor(cursor))
+        )
+    jobs = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1).all()
+    if len(jobs) <= limit:
+        return jobs, None
+    jobs = jobs[:limit]
+    return jobs, encode_cursor(jobs[-1].created_at, jobs[-1].id)
+
+
+def count_jobs(db: Session, query: Query) -> Tuple[int, bool]:
+    """
+    تعداد کل ردیف‌های query.
+
+    روی PostgreSQL از تخمین planner (EXPLAIN) استفاده می‌شود تا لازم نباشد
+    کل جدول شمرده شود؛ روی بقیه دیتابیس‌ها COUNT دقیق.
+
+    Returns:
+        (تعداد، آیا تخمینی است)
+    """
+    stmt = query.with_entities(Job.id).order_by(None).statement
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        compiled = stmt.compile(bind, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+    return int(total or 0), False
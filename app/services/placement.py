@@ -0,0 +1,511 @@
+# app/services/placement.py
+"""
+موتور جایگذاری (placement) Job ها روی GPU های موجود.
+
+ایندکس ظرفیت آزاد در حافظه نگه داشته می‌شود:
+برای هر gpu_type، island ها و node ها بر اساس «تعداد GPU آزاد» در
+bucket ها دسته‌بندی شده‌اند؛ پس هر تصمیم فقط چند bucket کوچک را نگاه
+می‌کند و به تعداد کل GPU ها یا طول صف بستگی ندارد.
+
+سیاست: best-fit
+- اگر Job در یک NVLink island جا شود، island ای با کمترین ظرفیت آزادِ کافی
+  انتخاب می‌شود (island های کامل برای Job های بزرگ دست‌نخورده می‌مانند).
+- در غیر این صورت node ای با کمترین ظرفیت آزادِ کافی انتخاب می‌شود و
+  GPU ها از island های خالی‌تر برداشته می‌شوند تا تعداد island ها کم بماند.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, event, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.gpu import Gpu, GpuNode
+from app.models.job import Job
+
+IslandKey = Tuple[int, int]  # (node_id, nvlink_island)
+
+
+@dataclass
+class _Island:
+    key: IslandKey
+    size: int = 0
+    free: List[int] = field(default_factory=list)
+
+
+@dataclass
+class _Node:
+    id: int
+    gpu_type: str
+    size: int = 0
+    free: int = 0
+    islands: List[IslandKey] = field(default_factory=list)
+
+
+@dataclass
+class _TypeIndex:
+    max_island_size: int = 0
+    max_node_size: int = 0
+    total_free: int = 0
+    # island_buckets[k] = island هایی که دقیقا k GPU آزاد دارند
+    island_buckets: List[Set[IslandKey]] = field(default_factory=list)
+    # node_buckets[k] = node هایی که دقیقا k GPU آزاد دارند
+    node_buckets: List[Set[int]] = field(default_factory=list)
+
+
+class PlacementEngine:
+    """ایندکس درون‌حافظه‌ای ظرفیت آزاد GPU ها."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.loaded_at: float = 0.0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._types: Dict[str, _TypeIndex] = {}
+        self._nodes: Dict[int, _Node] = {}
+        self._islands: Dict[IslandKey, _Island] = {}
+        self._gpu_island: Dict[int, IslandKey] = {}
+        self._allocations: Dict[int, List[int]] = {}
+
+    # -----------------------------
+    #  ساخت ایندکس
+    # -----------------------------
+    def build(
+        self,
+        rows: Iterable[Tuple[int, int, str, int, Optional[int]]],
+    ) -> None:
+        """
+        ساخت دوباره ایندکس از ردیف‌های (gpu_id, node_id, gpu_type, island, job_id).
+        """
+        with self._lock:
+            self._clear()
+            for gpu_id, node_id, gpu_type, island, job_id in rows:
+                node = self._nodes.get(node_id)
+                if node is None:
+                    node = _Node(id=node_id, gpu_type=gpu_type)
+                    self._nodes[node_id] = node
+
+                key = (node_id, island)
+                isl = self._islands.get(key)
+                if isl is None:
+                    isl = _Island(key=key)
+                    self._islands[key] = isl
+                    node.islands.append(key)
+
+                isl.size += 1
+                node.size += 1
+                self._gpu_island[gpu_id] = key
+                if job_id is None:
+                    isl.free.append(gpu_id)
+                    node.free += 1
+                else:
+                    self._allocations.setdefault(job_id, []).append(gpu_id)
+
+            for node in self._nodes.values():
+                idx = self._types.setdefault(node.gpu_type, _TypeIndex())
+                idx.max_node_size = max(idx.max_node_size, node.size)
+                for key in node.islands:
+                    idx.max_island_size = max(
+                        idx.max_island_size, self._islands[key].size
+                    )
+
+            for idx in self._types.values():
+                idx.island_buckets = [set() for _ in range(idx.max_island_size + 1)]
+                idx.node_buckets = [set() for _ in range(idx.max_node_size + 1)]
+
+            for node in self._nodes.values():
+                idx = self._types[node.gpu_type]
+                idx.node_buckets[node.free].add(node.id)
+                idx.total_free += node.free
+                for key in node.islands:
+                    idx.island_buckets[len(self._islands[key].free)].add(key)
+
+            self.loaded_at = time.monotonic()
+
+    # -----------------------------
+    #  تخصیص و آزادسازی
+    # -----------------------------
+    def allocate(
+        self,
+        job_id: int,
+        gpu_type: str,
+        num_gpus: int,
+        *,
+        exclude_nodes: Optional[Set[int]] = None,
+    ) -> Optional[List[int]]:
+        """
+        رزرو `num_gpus` GPU از نوع `gpu_type` روی یک node
+        (به جز node های exclude_nodes).
+
+        Returns:
+            لیست شناسه GPU ها، یا None اگر ظرفیت کافی نباشد
+        """
+        with self._lock:
+            if job_id in self._allocations:
+                return list(self._allocations[job_id])
+
+            idx = self._types.get(gpu_type)
+            if (
+                idx is None
+                or num_gpus <= 0
+                or num_gpus > idx.max_node_size
+                or num_gpus > idx.total_free
+            ):
+                return None
+
+            # ۱) best-fit روی یک NVLink island
+            if num_gpus <= idx.max_island_size:
+                for k in range(num_gpus, idx.max_island_size + 1):
+                    key = _first(idx.island_buckets[k], exclude_nodes, island=True)
+                    if key is not None:
+                        gpus = self._take(idx, key, num_gpus)
+                        self._allocations[job_id] = gpus
+                        return list(gpus)
+
+            # ۲) best-fit روی یک node (چند island)
+            for k in range(num_gpus, idx.max_node_size + 1):
+                node_id = _first(idx.node_buckets[k], exclude_nodes, island=False)
+                if node_id is not None:
+                    node = self._nodes[node_id]
+                    islands = sorted(
+                        node.islands,
+                        key=lambda key: len(self._islands[key].free),
+                        reverse=True,
+                    )
+                    gpus: List[int] = []
+                    for key in islands:
+                        need = num_gpus - len(gpus)
+                        if need == 0:
+                            break
+                        take = min(need, len(self._islands[key].free))
+                        if take:
+                            gpus.extend(self._take(idx, key, take))
+                    self._allocations[job_id] = gpus
+                    return list(gpus)
+
+            return None
+
+    def release(self, job_id: int) -> List[int]:
+        """آزاد کردن GPU های یک Job؛ شناسه GPU های آزادشده را برمی‌گرداند."""
+        with self._lock:
+            gpus = self._allocations.pop(job_id, [])
+            for gpu_id in gpus:
+                key = self._gpu_island[gpu_id]
+                isl = self._islands[key]
+                node = self._nodes[key[0]]
+                idx = self._types[node.gpu_type]
+
+                idx.island_buckets[len(isl.free)].discard(key)
+                isl.free.append(gpu_id)
+                idx.island_buckets[len(isl.free)].add(key)
+
+                idx.node_buckets[node.free].discard(node.id)
+                node.free += 1
+                idx.node_buckets[node.free].add(node.id)
+
+                idx.total_free += 1
+            return gpus
+
+    def _take(self, idx: _TypeIndex, key: IslandKey, count: int) -> List[int]:
+        isl = self._islands[key]
+        node = self._nodes[key[0]]
+
+        idx.island_buckets[len(isl.free)].discard(key)
+        gpus = [isl.free.pop() for _ in range(count)]
+        idx.island_buckets[len(isl.free)].add(key)
+
+        idx.node_buckets[node.free].discard(node.id)
+        node.free -= count
+        idx.node_buckets[node.free].add(node.id)
+
+        idx.total_free -= count
+        return gpus
+
+    # -----------------------------
+    #  گزارش
+    # -----------------------------
+    def free_gpus(self, gpu_type: str) -> int:
+        idx = self._types.get(gpu_type)
+        return idx.total_free if idx else 0
+
+    def total_gpus(self, gpu_type: str) -> int:
+        return sum(
+            node.size for node in self._nodes.values() if node.gpu_type == gpu_type
+        )
+
+    def fits_node(self, gpu_type: str, num_gpus: int) -> bool:
+        """آیا Job با این اندازه اصلا روی یک node از این نوع جا می‌شود؟"""
+        idx = self._types.get(gpu_type)
+        return idx is not None and 0 < num_gpus <= idx.max_node_size
+
+    def node_free_counts(self, gpu_type: str) -> Dict[int, int]:
+        """GPU آزاد هر node از این نوع: {node_id: free}"""
+        idx = self._types.get(gpu_type)
+        if idx is None:
+            return {}
+        return {
+            node_id: free
+            for free, bucket in enumerate(idx.node_buckets)
+            for node_id in bucket
+        }
+
+    def node_of(self, job_id: int) -> Optional[int]:
+        """node ای که Job روی آن اجرا می‌شود."""
+        gpus = self._allocations.get(job_id)
+        if not gpus:
+            return None
+        return self._gpu_island[gpus[0]][0]
+
+    def allocation(self, job_id: int) -> List[int]:
+        return list(self._allocations.get(job_id, []))
+
+    def island_of(self, gpu_id: int) -> IslandKey:
+        return self._gpu_island[gpu_id]
+
+
+def _first(bucket, exclude_nodes, *, island: bool):
+    """اولین عضو bucket که روی node های exclude_nodes نباشد."""
+    if not exclude_nodes:
+        return next(iter(bucket), None)
+    for member in bucket:
+        node_id = member[0] if island else member
+        if node_id not in exclude_nodes:
+            return member
+    return None
+
+
+# -----------------------------
+#  اتصال به دیتابیس
+# -----------------------------
+_engine: Optional[PlacementEngine] = None
+_engine_lock = threading.Lock()
+
+# Job هایی که در تراکنش فعلی session در ایندکس GPU گرفته‌اند؛ با rollback
+# از ایندکس هم پس گرفته می‌شوند
+_PENDING_KEY = "placement_allocations"
+
+
+def parse_inventory_spec(spec: str) -> List[Tuple[str, int, int, int]]:
+    """
+    تبدیل رشته‌ای مثل "A100:4x8:8,T4:8x4:1" به
+    [(gpu_type, nodes, gpus_per_node, island_size), ...]
+    """
+    result = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        gpu_type, shape, island_size = part.split(":")
+        nodes, per_node = shape.lower().split("x")
+        result.append((gpu_type, int(nodes), int(per_node), int(island_size)))
+    return result
+
+
+def seed_inventory(db: Session, spec: str) -> int:
+    """
+    ساخت node ها و GPU های شبیه‌سازی‌شده از روی spec.
+    اگر قبلا node ای ثبت شده باشد کاری نمی‌کند.
+
+    Returns:
+        تعداد node های ساخته‌شده
+    """
+    if db.query(GpuNode.id).first() is not None:
+        return 0
+
+    created = 0
+    for gpu_type, nodes, per_node, island_size in parse_inventory_spec(spec):
+        for n in range(nodes):
+            node = GpuNode(name=f"{gpu_type.lower()}-node-{n:03d}", gpu_type=gpu_type)
+            node.gpus = [
+                Gpu(device_index=i, nvlink_island=i // max(1, island_size))
+                for i in range(per_node)
+            ]
+            db.add(node)
+            created += 1
+    db.commit()
+    return created
+
+
+def load_placement_engine(db: Session) -> PlacementEngine:
+    """ساخت (یا بازسازی) ایندکس از روی جدول gpus."""
+    global _engine
+    rows = (
+        db.query(Gpu.id, Gpu.node_id, GpuNode.gpu_type, Gpu.nvlink_island, Gpu.job_id)
+        .join(GpuNode, GpuNode.id == Gpu.node_id)
+        .filter(GpuNode.is_active.is_(True))
+        .all()
+    )
+    with _engine_lock:
+        engine = _engine or PlacementEngine()
+        engine.build(rows)
+        _engine = engine
+    return engine
+
+
+def get_placement_engine(db: Session) -> PlacementEngine:
+    if _engine is None:
+        return load_placement_engine(db)
+    return _engine
+
+
+def reset_placement_engine() -> None:
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+
+def allocate_gpus(
+    db: Session,
+    job: Job,
+    *,
+    exclude_nodes: Optional[Set[int]] = None,
+) -> Optional[List[int]]:
+    """
+    رزرو GPU برای Job در ایندکس و در جدول gpus (بدون commit).
+
+    ایندکس درون‌حافظه‌ای فقط یک cache است: اگر process دیگری (مثلا worker)
+    GPU ها را آزاد یا اشغال کرده باشد، UPDATE شرطی ناسازگاری را تشخیص
+    می‌دهد و ایندکس از روی دیتابیس بازسازی می‌شود.
+
+    Returns:
+        لیست شناسه GPU ها، یا None اگر ظرفیت کافی نباشد
+    """
+    engine = get_placement_engine(db)
+
+    for attempt in range(2):
+        gpu_ids = engine.allocate(
+            job.id, job.gpu_type, job.num_gpus, exclude_nodes=exclude_nodes
+        )
+        if gpu_ids is None:
+            stale = time.monotonic() - engine.loaded_at >= settings.PLACEMENT_RESYNC_SECONDS
+            if attempt == 0 and stale:
+                engine = load_placement_engine(db)
+                continue
+            return None
+
+        updated = db.execute(
+            update(Gpu)
+            .where(Gpu.id.in_(gpu_ids), Gpu.job_id.is_(None))
+            .values(job_id=job.id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated == len(gpu_ids):
+            _track_allocations(db, [job.id])
+            return gpu_ids
+
+        # ایندکس قدیمی بود؛ تخصیص ناقص را برگردان و از نو بساز
+        db.execute(
+            update(Gpu)
+            .where(Gpu.job_id == job.id)
+            .values(job_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        engine.release(job.id)
+        engine = load_placement_engine(db)
+
+    return None
+
+
+# حداکثر تعداد GPU در هر UPDATE دسته‌ای
+_BULK_CHUNK = 1000
+
+
+def allocate_gpus_bulk(db: Session, jobs: Iterable[Job]) -> Dict[int, List[int]]:
+    """
+    رزرو GPU برای چند Job به ترتیب داده‌شده (بدون commit).
+
+    جایگذاری در ایندکس درون‌حافظه‌ای انجام می‌شود و نتیجه با چند UPDATE
+    شرطی (`SET job_id = CASE id ...`) در جدول gpus نوشته می‌شود. مثل
+    allocate_gpus ایندکس فقط وقتی از روی دیتابیس بازسازی می‌شود که UPDATE
+    شرطی ناسازگاری ببیند، یا Job ای جا نشود و ایندکس قدیمی‌تر از
+    PLACEMENT_RESYNC_SECONDS باشد؛ بعد تخصیص‌ها برگردانده و یک بار تکرار
+    می‌شوند.
+
+    Returns:
+        {job_id: gpu_ids} برای Job هایی که جا شدند
+    """
+    jobs = list(jobs)
+    engine = get_placement_engine(db)
+
+    for attempt in range(2):
+        allocations: Dict[int, List[int]] = {}
+        for job in jobs:
+            gpu_ids = engine.allocate(job.id, job.gpu_type, job.num_gpus)
+            if gpu_ids is not None:
+                allocations[job.id] = gpu_ids
+        stale = time.monotonic() - engine.loaded_at >= settings.PLACEMENT_RESYNC_SECONDS
+        if attempt == 0 and stale and len(allocations) < len(jobs):
+            # هنوز چیزی در دیتابیس نوشته نشده؛ فقط ایندکس را پس بده
+            for job_id in allocations:
+                engine.release(job_id)
+            engine = load_placement_engine(db)
+            continue
+        owners = [
+            (gpu_id, job_id)
+            for job_id, gpu_ids in allocations.items()
+            for gpu_id in gpu_ids
+        ]
+        if not owners:
+            return {}
+
+        updated = 0
+        for i in range(0, len(owners), _BULK_CHUNK):
+            chunk = dict(owners[i : i + _BULK_CHUNK])
+            updated += db.execute(
+                update(Gpu)
+                .where(Gpu.id.in_(list(chunk)), Gpu.job_id.is_(None))
+                .values(job_id=case(chunk, value=Gpu.id))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        if updated == len(owners):
+            _track_allocations(db, list(allocations))
+            return allocations
+
+        # ایندکس قدیمی بود؛ همه تخصیص‌ها را برگردان و از نو بساز
+        release_gpus_for_jobs(db, list(allocations))
+        engine = load_placement_engine(db)
+
+    return {}
+
+
+def release_gpus(db: Session, job_id: int) -> None:
+    """آزاد کردن GPU های Job در جدول gpus و در ایندکس (بدون commit)."""
+    release_gpus_for_jobs(db, [job_id])
+
+
+def release_gpus_for_jobs(db: Session, job_ids: List[int]) -> None:
+    """نسخه دسته‌ای release_gpus با یک UPDATE (بدون commit)."""
+    if not job_ids:
+        return
+    db.execute(
+        update(Gpu)
+        .where(Gpu.job_id.in_(job_ids))
+        .values(job_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    if _engine is not None:
+        for job_id in job_ids:
+            _engine.release(job_id)
+
+
+def _track_allocations(db: Session, job_ids: List[int]) -> None:
+    db.info.setdefault(_PENDING_KEY, []).extend(job_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_allocations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _release_rolled_back_allocations(session: Session) -> None:
+    # جدول gpus با rollback برگشته است؛ ایندکس هم باید همان را ببیند
+    job_ids = session.info.pop(_PENDING_KEY, None)
+    if job_ids and _engine is not None:
+        for job_id in job_ids:
+            _engine.release(job_id)
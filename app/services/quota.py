@@ -0,0 +1,338 @@
+# app/services/quota.py
+"""
+رزرو، اندازه‌گیری مصرف و دوره‌های ماهانه سهمیه GPU با یک دفتر append-only
+(جدول quota_ledger).
+
+- رزرو: یک UPDATE شرطی و اتمی
+  `UPDATE user_quotas SET used = used + x WHERE user_id = ? AND monthly - used >= x`؛
+  دو ثبت همزمان نمی‌توانند با هم بیشتر از سهمیه خرج کنند و نیازی به
+  SELECT قبلی نیست. یک دسته Job (POST /jobs/batch) با همان یک UPDATE برای
+  جمع ساعت‌ها رزرو می‌شود. ردیف‌های دفتر ("reserve"، یکی برای هر Job) موقع
+  commit نوشته می‌شوند.
+- تسویه: وقتی Job تمام می‌شود (app.services.lifecycle) مصرف واقعی آن ثبت
+  می‌شود: complete / fail = GPU-hour اجراشده از started_at تا finished_at
+  (به علاوه پیشرفت قبل از preempt ها)، reject = صفر. درست قبل از commit
+  اختلاف مصرف با خالص رزرو Job در دفتر ("usage"، یا "refund" برای reject)
+  نوشته می‌شود و برای هر کاربر یک UPDATE (به ترتیب ثابت user_id) اجرا
+  می‌شود؛ پس قفل ردیف سهمیه فقط تا commit نگه داشته می‌شود. Job ای که در
+  ماه قبل رزرو شده و بعد از rollover تمام می‌شود در دوره فعلی ردیفی ندارد؛
+  کل مصرف اندازه‌گیری‌شده‌اش به دوره فعلی نوشته می‌شود. Job هایی که هیچ
+  ردیفی در دفتر ندارند (مثلا شبیه‌ساز) تسویه نمی‌شوند و تسویه تکراری
+  بی‌اثر است.
+- دوره‌ها: rollover_quota_periods با یک UPDATE روی همه کاربرانی که دوره‌شان
+  تمام شده مصرف را صفر و دوره را به ماه فعلی (UTC) منتقل می‌کند؛ اجرای
+  همزمان آن از چند worker بی‌خطر است.
+
+جمع hours دفتر هر کاربر در دوره فعلی با used_hours_this_month او برابر است.
+
+اجرای دستی rollover:
+    python -m app.services.quota --rollover
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, event, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+import app.db.session as db_session
+from app.core.clock import Clock, system_clock
+from app.core.logging import logger
+from app.models.quota import QuotaLedgerEntry, UserQuota
+
+_PENDING_RESERVES = "quota_reserves"
+_PENDING_SETTLEMENTS = "quota_settlements"
+_CHUNK = 500
+_EPSILON = 1e-9
+
+
+class QuotaNotFound(Exception):
+    """کاربر ردیف user_quotas ندارد (نباید پیش بیاید؛ register آن را می‌سازد)."""
+
+
+class InsufficientQuota(ValueError):
+    def __init__(self, requested: float, available: float):
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Not enough GPU quota. "
+            f"Requested: {requested}h, "
+            f"Available: {available}h"
+        )
+
+
+def month_bounds(now: datetime) -> Tuple[datetime, datetime]:
+    """(اول ماه now، اول ماه بعد)"""
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def reserve_quota(db: Session, user_id: int, hours: float, job_id: int) -> float:
+    """
+    برداشت اتمی hours از سهمیه کاربر برای Job (بدون commit).
+
+    Returns:
+        سهمیه باقی‌مانده بعد از این رزرو (ساعت)
+
+    Raises:
+        InsufficientQuota: اگر سهمیه باقی‌مانده کمتر از hours باشد
+        QuotaNotFound: اگر کاربر سهمیه نداشته باشد
+    """
+    return reserve_quota_batch(db, user_id, [(job_id, hours)])
+
+
+def reserve_quota_batch(
+    db: Session, user_id: int, jobs: Sequence[Tuple[int, float]]
+) -> float:
+    """
+    رزرو یک‌جای سهمیه برای چند Job با همان یک UPDATE شرطی (بدون commit):
+    یا همه رزرو می‌شوند یا هیچ کدام. هر Job ردیف reserve خودش را در دفتر
+    می‌گیرد تا جداگانه تسویه شود.
+
+    Args:
+        jobs: (job_id، ساعت) برای هر Job
+
+    Raises:
+        InsufficientQuota: اگر سهمیه باقی‌مانده کمتر از جمع ساعت‌ها باشد
+        QuotaNotFound: اگر کاربر سهمیه نداشته باشد
+    """
+    hours = sum(job_hours for _, job_hours in jobs)
+    row = db.execute(
+        update(UserQuota)
+        .where(
+            UserQuota.user_id == user_id,
+            UserQuota.monthly_quota_hours - UserQuota.used_hours_this_month >= hours,
+        )
+        .values(used_hours_this_month=UserQuota.used_hours_this_month + hours)
+        .returning(
+            UserQuota.monthly_quota_hours - UserQuota.used_hours_this_month,
+            UserQuota.period_start,
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        # فقط مسیر رد شدن: تشخیص نبودن سهمیه از کافی نبودن آن
+        available = db.execute(
+            select(
+                UserQuota.monthly_quota_hours - UserQuota.used_hours_this_month
+            ).where(UserQuota.user_id == user_id)
+        ).scalar()
+        if available is None:
+            raise QuotaNotFound(user_id)
+        raise InsufficientQuota(hours, available)
+
+    headroom, period_start = row
+    db.info.setdefault(_PENDING_RESERVES, []).extend(
+        {
+            "user_id": user_id,
+            "job_id": job_id,
+            "kind": "reserve",
+            "hours": job_hours,
+            "period_start": period_start,
+        }
+        for job_id, job_hours in jobs
+    )
+    return headroom
+
+
+def settle_quota(
+    db: Session,
+    usage: Iterable[Tuple[int, int, float]],
+    *,
+    kind: str = "usage",
+) -> None:
+    """
+    ثبت مصرف نهایی Job ها (بدون نوشتن در دیتابیس؛ موقع commit تسویه می‌شود).
+
+    Args:
+        usage: (user_id، job_id، GPU-hour مصرف‌شده) برای هر Job
+        kind: نوع ردیف دفتر؛ "refund" وقتی Job اصلا اجرا نشده است
+    """
+    pending: Dict[int, Tuple[int, float, str]] = db.info.setdefault(
+        _PENDING_SETTLEMENTS, {}
+    )
+    for user_id, job_id, hours in usage:
+        pending[job_id] = (user_id, max(hours, 0.0), kind)
+
+
+def ledger_balance(db: Session, user_id: int) -> float:
+    """جمع دفتر کاربر در دوره فعلی (باید با used_hours_this_month برابر باشد)."""
+    return db.execute(
+        select(func.coalesce(func.sum(QuotaLedgerEntry.hours), 0.0))
+        .join(
+            UserQuota,
+            and_(
+                UserQuota.user_id == QuotaLedgerEntry.user_id,
+                UserQuota.period_start == QuotaLedgerEntry.period_start,
+            ),
+        )
+        .where(QuotaLedgerEntry.user_id == user_id)
+    ).scalar()
+
+
+def _reserved_in_period(
+    db: Session, job_ids: List[int]
+) -> Dict[int, Tuple[datetime, float]]:
+    """
+    job_id -> (دوره فعلی کاربر، خالص دفتر Job در همان دوره) برای Job هایی
+    که ردیفی در دفتر دارند؛ اگر همه ردیف‌ها مال دوره‌های قبل باشند خالص صفر
+    است.
+    """
+    in_period = QuotaLedgerEntry.period_start == UserQuota.period_start
+    reserved = {}
+    for start in range(0, len(job_ids), _CHUNK):
+        rows = db.execute(
+            select(
+                QuotaLedgerEntry.job_id,
+                UserQuota.period_start,
+                func.sum(case((in_period, QuotaLedgerEntry.hours), else_=0.0)),
+            )
+            .join(UserQuota, UserQuota.user_id == QuotaLedgerEntry.user_id)
+            .where(QuotaLedgerEntry.job_id.in_(job_ids[start:start + _CHUNK]))
+            .group_by(QuotaLedgerEntry.job_id, UserQuota.period_start)
+        ).all()
+        reserved.update((job_id, (period, hours)) for job_id, period, hours in rows)
+    return reserved
+
+
+def apply_quota_changes(
+    db: Session,
+    reserves: List[dict],
+    settlements: Dict[int, Tuple[int, float, str]],
+) -> None:
+    entries = list(reserves)
+    deltas: Dict[Tuple[int, datetime], float] = defaultdict(float)
+    adjustments: Dict[Tuple[int, datetime], List[dict]] = defaultdict(list)
+    if settlements:
+        job_ids = sorted(settlements)
+        reserved = _reserved_in_period(db, job_ids)
+        for entry in reserves:
+            period, hours = reserved.get(entry["job_id"], (entry["period_start"], 0.0))
+            reserved[entry["job_id"]] = (period, hours + entry["hours"])
+        for job_id in job_ids:
+            if job_id not in reserved:
+                continue
+            user_id, used, kind = settlements[job_id]
+            period, net = reserved[job_id]
+            delta = used - net
+            if abs(delta) <= _EPSILON:
+                continue
+            deltas[(user_id, period)] += delta
+            adjustments[(user_id, period)].append(
+                {
+                    "user_id": user_id,
+                    "job_id": job_id,
+                    "kind": kind,
+                    "hours": delta,
+                    "period_start": period,
+                }
+            )
+
+    # ترتیب ثابت کاربران: دو تراکنش همزمان روی ردیف‌ها deadlock نمی‌کنند
+    for user_id, period in sorted(deltas):
+        result = db.execute(
+            update(UserQuota)
+            .where(UserQuota.user_id == user_id, UserQuota.period_start == period)
+            .values(
+                used_hours_this_month=(
+                    UserQuota.used_hours_this_month + deltas[(user_id, period)]
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # دوره همزمان عوض شده: مصرف ماه قبل به ماه جدید منتقل نمی‌شود
+        if result.rowcount:
+            entries += adjustments[(user_id, period)]
+
+    if entries:
+        db.execute(insert(QuotaLedgerEntry), entries)
+
+
+def rollover_quota_periods(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    شروع دوره ماه now برای همه سهمیه‌هایی که دوره‌شان تمام شده (بدون commit).
+
+    یک UPDATE روی user_quotas، بدون خواندن ردیف‌ها در Python:
+    - period_end <= now: مصرف صفر، دوره = [اول ماه، اول ماه بعد)
+    - period_end خالی (ردیف‌های قدیمی): اگر دوره قبل از این ماه شروع شده
+      مثل بالا؛ وگرنه فقط period_end پر می‌شود و مصرف دست نمی‌خورد
+
+    چند worker می‌توانند همزمان اجرایش کنند: شرط WHERE بعد از گرفتن قفل هر
+    ردیف دوباره بررسی می‌شود و ردیفی دو بار صفر نمی‌شود.
+
+    Returns:
+        تعداد سهمیه‌هایی که تغییر کردند
+    """
+    now = now or datetime.utcnow()
+    start, end = month_bounds(now)
+    expired = UserQuota.period_start < start
+    result = db.execute(
+        update(UserQuota)
+        .where(
+            or_(
+                UserQuota.period_end <= now,
+                UserQuota.period_end.is_(None),
+            )
+        )
+        .values(
+            used_hours_this_month=case(
+                (expired, 0.0), else_=UserQuota.used_hours_this_month
+            ),
+            period_start=case((expired, start), else_=UserQuota.period_start),
+            period_end=end,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def run_quota_rollover(
+    session_factory: Optional[Callable[[], Session]] = None,
+    clock: Clock = system_clock,
+) -> int:
+    """rollover در یک تراکنش جدا (برای حلقه worker ها و CLI)."""
+    db = (session_factory or db_session.SessionLocal)()
+    try:
+        changed = rollover_quota_periods(db, clock.now())
+        db.commit()
+    finally:
+        db.close()
+    if changed:
+        logger.info(f"Quota rollover: {changed} quota periods advanced")
+    return changed
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_pending_quota_changes(session: Session) -> None:
+    reserves = session.info.pop(_PENDING_RESERVES, None)
+    settlements = session.info.pop(_PENDING_SETTLEMENTS, None)
+    if reserves or settlements:
+        apply_quota_changes(session, reserves or [], settlements or {})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_quota_changes(session: Session) -> None:
+    session.info.pop(_PENDING_RESERVES, None)
+    session.info.pop(_PENDING_SETTLEMENTS, None)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="GPU quota periods")
+    parser.add_argument(
+        "--rollover",
+        action="store_true",
+        help="شروع دوره جدید برای سهمیه‌هایی که دوره‌شان تمام شده",
+    )
+    args = parser.parse_args(argv)
+    if not args.rollover:
+        parser.error("nothing to do (use --rollover)")
+    print(f"Advanced {run_quota_rollover()} quota periods")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+# app/services/scheduler.py
+"""
+سیاست‌های زمان‌بندی Job های APPROVED.
+
+یک سیاست فقط ترتیب را تعیین می‌کند؛ اجرای واقعی (رزرو GPU، تغییر وضعیت و
+...) از طریق SchedulingContext انجام می‌شود. به این ترتیب همان سیاست هم در
+شبیه‌ساز (app.services.simulator) و هم در زمان‌بند واقعی استفاده می‌شود.
+"""
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
+
+from app.models.job import Job, JobPriority
+from app.services.lifecycle import remaining_hours
+
+# کلید صف: (gpu_type, رتبه priority)
+Lane = Tuple[str, int]
+
+
+def priority_rank(job: Job) -> int:
+    return JobPriority(job.priority or JobPriority.NORMAL).rank
+
+
+@dataclass
+class Reservation:
+    """
+    رزرو EASY backfill برای Job سر صف: روی node_id از زمان start به بعد
+    به اندازه کافی GPU آزاد می‌شود.
+    """
+
+    node_id: int
+    start: datetime
+
+
+class SchedulingContext(Protocol):
+    @property
+    def now(self) -> datetime:
+        ...
+
+    def try_start(self, job: Job, *, avoid_nodes: Optional[Set[int]] = None) -> bool:
+        """
+        تلاش برای شروع Job (رزرو GPU + انتقال به RUNNING)، بدون استفاده از
+        node های avoid_nodes. اگر ظرفیت کافی نباشد False برمی‌گرداند.
+        """
+        ...
+
+    def reservation_for(self, job: Job) -> Optional[Reservation]:
+        """زودترین زمانی که Job بر اساس estimated_hours کارهای در حال اجرا جا می‌شود."""
+        ...
+
+    def free_gpus(self, gpu_type: str) -> int:
+        """تعداد GPU آزاد فعلی از این نوع."""
+        ...
+
+    def preempt_for(self, job: Job) -> bool:
+        """
+        preempt کردن Job های کم‌اولویت‌تر تا Job جا شود. True یعنی ظرفیت
+        آزاد شده یا بعد از پایان checkpoint قربانی‌ها آزاد می‌شود.
+        """
+        ...
+
+
+def compute_reservation(
+    *,
+    num_gpus: int,
+    now: datetime,
+    node_free: Dict[int, int],
+    running: Iterable[Tuple[int, int, datetime]],
+) -> Optional[Reservation]:
+    """
+    محاسبه shadow time برای EASY backfill.
+
+    Args:
+        num_gpus: تعداد GPU مورد نیاز Job سر صف
+        now: زمان فعلی
+        node_free: GPU آزاد فعلی هر node از همان gpu_type
+        running: (node_id, num_gpus, expected_end) برای Job های در حال اجرا؛
+            expected_end از started_at + estimated_hours می‌آید
+
+    Returns:
+        node و زمانی که زودتر از همه جا باز می‌شود، یا None
+    """
+    ends_by_node: Dict[int, List[Tuple[datetime, int]]] = {}
+    for node_id, gpus, expected_end in running:
+        # Job هایی که از تخمینشان گذشته‌اند «همین حالا» تمام فرض می‌شوند
+        ends_by_node.setdefault(node_id, []).append((max(expected_end, now), gpus))
+
+    best: Optional[Reservation] = None
+    for node_id, free in node_free.items():
+        available = free
+        at = now
+        if available < num_gpus:
+            for end, gpus in sorted(ends_by_node.get(node_id, ())):
+                available += gpus
+                at = end
+                if available >= num_gpus:
+                    break
+        if available >= num_gpus and (best is None or at < best.start):
+            best = Reservation(node_id=node_id, start=at)
+    return best
+
+
+@dataclass
+class PreemptionPlan:
+    """node انتخاب‌شده و Job هایی که باید روی آن preempt شوند."""
+
+    node_id: int
+    victims: List[int]
+
+
+def choose_victims(
+    *,
+    num_gpus: int,
+    priority: int,
+    node_free: Dict[int, int],
+    running: Iterable[Tuple[int, int, int, int, datetime]],
+) -> Optional[PreemptionPlan]:
+    """
+    انتخاب کم‌هزینه‌ترین مجموعه قربانی روی یک node.
+
+    Args:
+        num_gpus: تعداد GPU مورد نیاز Job
+        priority: رتبه priority همان Job؛ فقط رتبه‌های کمتر preempt می‌شوند
+        node_free: GPU آزاد (یا در حال آزاد شدن) هر node از همان gpu_type
+        running: (job_id, node_id, num_gpus, priority_rank, started_at)
+
+    Returns:
+        nodeی که با preempt کردن پایین‌ترین کلاس‌ها و کمترین تعداد GPU جا
+        باز می‌کند (victims خالی یعنی ظرفیت از قبل در راه است)، یا None
+    """
+    candidates: Dict[int, List[Tuple[int, datetime, int, int]]] = {}
+    for job_id, node_id, gpus, rank, started_at in running:
+        if rank < priority:
+            candidates.setdefault(node_id, []).append((rank, started_at, gpus, job_id))
+
+    best: Optional[Tuple[Tuple[int, int], PreemptionPlan]] = None
+    for node_id, free in node_free.items():
+        available = free
+        victims: List[int] = []
+        worst_rank = -1
+        preempted = 0
+        # اول پایین‌ترین کلاس، و در هر کلاس جدیدترین Job (کار کمتری از دست می‌رود)
+        for rank, started_at, gpus, job_id in sorted(
+            candidates.get(node_id, ()), key=lambda c: (c[0], -c[1].timestamp())
+        ):
+            if available >= num_gpus:
+                break
+            victims.append(job_id)
+            available += gpus
+            preempted += gpus
+            worst_rank = max(worst_rank, rank)
+        if available < num_gpus:
+            continue
+        cost = (worst_rank, preempted)
+        if best is None or cost < best[0]:
+            best = (cost, PreemptionPlan(node_id=node_id, victims=victims))
+    return best[1] if best is not None else None
+
+
+def _try_backfill(job: Job, reservation: Reservation, ctx: SchedulingContext) -> bool:
+    """
+    Job پشت سر فقط وقتی جلو می‌افتد که شروع Job سر صف را عقب نیندازد:
+    یا قبل از shadow time تمام می‌شود، یا از node رزرو شده استفاده نمی‌کند.
+    """
+    if ctx.now + timedelta(hours=job.estimated_hours) <= reservation.start:
+        return ctx.try_start(job)
+    return ctx.try_start(job, avoid_nodes={reservation.node_id})
+
+
+def _start(job: Job, ctx: SchedulingContext, *, preempt: bool) -> bool:
+    """شروع Job؛ اگر جا نشد و preempt فعال است، با preempt کلاس‌های پایین‌تر."""
+    if ctx.try_start(job):
+        return True
+    return preempt and ctx.preempt_for(job) and ctx.try_start(job)
+
+
+class FifoPolicy:
+    """
+    FIFO جداگانه برای هر gpu_type و هر کلاس priority. کلاس‌های بالاتر اول
+    اجرا می‌شوند و Job سر صف هر نوع GPU تا وقتی جا نشود بقیه Job های همان
+    نوع را نگه می‌دارد؛ مگر با backfill=True که Job های کوچک‌تر پشت سر
+    می‌توانند بدون عقب انداختن آن جلو بیفتند (EASY backfill). با
+    preempt=True، Job سر صف می‌تواند Job های کلاس پایین‌تر را preempt کند.
+    """
+
+    def __init__(
+        self,
+        *,
+        backfill: bool = False,
+        backfill_depth: int = 64,
+        preempt: bool = False,
+    ) -> None:
+        self._queues: Dict[str, Dict[int, Deque[Job]]] = {}
+        self._backfill = backfill
+        self._backfill_depth = backfill_depth
+        self._preempt = preempt
+
+    def __len__(self) -> int:
+        return sum(len(q) for lanes in self._queues.values() for q in lanes.values())
+
+    def submit(self, job: Job) -> None:
+        lanes = self._queues.setdefault(job.gpu_type, {})
+        queue = lanes.setdefault(priority_rank(job), deque())
+        if job.preemptions:
+            # Job preempt شده جایگاهش در صف را از دست نمی‌دهد
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+
+    def dispatch(self, ctx: SchedulingContext) -> int:
+        """
+        شروع هر تعداد Job که ممکن است.
+
+        Returns:
+            تعداد Job های شروع‌شده
+        """
+        started = 0
+        for lanes in self._queues.values():
+            queues = [lanes[rank] for rank in sorted(lanes, reverse=True)]
+            for i, queue in enumerate(queues):
+                while queue and _start(queue[0], ctx, preempt=self._preempt):
+                    queue.popleft()
+                    started += 1
+                if queue:
+                    # Job سر این کلاس جا نشد؛ کلاس‌های پایین‌تر فقط backfill می‌شوند
+                    if self._backfill:
+                        started += self._backfill_queues(queue[0], queues[i:], ctx)
+                    break
+        return started
+
+    def _backfill_queues(
+        self, head: Job, queues: List[Deque[Job]], ctx: SchedulingContext
+    ) -> int:
+        gpu_type = head.gpu_type
+        if ctx.free_gpus(gpu_type) == 0:
+            return 0
+        reservation = ctx.reservation_for(head)
+        if reservation is None:
+            return 0
+
+        started = 0
+        budget = self._backfill_depth
+        for queue in queues:
+            held = [queue.popleft()] if queue and queue[0] is head else []
+            window = [queue.popleft() for _ in range(min(budget, len(queue)))]
+            budget -= len(window)
+            waiting = []
+            for job in window:
+                if ctx.free_gpus(gpu_type) < job.num_gpus or not _try_backfill(
+                    job, reservation, ctx
+                ):
+                    waiting.append(job)
+            queue.extendleft(reversed(held + waiting))
+            started += len(window) - len(waiting)
+            if budget <= 0:
+                break
+        return started
+
+
+@dataclass
+class _UserShare:
+    user_id: int
+    weight: float
+    # مصرف با مقیاس epoch: هر شارژ c در زمان t به صورت c * 2^((t - epoch) / half_life)
+    # ذخیره می‌شود؛ پس decay نمایی ترتیب کاربران را عوض نمی‌کند و لازم نیست
+    # با گذر زمان همه کاربران دوباره مرتب شوند.
+    scaled_usage: float = 0.0
+    queues: Dict[Lane, Deque[Job]] = field(default_factory=dict)
+    heap_seq: Dict[Lane, int] = field(default_factory=dict)
+
+
+class FairSharePolicy:
+    """
+    Weighted fair queuing بین کاربران.
+
+    اولویت هر کاربر = مصرف اخیر (GPU-hour با decay نمایی) / وزن؛ وزن از
+    monthly_quota_hours می‌آید. برای هر (gpu_type، کلاس priority) یک heap
+    از کاربرانی که Job منتظر دارند نگه داشته می‌شود، پس هر تصمیم O(log n)
+    است و لازم نیست جدول jobs دوباره خوانده شود. کلاس‌های priority بالاتر
+    همیشه اول بررسی می‌شوند و fair share فقط داخل هر کلاس اعمال می‌شود.
+    با backfill=True، اگر Job کاربر اول جا نشود Job های سر صف کاربران
+    بعدی با EASY backfill امتحان می‌شوند؛ با preempt=True Job سر صف
+    می‌تواند Job های کلاس پایین‌تر را preempt کند.
+    """
+
+    # بعد از این ضریب، مقادیر مقیاس‌شده یک بار rebase می‌شوند
+    _REBASE_FACTOR = 2.0 ** 200
+
+    def __init__(
+        self,
+        *,
+        half_life_hours: float = 168.0,
+        default_weight: float = 1.0,
+        backfill: bool = False,
+        backfill_depth: int = 64,
+        preempt: bool = False,
+    ) -> None:
+        self._half_life = half_life_hours * 3600
+        self._default_weight = default_weight
+        self._backfill = backfill
+        self._backfill_depth = backfill_depth
+        self._preempt = preempt
+        self._epoch: Optional[datetime] = None
+        self._users: Dict[int, _UserShare] = {}
+        self._heaps: Dict[Lane, List[Tuple[float, int, int]]] = {}
+        self._ranks: Dict[str, Set[int]] = {}
+        self._removed: Set[int] = set()
+        self._queued = 0
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return self._queued
+
+    # -----------------------------
+    #  وضعیت هر کاربر
+    # -----------------------------
+    def _user(self, user_id: int) -> _UserShare:
+        user = self._users.get(user_id)
+        if user is None:
+            user = _UserShare(user_id=user_id, weight=self._default_weight)
+            self._users[user_id] = user
+        return user
+
+    def has_user(self, user_id: int) -> bool:
+        return user_id in self._users
+
+    def set_weight(self, user_id: int, weight: float) -> None:
+        user = self._user(user_id)
+        user.weight = max(weight, 1e-9)
+        # اولویت ممکن است کم شده باشد؛ entry جدید در heap ها لازم است
+        for lane in list(user.heap_seq):
+            self._push(user, lane)
+
+    def _scale(self, now: datetime) -> float:
+        if self._epoch is None:
+            self._epoch = now
+        factor = 2.0 ** ((now - self._epoch).total_seconds() / self._half_life)
+        if factor > self._REBASE_FACTOR:
+            self._rebase(now, factor)
+            factor = 1.0
+        return factor
+
+    def _rebase(self, now: datetime, factor: float) -> None:
+        self._epoch = now
+        for user in self._users.values():
+            user.scaled_usage /= factor
+        for heap in self._heaps.values():
+            heap[:] = [(p / factor, seq, uid) for p, seq, uid in heap]
+
+    def charge(self, user_id: int, gpu_hours: float, now: datetime) -> None:
+        """ثبت مصرف برای کاربر (مثلا موقع شروع Job یا از quota فعلی)."""
+        user = self._user(user_id)
+        user.scaled_usage += gpu_hours * self._scale(now)
+
+    def usage(self, user_id: int, now: datetime) -> float:
+        """مصرف decay شده کاربر در لحظه now (GPU-hour)."""
+        user = self._users.get(user_id)
+        if user is None:
+            return 0.0
+        return user.scaled_usage / self._scale(now)
+
+    def _priority(self, user: _UserShare) -> float:
+        return user.scaled_usage / user.weight
+
+    def _push(self, user: _UserShare, lane: Lane) -> None:
+        self._seq += 1
+        user.heap_seq[lane] = self._seq
+        heapq.heappush(
+            self._heaps.setdefault(lane, []),
+            (self._priority(user), self._seq, user.user_id),
+        )
+
+    # -----------------------------
+    #  صف
+    # -----------------------------
+    def submit(self, job: Job) -> None:
+        lane = (job.gpu_type, priority_rank(job))
+        user = self._user(job.user_id)
+        queue = user.queues.setdefault(lane, deque())
+        if job.preemptions:
+            # Job preempt شده جایگاهش در صف کاربر را از دست نمی‌دهد
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self._queued += 1
+        self._ranks.setdefault(job.gpu_type, set()).add(lane[1])
+        if lane not in user.heap_seq:
+            self._push(user, lane)
+
+    def remove(self, job_id: int) -> None:
+        """حذف تنبل: Job در اولین برخورد از سر صف کنار گذاشته می‌شود."""
+        self._removed.add(job_id)
+
+    def _peek(self, lane: Lane) -> Optional[Tuple[_UserShare, Job]]:
+        """
+        کاربر با کمترین اولویت و Job سر صفش؛ entry های کهنه در همین حین
+        پاک یا با اولویت درست دوباره اضافه می‌شوند.
+        """
+        heap = self._heaps[lane]
+        while heap:
+            prio, seq, user_id = heap[0]
+            user = self._users[user_id]
+            if user.heap_seq.get(lane) != seq:
+                heapq.heappop(heap)
+                continue
+
+            queue = user.queues[lane]
+            while queue and queue[0].id in self._removed:
+                self._removed.discard(queue.popleft().id)
+                self._queued -= 1
+            if not queue:
+                heapq.heappop(heap)
+                del user.heap_seq[lane]
+                continue
+
+            # اولویت بعد از شارژ شدن در صف دیگری بالا رفته است
+            if prio != self._priority(user):
+                heapq.heappop(heap)
+                self._push(user, lane)
+                continue
+
+            return user, queue[0]
+        return None
+
+    def _mark_started(self, user: _UserShare, lane: Lane, now: datetime) -> Job:
+        job = user.queues[lane].popleft()
+        self._queued -= 1
+        self.charge(user.user_id, job.num_gpus * remaining_hours(job), now)
+        return job
+
+    def _start_top(self, user: _UserShare, lane: Lane, now: datetime) -> None:
+        """Job سر صف کاربر اول heap شروع شد."""
+        heapq.heappop(self._heaps[lane])
+        self._mark_started(user, lane, now)
+        if user.queues[lane]:
+            self._push(user, lane)
+        else:
+            del user.heap_seq[lane]
+
+    def dispatch(self, ctx: SchedulingContext) -> int:
+        started = 0
+        for gpu_type, ranks in self._ranks.items():
+            lanes = [(gpu_type, rank) for rank in sorted(ranks, reverse=True)]
+            for i, lane in enumerate(lanes):
+                count, blocked = self._dispatch_lane(lane, ctx)
+                started += count
+                if blocked is not None:
+                    # کلاس‌های پایین‌تر فقط از طریق backfill جلو می‌افتند
+                    if self._backfill:
+                        started += self._backfill_pass(blocked, lanes[i:], ctx)
+                    break
+        return started
+
+    def _dispatch_lane(
+        self, lane: Lane, ctx: SchedulingContext
+    ) -> Tuple[int, Optional[Job]]:
+        """شروع Job های یک صف تا اولین Job ای که جا نشود."""
+        started = 0
+        while True:
+            top = self._peek(lane)
+            if top is None:
+                return started, None
+            user, job = top
+            if ctx.try_start(job):
+                self._start_top(user, lane, ctx.now)
+                started += 1
+                continue
+            if job.id in self._removed:
+                continue
+            if self._preempt and ctx.preempt_for(job) and ctx.try_start(job):
+                self._start_top(user, lane, ctx.now)
+                started += 1
+                continue
+            return started, job
+
+    def _backfill_pass(
+        self, head: Job, lanes: List[Lane], ctx: SchedulingContext
+    ) -> int:
+        gpu_type = head.gpu_type
+        if ctx.free_gpus(gpu_type) == 0:
+            return 0
+        reservation = ctx.reservation_for(head)
+        if reservation is None:
+            return 0
+
+        started = 0
+        budget = self._backfill_depth
+        for n, lane in enumerate(lanes):
+            heap = self._heaps[lane]
+            # entry کاربر سر صف (همان که _dispatch_lane دید) کنار گذاشته می‌شود
+            set_aside = [heapq.heappop(heap)] if n == 0 else []
+            repush: List[_UserShare] = []
+
+            while budget > 0:
+                top = self._peek(lane) if ctx.free_gpus(gpu_type) else None
+                if top is None:
+                    break
+                budget -= 1
+                user, job = top
+                entry = heapq.heappop(heap)
+                if ctx.free_gpus(gpu_type) >= job.num_gpus and _try_backfill(
+                    job, reservation, ctx
+                ):
+                    self._mark_started(user, lane, ctx.now)
+                    if user.queues[lane]:
+                        repush.append(user)
+                    else:
+                        del user.heap_seq[lane]
+                    started += 1
+                else:
+                    set_aside.append(entry)
+
+            for entry in set_aside:
+                heapq.heappush(heap, entry)
+            for user in repush:
+                self._push(user, lane)
+            if budget <= 0 or not ctx.free_gpus(gpu_type):
+                break
+        return started
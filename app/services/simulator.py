@@ -0,0 +1,515 @@
+# app/services/simulator.py
+"""
+شبیه‌ساز رویداد-گسسته (discrete-event) خوشه GPU با ساعت مجازی.
+
+به جای sleep، رویدادها (ثبت Job، پایان اجرا، پایان checkpoint) در یک
+priority queue بر اساس زمان مجازی مرتب می‌شوند و ساعت مستقیما به رویداد
+بعدی می‌پرد؛ پس چند هفته بار خوشه در چند ثانیه اجرا می‌شود. مسیرهای واقعی کد استفاده می‌شوند:
+PlacementEngine برای جایگذاری، سیاست‌های app.services.scheduler برای ترتیب،
+و جدول app.services.lifecycle برای تغییر وضعیت‌ها.
+
+اجرا:
+    python -m app.services.simulator --days 28 --jobs 5000
+    python -m app.services.simulator --trace trace.jsonl --json
+    python -m app.services.simulator --preempt --priority-mix LOW=0.3,HIGH=0.1
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.core.clock import VirtualClock
+from app.models.job import Job, JobPriority, JobStatus
+from app.services.job_runner import SUCCESS_RATE
+from app.services.lifecycle import apply_transition, remaining_hours
+from app.services.placement import PlacementEngine, parse_inventory_spec
+from app.services.scheduler import (
+    FairSharePolicy,
+    FifoPolicy,
+    Reservation,
+    choose_victims,
+    compute_reservation,
+    priority_rank,
+)
+
+SIM_START = datetime(2025, 1, 1)
+
+# انواع رویداد؛ در زمان برابر، آزاد شدن GPU قبل از ثبت Job پردازش می‌شود
+_FINISH = 0
+_CHECKPOINT = 1
+_SUBMIT = 2
+
+
+@dataclass
+class TraceJob:
+    submit_hours: float  # فاصله از شروع trace
+    user_id: int
+    gpu_type: str
+    num_gpus: int
+    estimated_hours: float
+    actual_hours: Optional[float] = None  # اگر خالی باشد از estimated_hours ساخته می‌شود
+    priority: str = JobPriority.NORMAL.value
+
+
+@dataclass
+class SimulationReport:
+    jobs_submitted: int = 0
+    jobs_completed: int = 0
+    jobs_failed: int = 0
+    jobs_rejected: int = 0
+    jobs_unfinished: int = 0
+    preemptions: int = 0
+    simulated_hours: float = 0.0
+    wall_seconds: float = 0.0
+    events_processed: int = 0
+    throughput_jobs_per_hour: float = 0.0
+    utilization: Dict[str, float] = field(default_factory=dict)
+    wait_hours: Dict[str, float] = field(default_factory=dict)
+    # زمان انتظار تا اولین شروع، جدا برای هر کلاس priority
+    wait_hours_by_priority: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def format(self) -> str:
+        lines = [
+            f"simulated: {self.simulated_hours:.1f}h "
+            f"({self.simulated_hours / 24:.1f} days) in {self.wall_seconds:.2f}s wall, "
+            f"{self.events_processed} events",
+            f"jobs: submitted={self.jobs_submitted} completed={self.jobs_completed} "
+            f"failed={self.jobs_failed} rejected={self.jobs_rejected} "
+            f"unfinished={self.jobs_unfinished} preemptions={self.preemptions}",
+            f"throughput: {self.throughput_jobs_per_hour:.2f} jobs/hour",
+            "utilization: "
+            + ", ".join(f"{k}={v * 100:.1f}%" for k, v in self.utilization.items()),
+            "wait (hours): "
+            + ", ".join(f"{k}={v:.2f}" for k, v in self.wait_hours.items()),
+        ]
+        if len(self.wait_hours_by_priority) > 1:
+            for priority, waits in self.wait_hours_by_priority.items():
+                lines.append(
+                    f"  {priority}: "
+                    + ", ".join(f"{k}={v:.2f}" for k, v in waits.items())
+                )
+        return "\n".join(lines)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _wait_stats(waits: List[float]) -> Dict[str, float]:
+    return {
+        "mean": sum(waits) / len(waits) if waits else 0.0,
+        "p50": _percentile(waits, 50),
+        "p95": _percentile(waits, 95),
+        "p99": _percentile(waits, 99),
+        "max": max(waits) if waits else 0.0,
+    }
+
+
+def parse_priority_mix(spec: str) -> Dict[str, float]:
+    """
+    تبدیل "LOW=0.3,HIGH=0.1" به سهم هر کلاس؛ باقی‌مانده سهم NORMAL است.
+    """
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, share = part.split("=")
+        mix[JobPriority(name.strip().upper()).value] = float(share)
+    rest = 1.0 - sum(mix.values())
+    if rest < 0:
+        raise ValueError(f"Priority shares exceed 1: {spec}")
+    mix[JobPriority.NORMAL.value] = mix.get(JobPriority.NORMAL.value, 0.0) + rest
+    return mix
+
+
+def inventory_rows(spec: str) -> List[tuple]:
+    """ردیف‌های PlacementEngine.build از روی spec (بدون دیتابیس)."""
+    rows = []
+    gpu_id = 1
+    node_id = 1
+    for gpu_type, nodes, per_node, island_size in parse_inventory_spec(spec):
+        for _ in range(nodes):
+            for i in range(per_node):
+                rows.append((gpu_id, node_id, gpu_type, i // max(1, island_size), None))
+                gpu_id += 1
+            node_id += 1
+    return rows
+
+
+def synthetic_trace(
+    *,
+    num_jobs: int,
+    days: float,
+    inventory: str,
+    users: int = 50,
+    seed: int = 0,
+    priority_mix: Optional[Dict[str, float]] = None,
+) -> List[TraceJob]:
+    """
+    ساخت یک trace مصنوعی با ورود یکنواخت و اندازه‌های متنوع. بدون
+    priority_mix همه Job ها NORMAL هستند.
+    """
+    rng = random.Random(seed)
+    shapes = parse_inventory_spec(inventory)
+    sizes = [1, 1, 1, 1, 2, 2, 4, 8]
+    hours = [0.5, 1, 1, 2, 2, 4, 8, 12, 24, 48]
+
+    trace = []
+    for _ in range(num_jobs):
+        gpu_type, _, per_node, _ = rng.choice(shapes)
+        trace.append(
+            TraceJob(
+                submit_hours=rng.uniform(0, days * 24),
+                user_id=rng.randint(1, users),
+                gpu_type=gpu_type,
+                num_gpus=rng.choice([n for n in sizes if n <= per_node]),
+                estimated_hours=rng.choice(hours),
+            )
+        )
+        if priority_mix:
+            trace[-1].priority = rng.choices(
+                list(priority_mix), weights=list(priority_mix.values())
+            )[0]
+    trace.sort(key=lambda t: t.submit_hours)
+    return trace
+
+
+def load_trace(path: str) -> List[TraceJob]:
+    """خواندن trace از فایل JSON Lines (هر خط یک TraceJob)."""
+    with open(path) as f:
+        trace = [TraceJob(**json.loads(line)) for line in f if line.strip()]
+    trace.sort(key=lambda t: t.submit_hours)
+    return trace
+
+
+class Simulation:
+    """اجرای یک trace روی یک خوشه مجازی."""
+
+    def __init__(
+        self,
+        trace: List[TraceJob],
+        *,
+        inventory: str,
+        policy=None,
+        seed: int = 0,
+        checkpoint_minutes: float = settings.PREEMPTION_CHECKPOINT_MINUTES,
+    ) -> None:
+        self.trace = trace
+        self.clock = VirtualClock(SIM_START)
+        self.engine = PlacementEngine()
+        self.engine.build(inventory_rows(inventory))
+        self.policy = policy if policy is not None else FifoPolicy()
+        self.rng = random.Random(seed)
+        self.checkpoint = timedelta(minutes=checkpoint_minutes)
+
+        self.jobs: Dict[int, Job] = {}
+        self._runtime_hours: Dict[int, float] = {}
+        self._succeeds: Dict[int, bool] = {}
+        self._events: List[tuple] = []
+        self._running: Dict[str, Set[int]] = {}
+        self._finish_seq: Dict[int, int] = {}
+        self._checkpointing: Dict[int, datetime] = {}
+        self._first_started: Dict[int, datetime] = {}
+        self._preemptions = 0
+        self._seq = 0
+
+        self._capacity: Dict[str, int] = {}
+        for _, _, gpu_type, _, _ in inventory_rows(inventory):
+            self._capacity[gpu_type] = self._capacity.get(gpu_type, 0) + 1
+        self._busy_gpu_hours: Dict[str, float] = {t: 0.0 for t in self._capacity}
+
+    # -----------------------------
+    #  SchedulingContext
+    # -----------------------------
+    @property
+    def now(self) -> datetime:
+        return self.clock.now()
+
+    def try_start(self, job: Job, *, avoid_nodes: Optional[Set[int]] = None) -> bool:
+        gpus = self.engine.allocate(
+            job.id, job.gpu_type, job.num_gpus, exclude_nodes=avoid_nodes
+        )
+        if gpus is None:
+            return False
+        apply_transition(job, "start", now=self.now)
+        self._first_started.setdefault(job.id, self.now)
+        self._running.setdefault(job.gpu_type, set()).add(job.id)
+        left = max(self._runtime_hours[job.id] - job.progress_hours, 0.0)
+        self._finish_seq[job.id] = self._push(
+            self.now + timedelta(hours=left), _FINISH, job.id
+        )
+        return True
+
+    def free_gpus(self, gpu_type: str) -> int:
+        return self.engine.free_gpus(gpu_type)
+
+    def reservation_for(self, job: Job) -> Optional[Reservation]:
+        running = []
+        for job_id in self._running.get(job.gpu_type, ()):
+            other = self.jobs[job_id]
+            expected_end = self._checkpointing.get(job_id) or (
+                other.started_at + timedelta(hours=remaining_hours(other))
+            )
+            running.append((self.engine.node_of(job_id), other.num_gpus, expected_end))
+        return compute_reservation(
+            num_gpus=job.num_gpus,
+            now=self.now,
+            node_free=self.engine.node_free_counts(job.gpu_type),
+            running=running,
+        )
+
+    def preempt_for(self, job: Job) -> bool:
+        node_free = self.engine.node_free_counts(job.gpu_type)
+        running = []
+        for job_id in self._running.get(job.gpu_type, ()):
+            other = self.jobs[job_id]
+            node_id = self.engine.node_of(job_id)
+            if job_id in self._checkpointing:
+                # GPU های Job در حال checkpoint به زودی آزاد می‌شوند
+                node_free[node_id] = node_free.get(node_id, 0) + other.num_gpus
+            else:
+                running.append(
+                    (job_id, node_id, other.num_gpus, priority_rank(other), other.started_at)
+                )
+        plan = choose_victims(
+            num_gpus=job.num_gpus,
+            priority=priority_rank(job),
+            node_free=node_free,
+            running=running,
+        )
+        if plan is None:
+            return False
+        for victim_id in plan.victims:
+            self._preempt(victim_id)
+        return True
+
+    def _preempt(self, job_id: int) -> None:
+        """
+        Job از همین لحظه متوقف می‌شود (پیشرفتش ذخیره می‌شود) ولی GPU ها تا
+        پایان checkpoint در اختیارش می‌مانند.
+        """
+        job = self.jobs[job_id]
+        apply_transition(job, "preempt", now=self.now)
+        del self._finish_seq[job_id]  # رویداد پایان قبلی نامعتبر می‌شود
+        done_at = self.now + self.checkpoint
+        self._checkpointing[job_id] = done_at
+        self._push(done_at, _CHECKPOINT, job_id)
+        self._preemptions += 1
+
+    # -----------------------------
+    #  حلقه رویدادها
+    # -----------------------------
+    def _push(self, at: datetime, kind: int, job_id: int) -> int:
+        self._seq += 1
+        heapq.heappush(self._events, (at, kind, self._seq, job_id))
+        return self._seq
+
+    def _submit(self, job_id: int, spec: TraceJob) -> None:
+        job = Job(
+            id=job_id,
+            user_id=spec.user_id,
+            name=f"sim-{job_id}",
+            gpu_type=spec.gpu_type,
+            num_gpus=spec.num_gpus,
+            estimated_hours=spec.estimated_hours,
+            priority=JobPriority(spec.priority),
+            progress_hours=0.0,
+            preemptions=0,
+            command="simulated",
+            is_sensitive=False,
+            status=JobStatus.PENDING,
+            created_at=self.now,
+            updated_at=self.now,
+        )
+        self.jobs[job_id] = job
+
+        succeeds = self.rng.random() < SUCCESS_RATE
+        runtime = spec.actual_hours
+        if runtime is None:
+            runtime = spec.estimated_hours * self.rng.uniform(0.6, 1.0)
+            if not succeeds:
+                runtime *= self.rng.uniform(0.05, 1.0)
+        self._runtime_hours[job_id] = runtime
+        self._succeeds[job_id] = succeeds
+
+        if not self.engine.fits_node(job.gpu_type, job.num_gpus):
+            apply_transition(job, "reject", now=self.now)
+            return
+
+        apply_transition(job, "approve", now=self.now)
+        self.policy.submit(job)
+
+    def _release(self, job: Job) -> None:
+        self.engine.release(job.id)
+        self._running[job.gpu_type].discard(job.id)
+        hours = (self.now - job.started_at).total_seconds() / 3600
+        self._busy_gpu_hours[job.gpu_type] += hours * job.num_gpus
+
+    def _checkpoint_done(self, job_id: int) -> None:
+        job = self.jobs[job_id]
+        del self._checkpointing[job_id]
+        self._release(job)
+        self.policy.submit(job)
+
+    def _finish(self, job_id: int, seq: int) -> None:
+        if self._finish_seq.get(job_id) != seq:
+            return  # این اجرا preempt شده است
+        del self._finish_seq[job_id]
+        job = self.jobs[job_id]
+        self._release(job)
+        if self._succeeds[job_id]:
+            apply_transition(job, "complete", now=self.now)
+        else:
+            apply_transition(job, "fail", now=self.now, error_message="Simulated GPU failure")
+
+    def run(self, *, max_hours: Optional[float] = None) -> SimulationReport:
+        wall_start = time.perf_counter()
+        for job_id, spec in enumerate(self.trace, start=1):
+            self._push(SIM_START + timedelta(hours=spec.submit_hours), _SUBMIT, job_id)
+
+        horizon = SIM_START + timedelta(hours=max_hours) if max_hours else None
+        specs = dict(enumerate(self.trace, start=1))
+        processed = 0
+
+        while self._events:
+            at = self._events[0][0]
+            if horizon is not None and at > horizon:
+                break
+            self.clock.advance_to(at)
+            # همه رویدادهای هم‌زمان، سپس یک دور زمان‌بندی
+            while self._events and self._events[0][0] == at:
+                _, kind, seq, job_id = heapq.heappop(self._events)
+                processed += 1
+                if kind == _FINISH:
+                    self._finish(job_id, seq)
+                elif kind == _CHECKPOINT:
+                    self._checkpoint_done(job_id)
+                else:
+                    self._submit(job_id, specs[job_id])
+            self.policy.dispatch(self)
+
+        return self._report(processed, time.perf_counter() - wall_start)
+
+    def _report(self, processed: int, wall_seconds: float) -> SimulationReport:
+        report = SimulationReport(
+            events_processed=processed,
+            wall_seconds=wall_seconds,
+            preemptions=self._preemptions,
+        )
+        waits = []
+        waits_by_priority: Dict[str, List[float]] = {}
+        for job in self.jobs.values():
+            report.jobs_submitted += 1
+            if job.status == JobStatus.COMPLETED:
+                report.jobs_completed += 1
+            elif job.status == JobStatus.FAILED:
+                report.jobs_failed += 1
+            elif job.status == JobStatus.REJECTED:
+                report.jobs_rejected += 1
+            else:
+                report.jobs_unfinished += 1
+            first_started = self._first_started.get(job.id)
+            if first_started is not None:
+                wait = (first_started - job.created_at).total_seconds() / 3600
+                waits.append(wait)
+                waits_by_priority.setdefault(job.priority.value, []).append(wait)
+
+        hours = (self.now - SIM_START).total_seconds() / 3600
+        report.simulated_hours = hours
+        if hours > 0:
+            report.throughput_jobs_per_hour = (
+                report.jobs_completed + report.jobs_failed
+            ) / hours
+            total_busy = 0.0
+            total_capacity = 0.0
+            for gpu_type, capacity in self._capacity.items():
+                busy = self._busy_gpu_hours[gpu_type]
+                report.utilization[gpu_type] = busy / (capacity * hours)
+                total_busy += busy
+                total_capacity += capacity * hours
+            report.utilization["overall"] = total_busy / total_capacity
+
+        report.wait_hours = _wait_stats(waits)
+        for priority in reversed(list(JobPriority)):
+            if priority.value in waits_by_priority:
+                report.wait_hours_by_priority[priority.value] = _wait_stats(
+                    waits_by_priority[priority.value]
+                )
+        return report
+
+
+POLICIES = {
+    "fifo": FifoPolicy,
+    "fair": FairSharePolicy,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Discrete-event GPU cluster simulator")
+    parser.add_argument("--trace", help="فایل JSON Lines از TraceJob ها")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--days", type=float, default=28)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--inventory", default=settings.GPU_INVENTORY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="fifo")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="EASY backfill بر اساس estimated_hours",
+    )
+    parser.add_argument(
+        "--preempt",
+        action="store_true",
+        help="Job های کلاس بالاتر می‌توانند کلاس‌های پایین‌تر را preempt کنند",
+    )
+    parser.add_argument(
+        "--checkpoint-minutes",
+        type=float,
+        default=settings.PREEMPTION_CHECKPOINT_MINUTES,
+    )
+    parser.add_argument(
+        "--priority-mix",
+        default="",
+        help='سهم کلاس‌ها در trace مصنوعی، مثلا "LOW=0.3,HIGH=0.1"',
+    )
+    parser.add_argument("--json", action="store_true", help="خروجی JSON")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        trace = synthetic_trace(
+            num_jobs=args.jobs,
+            days=args.days,
+            inventory=args.inventory,
+            users=args.users,
+            seed=args.seed,
+            priority_mix=parse_priority_mix(args.priority_mix) if args.priority_mix else None,
+        )
+
+    report = Simulation(
+        trace,
+        inventory=args.inventory,
+        policy=POLICIES[args.policy](backfill=args.backfill, preempt=args.preempt),
+        seed=args.seed,
+        checkpoint_minutes=args.checkpoint_minutes,
+    ).run()
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# app/services/worker.py
+"""
+Worker pool برای اجرای Job های صف‌شده.
+
+هر process یک event loop دارد و Job های claim شده را روی AsyncJobRunner
+اجرا می‌کند؛ پس یک process می‌تواند هزاران Job همزمان را شبیه‌سازی کند.
+
+اجرا:
+    python -m app.services.worker --workers 4 --concurrency 10000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.logging import logger
+from app.db.session import SessionLocal
+from app.models.job import Job
+from app.services.job_queue import claim_jobs
+from app.services.job_runner import AsyncJobRunner
+from app.services.lifecycle import remaining_hours
+from app.services.quota import run_quota_rollover
+
+# (entry_id, enqueued_at, job_id, run_hours, num_gpus)
+ClaimedJob = Tuple[int, datetime, int, float, int]
+
+
+def _default_worker_id(index: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def _claim(worker_id: str, limit: int) -> List[ClaimedJob]:
+    """
+    claim کردن ردیف‌های صف به همراه اطلاعات لازم برای شبیه‌سازی.
+
+    Job ای که قبلا preempt شده فقط کار باقی‌مانده‌اش را اجرا می‌کند، به
+    علاوه هزینه restore از checkpoint.
+    """
+    db: Session = SessionLocal()
+    try:
+        entries = claim_jobs(
+            db,
+            worker_id=worker_id,
+            limit=limit,
+            lease_seconds=settings.JOB_QUEUE_LEASE_SECONDS,
+        )
+        if not entries:
+            return []
+        jobs = {
+            row.id: row
+            for row in db.query(
+                Job.id,
+                Job.estimated_hours,
+                Job.num_gpus,
+                Job.progress_hours,
+                Job.preemptions,
+            )
+            .filter(Job.id.in_([e.job_id for e in entries]))
+            .all()
+        }
+        claimed = []
+        for entry in entries:
+            job = jobs.get(entry.job_id)
+            if job is None:
+                continue
+            hours = remaining_hours(job)
+            if job.preemptions:
+                hours += settings.PREEMPTION_CHECKPOINT_MINUTES / 60
+            claimed.append((entry.id, entry.enqueued_at, job.id, hours, job.num_gpus))
+        return claimed
+    finally:
+        db.close()
+
+
+def _submit(runner: AsyncJobRunner, worker_id: str, claimed: List[ClaimedJob]) -> None:
+    for entry_id, enqueued_at, job_id, estimated_hours, num_gpus in claimed:
+        runner.submit(
+            job_id=job_id,
+            estimated_hours=estimated_hours,
+            num_gpus=num_gpus,
+            queue_entry_id=entry_id,
+            enqueued_at=enqueued_at,
+            worker_id=worker_id,
+        )
+
+
+async def _drain(worker_id: str, batch_size: int) -> int:
+    runner = AsyncJobRunner(session_factory=lambda: SessionLocal())
+    await runner.start()
+    processed = 0
+    while True:
+        claimed = await asyncio.to_thread(_claim, worker_id, batch_size)
+        if not claimed:
+            break
+        _submit(runner, worker_id, claimed)
+        processed += len(claimed)
+    await runner.stop(drain=True)
+    return processed
+
+
+def drain_queue(worker_id: str = "inline", batch_size: int = 100) -> int:
+    """
+    اجرای همه ردیف‌های آزاد صف و صبر تا پایان همه آن‌ها (blocking).
+    برای تست‌ها و اجرای یک‌باره از CLI (`--once`).
+
+    Returns:
+        تعداد ردیف‌های پردازش‌شده
+    """
+    return asyncio.run(_drain(worker_id, batch_size))
+
+
+async def run_worker(
+    worker_id: str,
+    *,
+    concurrency: int,
+    poll_seconds: float,
+    stop_event: Optional[asyncio.Event] = None,
+) -> None:
+    """
+    حلقه اصلی یک worker: تا وقتی ظرفیت دارد از صف claim می‌کند و Job ها
+    را روی AsyncJobRunner زمان‌بندی می‌کند. claim در thread جدا انجام
+    می‌شود تا event loop هیچ‌وقت منتظر دیتابیس نماند. هر
+    QUOTA_ROLLOVER_CHECK_SECONDS هم rollover دوره‌های سهمیه را اجرا می‌کند
+    (اجرای همزمان در چند worker بی‌خطر است).
+    """
+    stop_event = stop_event or asyncio.Event()
+    runner = AsyncJobRunner(session_factory=lambda: SessionLocal())
+    await runner.start()
+    loop = asyncio.get_running_loop()
+    next_rollover = loop.time()
+
+    logger.info(f"Worker {worker_id} started | concurrency={concurrency}")
+    while not stop_event.is_set():
+        if loop.time() >= next_rollover:
+            next_rollover = loop.time() + settings.QUOTA_ROLLOVER_CHECK_SECONDS
+            try:
+                await asyncio.to_thread(run_quota_rollover, SessionLocal)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to roll over quotas: {e}")
+
+        free_slots = concurrency - runner.in_flight - runner.pending_writes
+        claimed: List[ClaimedJob] = []
+        if free_slots > 0:
+            try:
+                claimed = await asyncio.to_thread(_claim, worker_id, free_slots)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim jobs: {e}")
+        _submit(runner, worker_id, claimed)
+
+        if not claimed:
+            try:
+                await asyncio.wait_for(stop_event.wait(), poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    await runner.stop(drain=False)
+    logger.info(f"Worker {worker_id} stopped")
+
+
+def _worker_process(index: int, concurrency: int, poll_seconds: float) -> None:
+    asyncio.run(
+        run_worker(
+            _default_worker_id(index),
+            concurrency=concurrency,
+            poll_seconds=poll_seconds,
+        )
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="GPU job queue workers")
+    parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.JOB_WORKER_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=settings.JOB_QUEUE_POLL_SECONDS,
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="صف را یک بار خالی کن و خارج شو",
+    )
+    args = parser.parse_args(argv)
+
+    if args.once:
+        processed = drain_queue(_default_worker_id())
+        logger.info(f"Drained {processed} queued jobs")
+        return
+
+    processes = [
+        multiprocessing.Process(
+            target=_worker_process,
+            args=(i, args.concurrency, args.poll_seconds),
+            daemon=False,
+        )
+        for i in range(args.workers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
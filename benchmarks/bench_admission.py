@@ -0,0 +1,156 @@
+# benchmarks/bench_admission.py
+"""
+load test جداسازی tenant ها در ثبت Job.
+
+یک tenant پرسروصدا با --concurrency درخواست همزمان POST /jobs می‌فرستد و
+یک tenant آرام همزمان پشت سر هم Job ثبت می‌کند. دو حالت:
+- "no admission control": بدون rate limit و بدون صف عادلانه (مسیر قبلی)
+- "admission control": RATE_LIMITS و write_limiter با تنظیمات برنامه
+
+برای tenant آرام تعداد موفق و p50/p99 تاخیر، و برای tenant پرسروصدا تعداد
+پذیرفته‌شده و رد شده (429/503) گزارش می‌شود.
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_admission.py --seconds 5 --concurrency 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+import app.core.rate_limit as rate_limit
+import app.db.session as db_session
+from app.core.security import create_access_token
+from app.db.session import Base, get_db
+from app.main import create_app
+from app.models.job import Job
+from app.models.quota import UserQuota
+from app.models.user import User
+from app.services.placement import seed_inventory
+
+JOB = {
+    "name": "bench",
+    "gpu_type": "T4",
+    "num_gpus": 1,
+    "estimated_hours": 0.1,
+    "command": "python train.py",
+}
+
+
+def build_app(path: str):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        # مثل pool پیش‌فرض برنامه (5 + 10)، با انتظار کوتاه‌تر
+        pool_timeout=2,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    seed_inventory(db, "T4:1x2:1")
+    headers = {}
+    for name in ("noisy", "quiet"):
+        user = User(email=f"{name}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add(UserQuota(user_id=user.id, monthly_quota_hours=1e9, used_hours_this_month=0))
+        token = create_access_token(subject=str(user.id))
+        headers[name] = {"Authorization": f"Bearer {token}"}
+    db.commit()
+    db.close()
+    db_session.SessionLocal = Session
+
+    def bench_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = bench_get_db
+    return app, engine, Session, headers
+
+
+async def run_load(app, headers, seconds: float, concurrency: int):
+    # خطای app (مثلا تمام شدن اتصال‌های pool) پاسخ 500 حساب می‌شود
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + seconds
+        noisy_codes = Counter()
+        quiet_codes = Counter()
+        quiet_latencies = []
+
+        async def noisy_worker():
+            while time.perf_counter() < deadline:
+                resp = await client.post("/api/v1/jobs", headers=headers["noisy"], json=JOB)
+                noisy_codes[resp.status_code] += 1
+                if resp.status_code in (429, 503):
+                    # یک client بد رفتار: Retry-After را نادیده می‌گیرد
+                    await asyncio.sleep(0.01)
+
+        async def quiet_worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                resp = await client.post("/api/v1/jobs", headers=headers["quiet"], json=JOB)
+                quiet_latencies.append(time.perf_counter() - started)
+                quiet_codes[resp.status_code] += 1
+                await asyncio.sleep(0.2)
+
+        await asyncio.gather(
+            quiet_worker(), *(noisy_worker() for _ in range(concurrency))
+        )
+    return noisy_codes, quiet_codes, quiet_latencies
+
+
+def report(name, noisy_codes, quiet_codes, quiet_latencies, jobs_written) -> None:
+    quantiles = statistics.quantiles(quiet_latencies, n=100)
+    rejected = noisy_codes[429] + noisy_codes[503]
+    print(
+        f"{name:22s} quiet ok {quiet_codes[201]:3d}/{sum(quiet_codes.values()):3d}  "
+        f"p50 {quantiles[49] * 1000:7.1f} ms  p99 {quantiles[98] * 1000:7.1f} ms  |  "
+        f"noisy ok {noisy_codes[201]:5d} rejected {rejected:5d} "
+        f"errors {noisy_codes[500] + quiet_codes[500]:4d}  |  jobs rows {jobs_written}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    configured_limits = dict(rate_limit.rate_limits)
+    cases = [
+        ("no admission control", {}, 10_000),
+        ("admission control", configured_limits, rate_limit.write_limiter.limit),
+    ]
+    for name, limits, concurrency_limit in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            app, engine, Session, headers = build_app(os.path.join(tmp, "bench.db"))
+            rate_limit.rate_limits.clear()
+            rate_limit.rate_limits.update(limits)
+            rate_limit._rate_limiter = rate_limit.LocalRateLimiter()
+            rate_limit.write_limiter.limit = concurrency_limit
+
+            results = asyncio.run(run_load(app, headers, args.seconds, args.concurrency))
+            db = Session()
+            jobs_written = db.query(func.count(Job.id)).scalar()
+            db.close()
+            report(name, *results, jobs_written)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
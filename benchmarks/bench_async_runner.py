@@ -0,0 +1,173 @@
+# benchmarks/bench_async_runner.py
+"""
+Benchmark موتور asyncio اجرای Job ها.
+
+N Job در صف قرار می‌گیرند، یک worker (یک event loop در یک thread) همه را
+claim و همزمان شبیه‌سازی می‌کند و در همین حین latency یک endpoint
+همگام API (GET /jobs/{id}) اندازه‌گیری می‌شود.
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_async_runner.py --jobs 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.services.worker as job_worker
+from app.core.security import create_access_token
+from app.db.session import Base, get_db
+from app.main import app
+from app.models.job import Job, JobStatus
+from app.models.job_queue import JobQueueEntry
+from app.models.user import User
+from app.services.job_runner import AsyncJobRunner
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def setup_db(path: str, jobs: int, rng: random.Random):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = Session()
+    user = User(email="bench@example.com", hashed_password="x", is_active=True)
+    db.add(user)
+    db.commit()
+    db.bulk_insert_mappings(
+        Job,
+        [
+            {
+                "user_id": user.id,
+                "name": f"bench-{i}",
+                "gpu_type": "A100",
+                "num_gpus": 1,
+                "estimated_hours": rng.randint(2, 5),
+                "command": "python train.py",
+                "status": JobStatus.RUNNING,
+            }
+            for i in range(jobs)
+        ],
+    )
+    db.commit()
+    job_ids = [row.id for row in db.query(Job.id).all()]
+    db.bulk_insert_mappings(
+        JobQueueEntry,
+        [{"job_id": job_id, "attempts": 0} for job_id in job_ids],
+    )
+    db.commit()
+    user_id = user.id
+    db.close()
+    return Session, user_id, job_ids
+
+
+def measure_api(client, headers, job_ids, rng, stop: threading.Event, out):
+    while not stop.is_set():
+        job_id = rng.choice(job_ids)
+        start = time.perf_counter()
+        resp = client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+        out.append(time.perf_counter() - start)
+        assert resp.status_code == 200, resp.text
+
+
+async def run_worker(Session, stats):
+    runner = AsyncJobRunner(session_factory=Session, batch_size=1000)
+    await runner.start()
+    claimed_total = 0
+    started = time.perf_counter()
+    while True:
+        claimed = await asyncio.to_thread(job_worker._claim, "bench-worker", 5000)
+        if not claimed:
+            break
+        job_worker._submit(runner, "bench-worker", claimed)
+        claimed_total += len(claimed)
+    stats["all_started_s"] = time.perf_counter() - started
+    await runner.stop(drain=True)
+    stats["total_s"] = time.perf_counter() - started
+    stats["peak_in_flight"] = runner.peak_in_flight
+    stats["completed"] = runner.completed
+    stats["batches"] = runner.batches_written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tmpdir = tempfile.mkdtemp()
+    Session, user_id, job_ids = setup_db(
+        os.path.join(tmpdir, "bench.db"), args.jobs, rng
+    )
+    job_worker.SessionLocal = Session
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = {
+        "Authorization": f"Bearer {create_access_token(subject=str(user_id))}"
+    }
+
+    # latency پایه بدون worker
+    baseline = []
+    stop = threading.Event()
+    t = threading.Thread(
+        target=measure_api, args=(client, headers, job_ids, rng, stop, baseline)
+    )
+    t.start()
+    time.sleep(3)
+    stop.set()
+    t.join()
+
+    # latency در حین اجرای همه Job ها
+    under_load = []
+    stop = threading.Event()
+    t = threading.Thread(
+        target=measure_api, args=(client, headers, job_ids, rng, stop, under_load)
+    )
+    t.start()
+    stats = {}
+    asyncio.run(run_worker(Session, stats))
+    stop.set()
+    t.join()
+
+    print(f"jobs: {args.jobs}")
+    print(
+        f"worker: peak concurrent jobs={stats['peak_in_flight']} "
+        f"completed={stats['completed']} in {stats['total_s']:.1f}s "
+        f"(all claimed after {stats['all_started_s']:.1f}s), "
+        f"DB batches={stats['batches']}"
+    )
+    for label, samples in (("baseline", baseline), ("under load", under_load)):
+        print(
+            f"API GET /jobs/{{id}} {label}: n={len(samples)} "
+            f"p50={percentile(samples, 50) * 1000:.1f}ms "
+            f"p99={percentile(samples, 99) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# benchmarks/bench_batch_submit.py
+"""
+ثبت یک parameter sweep: N درخواست POST /jobs در برابر یک POST /jobs/batch.
+
+روی همان app (SQLite موقت، درخواست‌ها با httpx.ASGITransport، بدون rate
+limit) برای هر حالت زمان کل، تعداد دستورهای SQL و تعداد commit ها گزارش
+می‌شود:
+- "single x N": یک درخواست برای هر ترکیب (احراز هویت، رزرو و commit جدا)
+- "batch (array)": یک Job آرایه‌ای با همان N ترکیب
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_batch_submit.py --size 256
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+import app.core.rate_limit as rate_limit
+import app.db.session as db_session
+from app.core.security import create_access_token
+from app.db.session import Base, get_db
+from app.main import create_app
+from app.models.job import Job
+from app.models.quota import UserQuota
+from app.models.user import User
+
+
+def build_app(path: str):
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    user = User(email="sweeper@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(UserQuota(user_id=user.id, monthly_quota_hours=1e9, used_hours_this_month=0))
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(user.id))}"}
+    db.commit()
+    db.close()
+    db_session.SessionLocal = Session
+
+    def bench_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = bench_get_db
+    return app, engine, Session, headers
+
+
+def sweep(size: int) -> dict:
+    # شبکه تقریبا مربعی با دقیقا size ترکیب
+    lrs = [10.0 ** -(i + 1) for i in range(16)]
+    seeds = list(range(max(1, size // len(lrs))))
+    return {"lr": lrs, "seed": seeds}
+
+
+async def submit_single(client, headers, parameters) -> int:
+    names = list(parameters)
+    ok = 0
+    for values in itertools.product(*parameters.values()):
+        params = dict(zip(names, values))
+        resp = await client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": "sweep",
+                "gpu_type": "T4",
+                "estimated_hours": 0.1,
+                "command": f"python train.py --lr {params['lr']} --seed {params['seed']}",
+            },
+        )
+        ok += resp.status_code == 201
+    return ok
+
+
+async def submit_batch(client, headers, parameters) -> int:
+    resp = await client.post(
+        "/api/v1/jobs/batch",
+        headers=headers,
+        json={
+            "array": {
+                "name": "sweep",
+                "gpu_type": "T4",
+                "estimated_hours": 0.1,
+                "command": "python train.py --lr {lr} --seed {seed}",
+                "parameters": parameters,
+            }
+        },
+    )
+    return len(resp.json()["jobs"]) if resp.status_code == 201 else 0
+
+
+async def run(app, submit, headers, parameters) -> int:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await submit(client, headers, parameters)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=256)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rate_limit.rate_limits.clear()
+    parameters = sweep(args.size)
+
+    for name, submit in (("single x N", submit_single), ("batch (array)", submit_batch)):
+        with tempfile.TemporaryDirectory() as tmp:
+            app, engine, Session, headers = build_app(os.path.join(tmp, "bench.db"))
+            counts = {"statements": 0, "commits": 0}
+
+            @event.listens_for(engine, "before_cursor_execute")
+            def count_statement(*_):
+                counts["statements"] += 1
+
+            @event.listens_for(engine, "commit")
+            def count_commit(*_):
+                counts["commits"] += 1
+
+            started = time.perf_counter()
+            accepted = asyncio.run(run(app, submit, headers, parameters))
+            elapsed = time.perf_counter() - started
+            db = Session()
+            jobs = db.query(func.count(Job.id)).scalar()
+            used = db.query(UserQuota.used_hours_this_month).scalar()
+            db.close()
+            engine.dispose()
+            print(
+                f"{name:14s} {accepted:5d} jobs  {elapsed * 1000:8.1f} ms  "
+                f"({elapsed / accepted * 1e6:7.1f} us/job)  "
+                f"statements {counts['statements']:6d}  commits {counts['commits']:5d}  "
+                f"rows {jobs}  quota used {used:.1f}h"
+            )
+
+
+if __name__ == "__main__":
+    main()
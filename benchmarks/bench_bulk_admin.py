@@ -0,0 +1,131 @@
+# benchmarks/bench_bulk_admin.py
+"""
+مقایسه تایید یک‌به‌یک با endpoint های دسته‌ای ادمین.
+
+یک backlog از Job های PENDING ساخته می‌شود؛ نیمی با
+POST /admin/jobs/{id}/approve (یک درخواست برای هر Job) و نیم دیگر با یک
+POST /admin/jobs/bulk/approve تایید می‌شوند، سپس همه با
+POST /admin/jobs/bulk/start شروع می‌شوند.
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_bulk_admin.py --jobs 5000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.services.placement as placement
+from app.core.security import create_access_token
+from app.db.session import Base, get_db
+from app.main import app
+from app.models.job import Job, JobStatus
+from app.models.user import User
+from app.services.placement import seed_inventory
+
+
+def setup_db(path: str, jobs: int):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = Session()
+    admin = User(
+        email="bench-admin@example.com",
+        hashed_password="x",
+        is_active=True,
+        is_admin=True,
+    )
+    db.add(admin)
+    db.commit()
+    db.bulk_insert_mappings(
+        Job,
+        [
+            {
+                "user_id": admin.id,
+                "name": f"bench-{i}",
+                "gpu_type": "T4",
+                "num_gpus": 1,
+                "estimated_hours": 1,
+                "command": "python train.py",
+                "status": JobStatus.PENDING,
+            }
+            for i in range(jobs)
+        ],
+    )
+    db.commit()
+    # به اندازه همه Job ها T4 تک‌GPU
+    seed_inventory(db, f"T4:{jobs}x1:1")
+    admin_id = admin.id
+    job_ids = [row.id for row in db.query(Job.id).order_by(Job.id).all()]
+    db.close()
+    return Session, admin_id, job_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    Session, admin_id, job_ids = setup_db(os.path.join(tmpdir, "bench.db"), args.jobs)
+    placement.reset_placement_engine()
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = {
+        "Authorization": f"Bearer {create_access_token(subject=str(admin_id))}"
+    }
+
+    half = len(job_ids) // 2
+    start = time.perf_counter()
+    for job_id in job_ids[:half]:
+        resp = client.post(f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+        assert resp.status_code == 200, resp.text
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resp = client.post(
+        "/api/v1/admin/jobs/bulk/approve",
+        headers=headers,
+        json={"job_ids": job_ids[half:]},
+    )
+    assert resp.status_code == 200, resp.text
+    bulk_s = time.perf_counter() - start
+    bulk_count = len(resp.json()["succeeded"])
+
+    start = time.perf_counter()
+    resp = client.post(
+        "/api/v1/admin/jobs/bulk/start",
+        headers=headers,
+        json={"filter": {"status": "APPROVED"}},
+    )
+    assert resp.status_code == 200, resp.text
+    start_s = time.perf_counter() - start
+    started = len(resp.json()["succeeded"])
+
+    print(f"one-by-one approve: {half} jobs in {single_s:.2f}s "
+          f"({single_s / half * 1000:.2f}ms/job)")
+    print(f"bulk approve:       {bulk_count} jobs in {bulk_s * 1000:.0f}ms")
+    print(f"bulk start:         {started} jobs (GPU placement + enqueue) "
+          f"in {start_s * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
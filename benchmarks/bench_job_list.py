@@ -0,0 +1,145 @@
+# benchmarks/bench_job_list.py
+"""
+مقایسه مسیر قبلی لیست Job ها (شیء ORM + اعتبارسنجی JobRead + json) با
+مسیر سریع (tuple ستون‌ها + orjson)، همان مسیر با فیلدهای پیش‌فرض لیست
+(بدون ستون‌های Text سنگین) و خروجی stream شده NDJSON.
+
+برای هر اندازه زمان و اوج حافظه (tracemalloc) گزارش می‌شود.
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_job_list.py --rows 10000 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.job import Job, JobStatus
+from app.models.user import User
+from app.schemas.job import JobRead
+from app.services.job_serialization import (
+    JOB_COLUMNS,
+    LIST_FIELDS,
+    job_columns,
+    render_jobs,
+    stream_jobs,
+)
+
+_ORDER = (Job.created_at.desc(), Job.id.desc())
+
+
+def setup_db(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    start = datetime(2025, 1, 1)
+    statuses = list(JobStatus)
+    db.bulk_insert_mappings(
+        Job,
+        [
+            {
+                "user_id": user.id,
+                "name": f"bench-{i}",
+                "gpu_type": "A100",
+                "num_gpus": 1 + i % 4,
+                "estimated_hours": 1.5,
+                "command": "python train.py --epochs 10 --config configs/" + "x" * 200,
+                "data_location": "s3://bucket/dataset" if i % 2 else None,
+                "status": statuses[i % len(statuses)],
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": start + timedelta(seconds=i),
+                "started_at": start + timedelta(seconds=i + 60) if i % 3 else None,
+            }
+            for i in range(rows)
+        ],
+    )
+    db.commit()
+    db.close()
+    return engine, Session
+
+
+def orm_pydantic(Session, rows: int) -> int:
+    """مسیر قبلی: response_model=List[JobRead] روی شیء های ORM."""
+    adapter = TypeAdapter(List[JobRead])
+    db = Session()
+    try:
+        jobs = db.query(Job).order_by(*_ORDER).limit(rows).all()
+        validated = adapter.validate_python(jobs, from_attributes=True)
+        return len(json.dumps(adapter.dump_python(validated, mode="json")).encode())
+    finally:
+        db.close()
+
+
+def tuples_fast(Session, rows: int) -> int:
+    db = Session()
+    try:
+        return len(render_jobs(db.query(*JOB_COLUMNS).order_by(*_ORDER).limit(rows).all()))
+    finally:
+        db.close()
+
+
+def tuples_list_fields(Session, rows: int) -> int:
+    db = Session()
+    try:
+        query = db.query(*job_columns(LIST_FIELDS)).order_by(*_ORDER).limit(rows)
+        return len(render_jobs(query.all(), LIST_FIELDS))
+    finally:
+        db.close()
+
+
+def stream_ndjson(engine, rows: int) -> int:
+    return sum(len(chunk) for chunk in stream_jobs(engine, [], fmt="ndjson"))
+
+
+def measure(fn: Callable[[], int]):
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, Session = setup_db(os.path.join(tmp, "bench.db"), rows)
+            print(f"\n== {rows} rows ==")
+            for name, fn in (
+                ("orm + JobRead + json", lambda: orm_pydantic(Session, rows)),
+                ("tuples + orjson", lambda: tuples_fast(Session, rows)),
+                ("list fields only", lambda: tuples_list_fields(Session, rows)),
+                ("stream ndjson", lambda: stream_ndjson(engine, rows)),
+            ):
+                elapsed, peak, size = measure(fn)
+                print(
+                    f"{name:22s} {elapsed * 1000:9.1f} ms  "
+                    f"peak {peak / 1e6:7.1f} MB  body {size / 1e6:6.1f} MB"
+                )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
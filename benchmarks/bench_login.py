@@ -0,0 +1,153 @@
+# benchmarks/bench_login.py
+"""
+throughput login و تاخیر بقیه endpoint ها در حین یک موج login.
+
+سه حالت روی همان app (SQLite موقت، درخواست‌ها با httpx.ASGITransport):
+- "threadpool": مسیر قبلی؛ route همگام که bcrypt را در threadpool اجرا می‌کند
+- "pool workers=0": bcrypt در یک thread اختصاصی
+- "pool workers=N": bcrypt در N process جدا (پیش‌فرض جدید)
+
+در هر حالت --logins درخواست login با --concurrency همزمان فرستاده می‌شود و
+همزمان یک probe پشت سر هم GET /health/ping می‌زند؛ p50/p99 آن نشان می‌دهد
+login ها چقدر جلوی بقیه درخواست‌ها را می‌گیرند. درخواست‌هایی که 429
+گرفته‌اند جدا شمرده می‌شوند.
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_login.py --logins 200 --concurrency 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.api.v1.routes_auth as routes_auth
+import app.db.session as db_session
+from app.core.password_hashing import PasswordHasher, crypt_context
+from app.db.session import Base, get_db
+from app.main import create_app
+from app.models.user import User
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+
+def build_app(path: str, rounds: int):
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    db.add(User(email=EMAIL, hashed_password=crypt_context(rounds).hash(PASSWORD)))
+    db.commit()
+    db.close()
+    db_session.SessionLocal = Session
+
+    def bench_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = bench_get_db
+
+    @app.post("/bench/threadpool-login")
+    def threadpool_login(
+        form_data: OAuth2PasswordRequestForm = Depends(),
+        db: Session = Depends(get_db),
+    ):
+        # مسیر قبلی: bcrypt همگام، یک thread از threadpool برای هر login
+        user = db.query(User).filter(User.email == form_data.username).first()
+        if not user or not crypt_context(rounds).verify(
+            form_data.password, user.hashed_password
+        ):
+            raise HTTPException(status_code=400)
+        return {"ok": True}
+
+    return app, engine
+
+
+async def run_burst(app, login_path: str, logins: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        codes = []
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def one_login():
+            async with semaphore:
+                resp = await client.post(
+                    login_path, data={"username": EMAIL, "password": PASSWORD}
+                )
+                codes.append(resp.status_code)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/v1/health/ping")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+    return elapsed, codes, probe_latencies
+
+
+def report(name, elapsed, codes, probe_latencies) -> None:
+    ok = codes.count(200)
+    quantiles = statistics.quantiles(probe_latencies, n=100)
+    print(
+        f"{name:18s} {ok / elapsed:7.1f} logins/s  ok {ok:4d}  429 {codes.count(429):4d}  "
+        f"ping p50 {quantiles[49] * 1000:7.1f} ms  p99 {quantiles[98] * 1000:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engine = build_app(os.path.join(tmp, "bench.db"), args.rounds)
+        cases = [
+            ("threadpool", "/bench/threadpool-login", None),
+            ("pool workers=0", "/api/v1/auth/login", 0),
+            (f"pool workers={args.workers}", "/api/v1/auth/login", args.workers),
+        ]
+        for name, path, workers in cases:
+            hasher = PasswordHasher(
+                workers=workers or 0, queue_size=args.queue_size, rounds=args.rounds
+            )
+            routes_auth.password_hasher = hasher
+            try:
+                report(name, *asyncio.run(run_burst(app, path, args.logins, args.concurrency)))
+            finally:
+                hasher.shutdown()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_preemption.py
+"""
+زمان انتظار هر کلاس priority روی خوشه اشباع، با و بدون preemption.
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_preemption.py --jobs 5000 --days 21
+"""
+from __future__ import annotations
+
+import argparse
+
+from app.services.simulator import (
+    POLICIES,
+    Simulation,
+    parse_priority_mix,
+    synthetic_trace,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--days", type=float, default=21)
+    parser.add_argument("--inventory", default="A100:4x8:8,V100:4x8:4,T4:8x4:1")
+    parser.add_argument("--priority-mix", default="LOW=0.3,HIGH=0.1")
+    parser.add_argument("--checkpoint-minutes", type=float, default=5)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="fair")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    trace = synthetic_trace(
+        num_jobs=args.jobs,
+        days=args.days,
+        inventory=args.inventory,
+        seed=args.seed,
+        priority_mix=parse_priority_mix(args.priority_mix),
+    )
+
+    print(f"{'mode':<12}{'class':<8}{'p50':>9}{'p95':>9}{'p99':>9}{'util':>8}{'preempt':>9}")
+    for preempt in (False, True):
+        report = Simulation(
+            trace,
+            inventory=args.inventory,
+            policy=POLICIES[args.policy](backfill=True, preempt=preempt),
+            seed=args.seed,
+            checkpoint_minutes=args.checkpoint_minutes,
+        ).run()
+        mode = "preempt" if preempt else "no-preempt"
+        for priority, waits in report.wait_hours_by_priority.items():
+            print(
+                f"{mode:<12}{priority:<8}"
+                f"{waits['p50']:>8.2f}h{waits['p95']:>8.2f}h{waits['p99']:>8.2f}h"
+                f"{report.utilization['overall'] * 100:>7.1f}%"
+                f"{report.preemptions:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
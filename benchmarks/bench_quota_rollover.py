@@ -0,0 +1,97 @@
+# benchmarks/bench_quota_rollover.py
+"""
+rollover ماهانه سهمیه برای --users کاربر.
+
+دو حالت روی همان داده (SQLite موقت):
+- "orm loop": خواندن همه UserQuota ها در Python و صفر کردن تک‌تک (مسیر ساده)
+- "set-based": rollover_quota_periods؛ یک UPDATE روی ردیف‌های تمام‌شده
+
+اجرا:
+    PYTHONPATH=. python benchmarks/bench_quota_rollover.py --users 100000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.quota import UserQuota
+from app.models.user import User
+from app.services.quota import month_bounds, rollover_quota_periods
+
+JANUARY = datetime(2026, 1, 1)
+NOW = datetime(2026, 2, 1, 0, 5)
+
+
+def build(path: str, users: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    start, end = month_bounds(JANUARY)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [{"email": f"u{i}@example.com", "hashed_password": "x"} for i in range(users)],
+        )
+        connection.execute(
+            insert(UserQuota),
+            [
+                {
+                    "user_id": i + 1,
+                    "monthly_quota_hours": 10.0,
+                    "used_hours_this_month": float(i % 10),
+                    "period_start": start,
+                    "period_end": end,
+                }
+                for i in range(users)
+            ],
+        )
+    return engine, sessionmaker(bind=engine, autoflush=False)
+
+
+def orm_loop(db) -> int:
+    start, end = month_bounds(NOW)
+    changed = 0
+    for quota in db.query(UserQuota).filter(UserQuota.period_end <= NOW):
+        quota.used_hours_this_month = 0.0
+        quota.period_start = start
+        quota.period_end = end
+        changed += 1
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, rollover in (
+        ("orm loop", orm_loop),
+        ("set-based", lambda db: rollover_quota_periods(db, NOW)),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, Session = build(os.path.join(tmp, "bench.db"), args.users)
+            db = Session()
+            tracemalloc.start()
+            started = time.perf_counter()
+            changed = rollover(db)
+            db.commit()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            db.close()
+            engine.dispose()
+            print(
+                f"{name:10s} {changed:7d} quotas  {elapsed * 1000:8.1f} ms  "
+                f"peak python memory {peak / 2**20:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,17 @@ if (!token) {
   window.location.href = "index.html";
 }
 
-let allJobs = []; // Store all jobs for filtering
+let allJobs = []; // Store loaded jobs for filtering
+let nextCursor = null; // X-Next-Cursor of the last loaded page
+let totalJobs = null; // X-Total-Count of the first page
+let loadingMore = false;
+const firstPageEtags = {}; // ETag of the first page, per URL
+const NOT_MODIFIED = 'not-modified';
+let reloadTimer = null; // Pending reload after pushed job events
+const PAGE_SIZE = 50;
+// Columns the jobs table needs; details are loaded when the modal opens
+const LIST_FIELDS = 'id,name,command,gpu_type,num_gpus,estimated_hours,status,created_at,updated_at';
+const selectedJobs = new Set(); // Job IDs selected for bulk actions
 
 // Check if user is admin
 async function checkAdminAccess() {
@@ -47,32 +57,57 @@ async function checkAdminAccess() {
   }
 }
 
-// Load all jobs (admin can see all users' jobs)
-async function loadAllJobs() {
-  try {
-    const filterStatus = document.getElementById("filter-status").value;
-    let url = `${API_BASE_URL}/admin/jobs`;
-    
-    // Add status filter to URL if selected
-    if (filterStatus) {
-      url += `?status_filter=${filterStatus.toUpperCase()}`;
-    }
-    
-    const res = await fetch(url, {
-      headers: { 
-        "Authorization": `Bearer ${token}` 
-      }
-    });
+// Build the jobs list URL for one page
+function jobsPageUrl(cursor) {
+  const filterStatus = document.getElementById("filter-status").value;
+  const params = new URLSearchParams({ limit: PAGE_SIZE, fields: LIST_FIELDS });
 
-    if (!res.ok) {
-      if (res.status === 401) {
-        logout();
-        return;
-      }
-      throw new Error('Failed to load jobs');
+  // Add status filter to URL if selected
+  if (filterStatus) {
+    params.set('status_filter', filterStatus.toUpperCase());
+  }
+  if (cursor) {
+    params.set('cursor', cursor);
+  } else {
+    params.set('include_total', 'true');
+  }
+  return `${API_BASE_URL}/admin/jobs?${params}`;
+}
+
+// Fetch one page of jobs; returns null on 401
+// and NOT_MODIFIED when the first page has not changed (304)
+async function fetchJobsPage(cursor) {
+  const url = jobsPageUrl(cursor);
+  const headers = { "Authorization": `Bearer ${token}` };
+  if (!cursor && firstPageEtags[url]) {
+    headers["If-None-Match"] = firstPageEtags[url];
+  }
+  const res = await fetch(url, { headers });
+
+  if (res.status === 304) return NOT_MODIFIED;
+  if (!res.ok) {
+    if (res.status === 401) {
+      logout();
+      return null;
     }
+    throw new Error('Failed to load jobs');
+  }
 
-    allJobs = await res.json();
+  nextCursor = res.headers.get('X-Next-Cursor');
+  if (!cursor) {
+    firstPageEtags[url] = res.headers.get('ETag');
+    const total = res.headers.get('X-Total-Count');
+    totalJobs = total === null ? null : parseInt(total, 10);
+  }
+  return await res.json();
+}
+
+// Load the first page of jobs (admin can see all users' jobs)
+async function loadAllJobs() {
+  try {
+    const jobs = await fetchJobsPage(null);
+    if (jobs === null || jobs === NOT_MODIFIED) return;
+    allJobs = jobs;
     
     displayJobs(allJobs);
     updateStats(allJobs);
@@ -83,14 +118,41 @@ async function loadAllJobs() {
   }
 }
 
+// Load the next page when the end of the table becomes visible
+async function loadMoreJobs() {
+  if (!nextCursor || loadingMore) return;
+  loadingMore = true;
+  try {
+    const jobs = await fetchJobsPage(nextCursor);
+    if (jobs === null) return;
+    allJobs = allJobs.concat(jobs);
+    filterJobs();
+    updateStats(allJobs);
+  } catch (error) {
+    console.error("Error loading more jobs:", error);
+    showAlert('خطا در بارگذاری لیست Job ها', 'danger');
+  } finally {
+    loadingMore = false;
+  }
+}
+
+// Show the "load more" row only while more pages exist
+function updateLoadMore() {
+  const loadMore = document.getElementById("jobs-load-more");
+  if (loadMore) {
+    loadMore.style.display = nextCursor ? '' : 'none';
+  }
+}
+
 // Display jobs in table
 function displayJobs(jobs) {
   const tbody = document.getElementById("jobs-body");
+  updateLoadMore();
 
   if (jobs.length === 0) {
     tbody.innerHTML = `
       <tr>
-        <td colspan="9" class="text-center text-muted py-4">
+        <td colspan="10" class="text-center text-muted py-4">
           هیچ Job ای یافت نشد
         </td>
       </tr>
@@ -104,6 +166,7 @@ function displayJobs(jobs) {
     
     return `
       <tr>
+        <td><input type="checkbox" ${selectedJobs.has(job.id) ? 'checked' : ''} onchange="toggleJobSelection(${job.id}, this.checked)"></td>
         <td>${job.id}</td>
         <td>
           <strong>${job.name}</strong><br>
@@ -229,10 +292,77 @@ async function performAction(jobId, action, successMessage, body = {}) {
   }
 }
 
+// Bulk selection
+function toggleJobSelection(jobId, checked) {
+  if (checked) {
+    selectedJobs.add(jobId);
+  } else {
+    selectedJobs.delete(jobId);
+  }
+}
+
+function toggleSelectAll(checked) {
+  document.querySelectorAll('#jobs-body input[type="checkbox"]').forEach(box => {
+    box.checked = checked;
+  });
+  allJobs.forEach(job => toggleJobSelection(job.id, checked));
+}
+
+// Bulk actions: one request for all selected jobs
+async function bulkAction(action) {
+  if (selectedJobs.size === 0) {
+    showAlert('هیچ Job ای انتخاب نشده است', 'warning');
+    return;
+  }
+  if (!confirm(`اعمال «${action}» روی ${selectedJobs.size} Job؟`)) return;
+
+  try {
+    const res = await fetch(`${API_BASE_URL}/admin/jobs/bulk/${action}`, {
+      method: "POST",
+      headers: {
+        "Authorization": `Bearer ${token}`,
+        "Content-Type": "application/json"
+      },
+      body: JSON.stringify({ job_ids: Array.from(selectedJobs) })
+    });
+
+    if (!res.ok) {
+      const errorData = await res.json();
+      throw new Error(errorData.detail || 'عملیات ناموفق بود');
+    }
+
+    const result = await res.json();
+    showAlert(
+      `${result.succeeded.length} Job انجام شد، ${result.skipped.length} Job رد شد`,
+      result.skipped.length ? 'warning' : 'success'
+    );
+    selectedJobs.clear();
+    document.getElementById("select-all").checked = false;
+    await loadAllJobs();
+
+  } catch (error) {
+    console.error(`Error performing bulk ${action}:`, error);
+    showAlert(error.message || `خطا در ${action}`, 'danger');
+  }
+}
+
 // View job details in modal
 async function viewJobDetails(jobId) {
-  const job = allJobs.find(j => j.id === jobId);
-  if (!job) return;
+  // The list only has a few columns; fetch the full job
+  const res = await fetch(`${API_BASE_URL}/admin/jobs/${jobId}`, {
+    headers: { 
+      "Authorization": `Bearer ${token}` 
+    }
+  });
+  if (!res.ok) {
+    if (res.status === 401) {
+      logout();
+      return;
+    }
+    showAlert('خطا در بارگذاری جزئیات Job', 'danger');
+    return;
+  }
+  const job = await res.json();
 
   const modalBody = document.getElementById("modal-job-details");
   
@@ -244,6 +374,8 @@ async function viewJobDetails(jobId) {
         <p><strong>نوع GPU:</strong> ${job.gpu_type}</p>
         <p><strong>تعداد GPU:</strong> ${job.num_gpus}</p>
         <p><strong>ساعت تخمینی:</strong> ${job.estimated_hours}</p>
+        <p><strong>اولویت:</strong> ${job.priority}</p>
+        ${job.preemptions ? `<p><strong>توقف (preempt):</strong> ${job.preemptions} بار، پیشرفت ${job.progress_hours.toFixed(2)} ساعت</p>` : ''}
       </div>
       <div class="col-md-6">
         <p><strong>وضعیت:</strong> <span class="job-status status-${job.status.toLowerCase()}">${translateStatus(job.status)}</span></p>
@@ -290,7 +422,7 @@ function filterJobs() {
 // Update statistics
 function updateStats(jobs) {
   const stats = {
-    total: jobs.length,
+    total: totalJobs !== null ? totalJobs : jobs.length,
     pending: jobs.filter(j => j.status.toLowerCase() === 'pending').length,
     running: jobs.filter(j => j.status.toLowerCase() === 'running').length,
     completed: jobs.filter(j => j.status.toLowerCase() === 'completed').length
@@ -340,11 +472,75 @@ function logout() {
   window.location.href = "index.html";
 }
 
+// Apply a pushed job event in place; returns false when the first page
+// has to be reloaded instead (new job, or it left the status filter)
+function applyJobEvent(event) {
+  const job = allJobs.find(j => j.id === event.job_id);
+  if (!job) return false;
+  const filterStatus = document.getElementById("filter-status").value;
+  if (filterStatus && filterStatus.toUpperCase() !== event.status) return false;
+  job.status = event.status;
+  if (event.updated_at) job.updated_at = event.updated_at;
+  return true;
+}
+
+// Reload the first page once per burst of events (only while just the
+// first page is loaded, so scrolling through older pages is not reset)
+function scheduleReload() {
+  if (reloadTimer || allJobs.length > PAGE_SIZE) return;
+  reloadTimer = setTimeout(() => {
+    reloadTimer = null;
+    loadAllJobs();
+  }, 500);
+}
+
+// Follow job changes pushed by the server (Server-Sent Events); browsers
+// without EventSource fall back to polling every 30 seconds
+function subscribeToJobEvents() {
+  if (!('EventSource' in window)) {
+    setInterval(() => {
+      if (allJobs.length <= PAGE_SIZE) loadAllJobs();
+    }, 30000);
+    return;
+  }
+
+  // EventSource cannot send headers, so the token goes in the query string
+  const source = new EventSource(
+    `${API_BASE_URL}/admin/jobs/events?access_token=${encodeURIComponent(token)}`
+  );
+  let connectedBefore = false;
+  source.addEventListener('open', () => {
+    // Events may have been missed while reconnecting
+    if (connectedBefore) scheduleReload();
+    connectedBefore = true;
+  });
+  source.addEventListener('job', e => {
+    if (applyJobEvent(JSON.parse(e.data))) {
+      filterJobs();
+      updateStats(allJobs);
+    } else {
+      scheduleReload();
+    }
+  });
+  source.addEventListener('resync', scheduleReload);
+  source.addEventListener('error', () => {
+    // The stream was refused (e.g. expired token); a normal request handles it
+    if (source.readyState === EventSource.CLOSED) loadAllJobs();
+  });
+}
+
 // Initialize page
 document.addEventListener('DOMContentLoaded', async () => {
   await checkAdminAccess();
   await loadAllJobs();
   
-  // Auto-refresh every 30 seconds
-  setInterval(loadAllJobs, 30000);
+  // Load next pages lazily as the admin scrolls to the end of the table
+  const loadMore = document.getElementById("jobs-load-more");
+  if (loadMore && 'IntersectionObserver' in window) {
+    new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) loadMoreJobs();
+    }).observe(loadMore);
+  }
+  
+  subscribeToJobEvents();
 });
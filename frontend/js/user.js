@@ -8,6 +8,16 @@ if (!token) {
   window.location.href = "index.html";
 }
 
+let loadedJobs = []; // Jobs shown in the table, newest first
+let nextCursor = null; // X-Next-Cursor of the last loaded page
+let loadingMore = false;
+const firstPageEtags = {}; // ETag of the first page, per URL
+const NOT_MODIFIED = 'not-modified';
+let reloadTimer = null; // Pending reload after pushed job events
+const PAGE_SIZE = 50;
+// Columns the jobs table needs
+const LIST_FIELDS = 'id,name,gpu_type,num_gpus,estimated_hours,status,created_at,updated_at';
+
 // Load user info on page load
 async function loadUserInfo() {
   try {
@@ -37,53 +47,77 @@ async function loadUserInfo() {
   }
 }
 
-// Load jobs list
-async function loadJobs() {
-  try {
-    const res = await fetch(`${API_BASE_URL}/jobs`, {
-      headers: { 
-        "Authorization": `Bearer ${token}` 
-      }
-    });
+// Fetch one page of jobs; returns null on 401
+// and NOT_MODIFIED when the first page has not changed (304)
+async function fetchJobsPage(cursor) {
+  const params = new URLSearchParams({ limit: PAGE_SIZE, fields: LIST_FIELDS });
+  if (cursor) params.set('cursor', cursor);
+  const url = `${API_BASE_URL}/jobs?${params}`;
 
-    if (!res.ok) {
-      if (res.status === 401) {
-        logout();
-        return;
-      }
-      throw new Error('Failed to load jobs');
-    }
+  const headers = { "Authorization": `Bearer ${token}` };
+  if (!cursor && firstPageEtags[url]) {
+    headers["If-None-Match"] = firstPageEtags[url];
+  }
+  const res = await fetch(url, { headers });
 
-    const jobs = await res.json();
-    const tbody = document.getElementById("jobs-body");
-
-    if (jobs.length === 0) {
-      tbody.innerHTML = `
-        <tr>
-          <td colspan="7" class="text-center text-muted py-4">
-            هنوز هیچ Job ای ایجاد نکرده‌اید
-          </td>
-        </tr>
-      `;
-      return;
+  if (res.status === 304) return NOT_MODIFIED;
+  if (!res.ok) {
+    if (res.status === 401) {
+      logout();
+      return null;
     }
+    throw new Error('Failed to load jobs');
+  }
 
-    tbody.innerHTML = jobs.map(job => {
-      const createdDate = new Date(job.created_at).toLocaleDateString('fa-IR');
-      const statusClass = `status-${job.status.toLowerCase()}`;
-      
-      return `
-        <tr>
-          <td>${job.id}</td>
-          <td>${job.name}</td>
-          <td>${job.gpu_type}</td>
-          <td>${job.num_gpus}</td>
-          <td>${job.estimated_hours} ساعت</td>
-          <td><span class="job-status ${statusClass}">${translateStatus(job.status)}</span></td>
-          <td>${createdDate}</td>
-        </tr>
-      `;
-    }).join('');
+  nextCursor = res.headers.get('X-Next-Cursor');
+  if (!cursor) firstPageEtags[url] = res.headers.get('ETag');
+  return await res.json();
+}
+
+// Render loaded jobs
+function renderJobs(jobs) {
+  const tbody = document.getElementById("jobs-body");
+  const loadMore = document.getElementById("jobs-load-more");
+  if (loadMore) {
+    loadMore.style.display = nextCursor ? '' : 'none';
+  }
+
+  if (jobs.length === 0) {
+    tbody.innerHTML = `
+      <tr>
+        <td colspan="7" class="text-center text-muted py-4">
+          هنوز هیچ Job ای ایجاد نکرده‌اید
+        </td>
+      </tr>
+    `;
+    return;
+  }
+
+  tbody.innerHTML = jobs.map(job => {
+    const createdDate = new Date(job.created_at).toLocaleDateString('fa-IR');
+    const statusClass = `status-${job.status.toLowerCase()}`;
+    
+    return `
+      <tr>
+        <td>${job.id}</td>
+        <td>${job.name}</td>
+        <td>${job.gpu_type}</td>
+        <td>${job.num_gpus}</td>
+        <td>${job.estimated_hours} ساعت</td>
+        <td><span class="job-status ${statusClass}">${translateStatus(job.status)}</span></td>
+        <td>${createdDate}</td>
+      </tr>
+    `;
+  }).join('');
+}
+
+// Load the first page of jobs
+async function loadJobs() {
+  try {
+    const jobs = await fetchJobsPage(null);
+    if (jobs === null || jobs === NOT_MODIFIED) return;
+    loadedJobs = jobs;
+    renderJobs(loadedJobs);
 
   } catch (error) {
     console.error("Error loading jobs:", error);
@@ -97,6 +131,22 @@ async function loadJobs() {
   }
 }
 
+// Load the next page when the end of the table becomes visible
+async function loadMoreJobs() {
+  if (!nextCursor || loadingMore) return;
+  loadingMore = true;
+  try {
+    const jobs = await fetchJobsPage(nextCursor);
+    if (jobs === null) return;
+    loadedJobs = loadedJobs.concat(jobs);
+    renderJobs(loadedJobs);
+  } catch (error) {
+    console.error("Error loading more jobs:", error);
+  } finally {
+    loadingMore = false;
+  }
+}
+
 // Create new job
 async function createJob(event) {
   event.preventDefault();
@@ -115,6 +165,7 @@ async function createJob(event) {
     gpu_type: document.getElementById("gpu-type").value,
     num_gpus: parseInt(document.getElementById("num-gpus").value),
     estimated_hours: parseFloat(document.getElementById("estimated-hours").value),
+    priority: document.getElementById("priority").value,
     command: document.getElementById("command").value,
     data_location: document.getElementById("data-location").value || null,
     is_sensitive: document.getElementById("is-sensitive").checked
@@ -186,6 +237,60 @@ function logout() {
   window.location.href = "index.html";
 }
 
+// Apply a pushed job event in place; returns false when the first page
+// has to be reloaded instead (a new job)
+function applyJobEvent(event) {
+  const job = loadedJobs.find(j => j.id === event.job_id);
+  if (!job) return false;
+  job.status = event.status;
+  if (event.updated_at) job.updated_at = event.updated_at;
+  return true;
+}
+
+// Reload the first page once per burst of events (only while just the
+// first page is loaded, so scrolling through older pages is not reset)
+function scheduleReload() {
+  if (reloadTimer || loadedJobs.length > PAGE_SIZE) return;
+  reloadTimer = setTimeout(() => {
+    reloadTimer = null;
+    loadJobs();
+  }, 500);
+}
+
+// Follow job changes pushed by the server (Server-Sent Events); browsers
+// without EventSource fall back to polling every 30 seconds
+function subscribeToJobEvents() {
+  if (!('EventSource' in window)) {
+    setInterval(() => {
+      if (loadedJobs.length <= PAGE_SIZE) loadJobs();
+    }, 30000);
+    return;
+  }
+
+  // EventSource cannot send headers, so the token goes in the query string
+  const source = new EventSource(
+    `${API_BASE_URL}/jobs/events?access_token=${encodeURIComponent(token)}`
+  );
+  let connectedBefore = false;
+  source.addEventListener('open', () => {
+    // Events may have been missed while reconnecting
+    if (connectedBefore) scheduleReload();
+    connectedBefore = true;
+  });
+  source.addEventListener('job', e => {
+    if (applyJobEvent(JSON.parse(e.data))) {
+      renderJobs(loadedJobs);
+    } else {
+      scheduleReload();
+    }
+  });
+  source.addEventListener('resync', scheduleReload);
+  source.addEventListener('error', () => {
+    // The stream was refused (e.g. expired token); a normal request handles it
+    if (source.readyState === EventSource.CLOSED) loadJobs();
+  });
+}
+
 // Initialize page
 document.addEventListener('DOMContentLoaded', () => {
   loadUserInfo();
@@ -194,6 +299,13 @@ document.addEventListener('DOMContentLoaded', () => {
   // Add form submit handler
   document.getElementById("job-form").addEventListener('submit', createJob);
   
-  // Auto-refresh jobs every 30 seconds
-  setInterval(loadJobs, 30000);
+  // Load next pages lazily as the user scrolls to the end of the table
+  const loadMore = document.getElementById("jobs-load-more");
+  if (loadMore && 'IntersectionObserver' in window) {
+    new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) loadMoreJobs();
+    }).observe(loadMore);
+  }
+  
+  subscribeToJobEvents();
 });
@@ -0,0 +1,54 @@
+# migrations/env.py
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app import models  # noqa: F401  (رجیستر شدن مدل‌ها روی Base.metadata)
+from app.config import settings
+from app.db.session import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def _url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """خروجی SQL بدون اتصال: alembic upgrade head --sql"""
+    context.configure(
+        url=_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # app.db.migrations.upgrade_db اتصال خودش را از طریق attributes می‌دهد
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    engine = create_engine(_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite بدون batch نمی‌تواند ستون/constraint را تغییر دهد
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
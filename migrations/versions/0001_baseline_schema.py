@@ -0,0 +1,141 @@
+"""baseline schema
+
+جداولی که تا قبل از migration ها با Base.metadata.create_all ساخته می‌شدند.
+دیتابیس‌های موجود فقط stamp می‌شوند (app.db.migrations.upgrade_db).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_admin", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("gpu_type", sa.String(length=50), nullable=False),
+        sa.Column("num_gpus", sa.Integer(), nullable=False),
+        sa.Column("estimated_hours", sa.Float(), nullable=False),
+        sa.Column(
+            "priority",
+            sa.Enum("LOW", "NORMAL", "HIGH", name="job_priority_enum"),
+            nullable=False,
+        ),
+        sa.Column("command", sa.Text(), nullable=False),
+        sa.Column("data_location", sa.Text(), nullable=True),
+        sa.Column("is_sensitive", sa.Boolean(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "APPROVED",
+                "REJECTED",
+                "RUNNING",
+                "COMPLETED",
+                "FAILED",
+                name="job_status_enum",
+            ),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("progress_hours", sa.Float(), nullable=False),
+        sa.Column("preemptions", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_user_id", "jobs", ["user_id"])
+    op.create_index("ix_jobs_status", "jobs", ["status"])
+
+    op.create_table(
+        "user_quotas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("monthly_quota_hours", sa.Float(), nullable=False),
+        sa.Column("used_hours_this_month", sa.Float(), nullable=False),
+        sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("period_end", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", name="uq_user_quota_user_id"),
+    )
+
+    op.create_table(
+        "job_queue",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("claimed_by", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id"),
+    )
+    op.create_index("ix_job_queue_lease_expires_at", "job_queue", ["lease_expires_at"])
+
+    op.create_table(
+        "gpu_nodes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("gpu_type", sa.String(length=50), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_gpu_nodes_gpu_type", "gpu_nodes", ["gpu_type"])
+
+    op.create_table(
+        "gpus",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("node_id", sa.Integer(), nullable=False),
+        sa.Column("device_index", sa.Integer(), nullable=False),
+        sa.Column("nvlink_island", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["node_id"], ["gpu_nodes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("node_id", "device_index", name="uq_gpu_node_device"),
+    )
+    op.create_index("ix_gpus_job_id", "gpus", ["job_id"])
+    op.create_index("ix_gpus_node_id", "gpus", ["node_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("gpus")
+    op.drop_table("gpu_nodes")
+    op.drop_table("job_queue")
+    op.drop_table("user_quotas")
+    op.drop_table("jobs")
+    op.drop_table("users")
+    sa.Enum(name="job_status_enum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="job_priority_enum").drop(op.get_bind(), checkfirst=True)
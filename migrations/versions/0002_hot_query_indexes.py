@@ -0,0 +1,67 @@
+"""composite and partial indexes for hot job queries
+
+ایندکس‌های تکی user_id / status / id با ایندکس‌های ترکیبی‌ای جایگزین
+می‌شوند که ترتیبشان با ORDER BY صفحه‌بندی keyset (created_at DESC, id DESC)
+یکی است، به علاوه یک partial index روی Job های فعال برای زمان‌بند.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+_ACTIVE = sa.text("status IN ('PENDING', 'APPROVED', 'RUNNING')")
+
+
+def _desc(column: str):
+    return sa.literal_column(f"{column} DESC")
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_jobs_user_created",
+        "jobs",
+        ["user_id", _desc("created_at"), _desc("id")],
+    )
+    op.create_index(
+        "ix_jobs_user_status_created",
+        "jobs",
+        ["user_id", "status", _desc("created_at"), _desc("id")],
+    )
+    op.create_index("ix_jobs_created", "jobs", [_desc("created_at"), _desc("id")])
+    op.create_index(
+        "ix_jobs_status_created",
+        "jobs",
+        ["status", _desc("created_at"), _desc("id")],
+    )
+    op.create_index(
+        "ix_jobs_active_updated",
+        "jobs",
+        ["status", "updated_at", "id"],
+        postgresql_where=_ACTIVE,
+        sqlite_where=_ACTIVE,
+    )
+
+    # ستون اول ایندکس‌های بالا؛ دیگر لازم نیستند
+    op.drop_index("ix_jobs_user_id", table_name="jobs")
+    op.drop_index("ix_jobs_status", table_name="jobs")
+    op.drop_index("ix_jobs_id", table_name="jobs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_status", "jobs", ["status"])
+    op.create_index("ix_jobs_user_id", "jobs", ["user_id"])
+
+    op.drop_index("ix_jobs_active_updated", table_name="jobs")
+    op.drop_index("ix_jobs_status_created", table_name="jobs")
+    op.drop_index("ix_jobs_created", table_name="jobs")
+    op.drop_index("ix_jobs_user_status_created", table_name="jobs")
+    op.drop_index("ix_jobs_user_created", table_name="jobs")
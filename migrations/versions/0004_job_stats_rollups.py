@@ -0,0 +1,59 @@
+"""job stats rollups for the admin stats endpoint
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_stats_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("gpu_type", sa.String(length=50), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "APPROVED",
+                "REJECTED",
+                "RUNNING",
+                "COMPLETED",
+                "FAILED",
+                name="job_status_enum",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("job_count", sa.BigInteger(), nullable=False),
+        sa.Column("gpu_hours", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("day", "user_id", "gpu_type", "status"),
+    )
+
+    # Job های موجود (همان کاری که python -m app.services.job_stats --backfill می‌کند)
+    if op.get_bind().dialect.name == "postgresql":
+        day = "date(created_at AT TIME ZONE 'UTC')"
+    else:
+        day = "date(created_at)"
+    op.execute(
+        "INSERT INTO job_stats_rollups "
+        "(day, user_id, gpu_type, status, job_count, gpu_hours) "
+        f"SELECT {day}, user_id, gpu_type, status, count(*), "
+        "sum(estimated_hours * num_gpus) "
+        f"FROM jobs GROUP BY {day}, user_id, gpu_type, status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_stats_rollups")
@@ -0,0 +1,46 @@
+"""append-only quota ledger
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quota_ledger",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=True),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quota_ledger_job_id", "quota_ledger", ["job_id"])
+    op.create_index(
+        "ix_quota_ledger_user_created", "quota_ledger", ["user_id", "created_at"]
+    )
+
+    # مصرف فعلی هر کاربر به عنوان مانده اول دفتر
+    op.execute(
+        "INSERT INTO quota_ledger (user_id, job_id, kind, hours, created_at) "
+        "SELECT user_id, NULL, 'opening', used_hours_this_month, CURRENT_TIMESTAMP "
+        "FROM user_quotas WHERE used_hours_this_month <> 0"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quota_ledger_user_created", table_name="quota_ledger")
+    op.drop_index("ix_quota_ledger_job_id", table_name="quota_ledger")
+    op.drop_table("quota_ledger")
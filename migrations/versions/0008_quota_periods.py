@@ -0,0 +1,43 @@
+"""quota periods on the ledger and rollover index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "quota_ledger",
+        sa.Column("period_start", sa.DateTime(timezone=True), nullable=True),
+    )
+    # ردیف‌های موجود مال دوره فعلی کاربرشان هستند
+    op.execute(
+        "UPDATE quota_ledger SET period_start = ("
+        "SELECT user_quotas.period_start FROM user_quotas "
+        "WHERE user_quotas.user_id = quota_ledger.user_id)"
+    )
+    op.execute(
+        "UPDATE quota_ledger SET period_start = created_at WHERE period_start IS NULL"
+    )
+    with op.batch_alter_table("quota_ledger") as batch_op:
+        batch_op.alter_column(
+            "period_start",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+        )
+    op.create_index("ix_user_quotas_period_end", "user_quotas", ["period_end"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_quotas_period_end", table_name="user_quotas")
+    with op.batch_alter_table("quota_ledger") as batch_op:
+        batch_op.drop_column("period_start")
@@ -0,0 +1,53 @@
+"""array jobs (parameter sweeps)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_arrays",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("parameters", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_job_arrays_user_id", "job_arrays", ["user_id"])
+
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("array_id", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("array_index", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_jobs_array_id_job_arrays",
+            "job_arrays",
+            ["array_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+    op.create_index(
+        "ix_jobs_array_index", "jobs", ["array_id", "array_index"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_array_index", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_constraint("fk_jobs_array_id_job_arrays", type_="foreignkey")
+        batch_op.drop_column("array_index")
+        batch_op.drop_column("array_id")
+    op.drop_index("ix_job_arrays_user_id", table_name="job_arrays")
+    op.drop_table("job_arrays")
@@ -0,0 +1,44 @@
+"""job stats rollups count used GPU-hours instead of requested ones
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def _rebuild(gpu_hours: str) -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        day = "date(created_at AT TIME ZONE 'UTC')"
+    else:
+        day = "date(created_at)"
+    op.execute("DELETE FROM job_stats_rollups")
+    op.execute(
+        "INSERT INTO job_stats_rollups "
+        "(day, user_id, gpu_type, status, job_count, gpu_hours) "
+        f"SELECT {day}, user_id, gpu_type, status, count(*), sum({gpu_hours}) "
+        f"FROM jobs GROUP BY {day}, user_id, gpu_type, status"
+    )
+
+
+def upgrade() -> None:
+    # همان job_stats.used_gpu_hours_sql
+    if op.get_bind().dialect.name == "postgresql":
+        elapsed = "extract(epoch FROM finished_at - started_at) / 3600"
+    else:
+        elapsed = "(julianday(finished_at) - julianday(started_at)) * 24"
+    _rebuild(
+        "CASE WHEN status IN ('COMPLETED', 'FAILED') THEN "
+        f"(coalesce(progress_hours, 0) + coalesce({elapsed}, 0)) * num_gpus "
+        "ELSE 0 END"
+    )
+
+
+def downgrade() -> None:
+    _rebuild("estimated_hours * num_gpus")
@@ -0,0 +1,142 @@
+# tests/conftest.py
+"""
+دیتابیس SQLite مشترک تست‌های API (test.db) و TestClient برنامه.
+
+هر ماژول تست با دیتابیس خالی، inventory شبیه‌سازی‌شده GPU ها و cache های
+خالی شروع می‌کند؛ تست‌های داخل یک ماژول به ترتیب روی همان داده‌ها اجرا
+می‌شوند.
+"""
+from typing import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.core.rate_limit as rate_limit
+import app.db.session as db_session
+import app.services.job_runner as job_runner
+import app.services.worker as job_worker
+from app.core.api_keys import api_key_table
+from app.core.principal_cache import principal_cache
+from app.db.session import Base, get_db
+from app.main import app
+from app.models.user import User
+from app.services.placement import reset_placement_engine, seed_inventory
+
+# -----------------------------
+#  تنظیم دیتابیس تست (SQLite)
+# -----------------------------
+
+TEST_DATABASE_URL = "sqlite:///./test.db"
+
+# یک engine جدید فقط برای تست
+test_engine = create_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+)
+
+# یک SessionLocal جدید که به sqlite متصل است
+TestingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=test_engine,
+)
+
+# جایگزین کردن engine و SessionLocal در ماژول اصلی db_session
+db_session.engine = test_engine
+db_session.SessionLocal = TestingSessionLocal
+
+job_runner.SessionLocal = TestingSessionLocal
+job_worker.SessionLocal = TestingSessionLocal
+
+
+# -----------------------------
+#  override کردن dependency get_db
+# -----------------------------
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+_client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def api_database():
+    """ساخت دوباره اسکیمای test.db و inventory برای هر ماژول تست."""
+    Base.metadata.drop_all(bind=test_engine)
+    Base.metadata.create_all(bind=test_engine)
+
+    # ساخت inventory شبیه‌سازی‌شده GPU ها
+    db = TestingSessionLocal()
+    try:
+        seed_inventory(db, "A100:2x8:8,T4:1x2:1")
+    finally:
+        db.close()
+
+    # id کاربرها در دیتابیس تازه دوباره از 1 شروع می‌شوند
+    reset_placement_engine()
+    principal_cache.clear()
+    api_key_table.clear()
+    rate_limit._rate_limiter = None
+    yield test_engine
+
+
+@pytest.fixture
+def engine(api_database):
+    return api_database
+
+
+@pytest.fixture
+def SessionLocal(api_database):
+    return TestingSessionLocal
+
+
+@pytest.fixture
+def client(api_database):
+    return _client
+
+
+@pytest.fixture
+def make_user_admin(SessionLocal) -> Callable[[str], None]:
+    """کمک‌کننده برای ادمین کردن یک کاربر در تست‌ها."""
+
+    def promote(email: str) -> None:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.email == email).first()
+            assert user is not None, "User not found to promote to admin"
+            user.is_admin = True
+            db.commit()
+        finally:
+            db.close()
+
+    return promote
+
+
+@pytest.fixture
+def register_admin(client, make_user_admin) -> Callable[..., dict]:
+    """ثبت‌نام، ادمین کردن و لاگین؛ هدر Authorization را برمی‌گرداند."""
+
+    def register(email: str, password: str = "123456") -> dict:
+        resp = client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "full_name": "Admin", "password": password},
+        )
+        assert resp.status_code == 201, resp.text
+        make_user_admin(email)
+        resp = client.post(
+            "/api/v1/auth/login",
+            data={"username": email, "password": password},
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        assert resp.status_code == 200, resp.text
+        return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    return register
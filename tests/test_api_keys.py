@@ -0,0 +1,51 @@
+# tests/test_api_keys.py
+
+
+def test_api_keys_authenticate_machine_clients_until_revoked(client, register_admin):
+    from app.core.api_keys import api_key_table
+
+    headers = register_admin("ci-bot@example.com")
+    resp = client.post("/api/v1/auth/api-keys", headers=headers, json={"name": "ci"})
+    assert resp.status_code == 201, resp.text
+    created = resp.json()
+    key = created["key"]
+    assert key.startswith(f"gpk_{created['prefix']}_")
+
+    # لیست کلیدها خود کلید را برنمی‌گرداند
+    resp = client.get("/api/v1/auth/api-keys", headers=headers)
+    assert [k["prefix"] for k in resp.json()] == [created["prefix"]]
+    assert "key" not in resp.json()[0]
+
+    # کلید در X-API-Key یا به جای JWT در Authorization
+    hits_before = api_key_table.stats()["hits"]
+    for key_headers in ({"X-API-Key": key}, {"Authorization": f"Bearer {key}"}):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=key_headers,
+            json={
+                "name": "CI Job",
+                "gpu_type": "T4",
+                "num_gpus": 1,
+                "estimated_hours": 0.5,
+                "command": "pytest",
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        assert client.get("/api/v1/admin/jobs", headers=key_headers).status_code == 200
+    assert api_key_table.stats()["hits"] > hits_before
+
+    # prefix درست با secret اشتباه، یا کلید بدشکل
+    forged = key[:-4] + ("AAAA" if not key.endswith("AAAA") else "BBBB")
+    for bad in (forged, "gpk_short", "gpk_"):
+        assert client.get("/api/v1/jobs", headers={"X-API-Key": bad}).status_code == 401
+
+    # کاربر دیگر نمی‌تواند کلید را باطل کند
+    other = register_admin("ci-other@example.com")
+    resp = client.delete(f"/api/v1/auth/api-keys/{created['id']}", headers=other)
+    assert resp.status_code == 404
+
+    resp = client.delete(f"/api/v1/auth/api-keys/{created['id']}", headers=headers)
+    assert resp.status_code == 204
+    assert client.get("/api/v1/jobs", headers={"X-API-Key": key}).status_code == 401
+    resp = client.get("/api/v1/auth/api-keys", headers=headers)
+    assert resp.json()[0]["revoked_at"] is not None
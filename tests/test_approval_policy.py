@@ -0,0 +1,150 @@
+import json
+import os
+
+import pytest
+
+from app.config import settings
+from app.services.approval_policy import (
+    JobFacts,
+    compile_policy,
+    get_approval_policy,
+)
+
+POLICY = {
+    "rules": [
+        {
+            "name": "small-t4",
+            "gpu_types": ["T4"],
+            "max_gpus": 2,
+            "max_hours": 4,
+            "allow_sensitive": False,
+            "data_location_prefixes": ["s3://public/"],
+            "min_quota_headroom_hours": 5,
+        },
+        {"name": "tiny-anything", "max_gpus": 1, "max_hours": 0.5},
+    ]
+}
+
+
+def _facts(**overrides):
+    facts = dict(
+        gpu_type="T4",
+        num_gpus=1,
+        estimated_hours=2,
+        is_sensitive=False,
+        data_location=None,
+        quota_headroom_hours=50,
+    )
+    facts.update(overrides)
+    return JobFacts(**facts)
+
+
+def test_first_matching_rule_approves():
+    policy = compile_policy(POLICY)
+
+    assert policy.evaluate(_facts()) == "small-t4"
+    assert policy.evaluate(_facts(data_location="s3://public/imagenet")) == "small-t4"
+    assert policy.evaluate(_facts(gpu_type="A100", estimated_hours=0.5)) == "tiny-anything"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"gpu_type": "A100"},
+        {"num_gpus": 3},
+        {"estimated_hours": 8},
+        {"is_sensitive": True},
+        {"data_location": "s3://private/medical"},
+        {"quota_headroom_hours": 1},
+    ],
+)
+def test_each_condition_can_block_approval(overrides):
+    assert compile_policy(POLICY).evaluate(_facts(**overrides)) is None
+
+
+def test_unknown_condition_is_rejected():
+    with pytest.raises(ValueError, match="unknown condition 'max_gpu'"):
+        compile_policy({"rules": [{"name": "typo", "max_gpu": 2}]})
+
+
+@pytest.mark.parametrize(
+    "rule, match",
+    [
+        ({"allow_sensitive": "false"}, "'allow_sensitive'"),
+        ({"data_location_prefixes": "s3://public/"}, "'data_location_prefixes'"),
+        ({"gpu_types": "T4"}, "'gpu_types'"),
+        ({"max_gpus": "2"}, "'max_gpus'"),
+        ({"max_hours": True}, "'max_hours'"),
+        ({"min_quota_headroom_hours": None}, "'min_quota_headroom_hours'"),
+        ({}, "has no conditions"),
+        ({"allow_sensitive": True}, "has no conditions"),
+        ({"allow_sensitive": False}, "has no conditions"),
+    ],
+)
+def test_invalid_condition_values_are_rejected(rule, match):
+    with pytest.raises(ValueError, match=match):
+        compile_policy({"rules": [{"name": "loose", **rule}]})
+
+
+def test_policy_file_is_reloaded_when_it_changes(tmp_path, monkeypatch):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps(POLICY))
+    monkeypatch.setattr(settings, "AUTO_APPROVAL_POLICY_FILE", str(path))
+    monkeypatch.setattr(settings, "AUTO_APPROVAL_RELOAD_SECONDS", 0)
+
+    assert len(get_approval_policy()) == 2
+
+    path.write_text(json.dumps({"rules": [POLICY["rules"][0]]}))
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+    assert len(get_approval_policy()) == 1
+
+    # فایل خراب قوانین قبلی را از کار نمی‌اندازد
+    path.write_text("{not json")
+    os.utime(path, (mtime + 10, mtime + 10))
+    assert len(get_approval_policy()) == 1
+
+    monkeypatch.setattr(settings, "AUTO_APPROVAL_POLICY_FILE", "")
+    assert len(get_approval_policy()) == 0
+
+
+def test_create_job_applies_auto_approval_rules(client, register_admin, tmp_path, monkeypatch):
+    policy_file = tmp_path / "policy.json"
+    policy_file.write_text(
+        '{"rules": [{"name": "small-t4", "gpu_types": ["T4"], "max_gpus": 1,'
+        ' "max_hours": 2, "allow_sensitive": false}]}'
+    )
+    monkeypatch.setattr(settings, "AUTO_APPROVAL_POLICY_FILE", str(policy_file))
+    headers = register_admin("autoapprove@example.com")
+    resp = client.post("/api/v1/admin/jobs/approval-policy/reload", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"rules": 1}
+
+    def create(**overrides):
+        payload = {
+            "name": "auto",
+            "gpu_type": "T4",
+            "num_gpus": 1,
+            "estimated_hours": 1,
+            "command": "python eval.py",
+        }
+        payload.update(overrides)
+        resp = client.post("/api/v1/jobs", headers=headers, json=payload)
+        assert resp.status_code == 201, resp.text
+        return resp.json()["status"]
+
+    assert create() == "APPROVED"
+    assert create(is_sensitive=True) == "PENDING"
+    assert create(gpu_type="A100") == "PENDING"
+
+    # دسته: هر Job جدا بررسی می‌شود
+    batch = [
+        {"name": "a", "gpu_type": "T4", "estimated_hours": 1, "command": "run"},
+        {"name": "b", "gpu_type": "A100", "estimated_hours": 1, "command": "run"},
+    ]
+    resp = client.post("/api/v1/jobs/batch", headers=headers, json={"jobs": batch})
+    assert resp.status_code == 201, resp.text
+    assert [job["status"] for job in resp.json()["jobs"]] == ["APPROVED", "PENDING"]
+
+    monkeypatch.setattr(settings, "AUTO_APPROVAL_POLICY_FILE", "")
+    client.post("/api/v1/admin/jobs/approval-policy/reload", headers=headers)
@@ -1,75 +1,10 @@
 # tests/test_auth_and_jobs.py
 import time
 
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import app.services.worker as job_worker
 
-from app.main import app
-import app.db.session as db_session
-from app.db.session import Base, get_db
-from app.models.user import User
-import app.services.job_runner as job_runner
 
-# -----------------------------
-#  تنظیم دیتابیس تست (SQLite)
-# -----------------------------
-
-TEST_DATABASE_URL = "sqlite:///./test.db"
-
-# یک engine جدید فقط برای تست
-test_engine = create_engine(
-    TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
-
-# یک SessionLocal جدید که به sqlite متصل است
-TestingSessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=test_engine,
-)
-
-# جایگزین کردن engine و SessionLocal در ماژول اصلی db_session
-db_session.engine = test_engine
-db_session.SessionLocal = TestingSessionLocal
-
-job_runner.SessionLocal = TestingSessionLocal
-
-# ساخت اسکیمای دیتابیس تست
-Base.metadata.drop_all(bind=test_engine)
-Base.metadata.create_all(bind=test_engine)
-
-
-# -----------------------------
-#  override کردن dependency get_db
-# -----------------------------
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
-
-client = TestClient(app)
-
-
-def make_user_admin(email: str) -> None:
-    """کمک‌کننده برای ادمین کردن یک کاربر در تست‌ها."""
-    db = TestingSessionLocal()
-    try:
-        user = db.query(User).filter(User.email == email).first()
-        assert user is not None, "User not found to promote to admin"
-        user.is_admin = True
-        db.commit()
-    finally:
-        db.close()
-
-
-def test_register_and_login():
+def test_register_and_login(client):
     email = "testuser@example.com"
     password = "123456"
 
@@ -99,7 +34,7 @@ def test_register_and_login():
     assert data["token_type"] == "bearer"
 
 
-def test_job_lifecycle_simulation():
+def test_job_lifecycle_simulation(client, make_user_admin):
     email = "jobuser@example.com"
     password = "123456"
 
@@ -155,7 +90,7 @@ def test_job_lifecycle_simulation():
     assert resp.status_code == 200, resp.text
     assert resp.json()["status"] == "APPROVED"
 
-    # ادمین → start (Simulation در بک‌گراند)
+    # ادمین → start (Job وارد صف اجرا می‌شود)
     resp = client.post(
         f"/api/v1/admin/jobs/{job_id}/start",
         headers=headers,
@@ -163,6 +98,9 @@ def test_job_lifecycle_simulation():
     assert resp.status_code == 200, resp.text
     assert resp.json()["status"] == "RUNNING"
 
+    # اجرای صف توسط worker (به جای BackgroundTasks)
+    assert job_worker.drain_queue(worker_id="test-worker") == 1
+
     # صبر و polling تا Job از RUNNING خارج شود
     final_status = None
     for _ in range(10):
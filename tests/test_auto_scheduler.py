@@ -0,0 +1,146 @@
+# tests/test_auto_scheduler.py
+import app.services.worker as job_worker
+
+
+def test_auto_scheduler_starts_approved_jobs(client, register_admin, SessionLocal):
+    from app.services.auto_scheduler import AutoScheduler
+
+    headers = register_admin("scheduler@example.com")
+    job_ids = []
+    for i in range(2):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": f"auto-{i}",
+                "gpu_type": "A100",
+                "num_gpus": 2,
+                "estimated_hours": 1,
+                "command": "python train.py",
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        job_ids.append(resp.json()["id"])
+        resp = client.post(
+            f"/api/v1/admin/jobs/{job_ids[-1]}/approve", headers=headers
+        )
+        assert resp.status_code == 200, resp.text
+
+    scheduler = AutoScheduler(session_factory=SessionLocal)
+    assert scheduler.tick() == 2
+    # دور دوم چیزی برای شروع ندارد
+    assert scheduler.tick() == 0
+
+    for job_id in job_ids:
+        resp = client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+        assert resp.json()["status"] == "RUNNING"
+
+    assert job_worker.drain_queue(worker_id="test-worker") == 2
+
+
+def test_auto_scheduler_sync_picks_up_late_commits(client, register_admin, SessionLocal):
+    from datetime import datetime, timedelta
+
+    from app.services.auto_scheduler import AutoScheduler
+    from app.services.lifecycle import transition
+
+    headers = register_admin("late-commit@example.com")
+    job_ids = []
+    for i in range(2):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": f"late-{i}",
+                "gpu_type": "H100",
+                "num_gpus": 1,
+                "estimated_hours": 1,
+                "command": "python train.py",
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        job_ids.append(resp.json()["id"])
+    slow, fast = job_ids
+
+    # H100 در موجودی نیست: Job ها فقط در backlog زمان‌بند می‌مانند
+    scheduler = AutoScheduler(session_factory=SessionLocal)
+    db = SessionLocal()
+    writer = SessionLocal()
+    try:
+        resp = client.post(f"/api/v1/admin/jobs/{fast}/approve", headers=headers)
+        assert resp.status_code == 200, resp.text
+        # updated_at این تغییر قبل از fast است ولی هنوز commit نشده
+        moment = datetime.utcnow() - timedelta(seconds=5)
+        assert transition(writer, slow, "approve", now=moment).applied
+        scheduler.sync(db)
+        db.rollback()
+        assert fast in scheduler._known and slow not in scheduler._known
+
+        writer.commit()
+        assert scheduler.sync(db) == 1
+        assert slow in scheduler._known
+        # پنجره overlap دوباره خوانده می‌شود ولی Job ها دو بار اضافه نمی‌شوند
+        assert scheduler.sync(db) == 0
+
+        # شروع شدن بیرون از زمان‌بند (ادمین یا process دیگر): Job از _known و
+        # backlog حذف می‌شود
+        assert transition(writer, fast, "start", now=datetime.utcnow()).applied
+        writer.commit()
+        assert scheduler.sync(db) == 0
+        assert fast not in scheduler._known and slow in scheduler._known
+        assert fast in scheduler.policy._removed
+    finally:
+        writer.close()
+        db.close()
+
+
+def test_auto_scheduler_preempts_lower_priority_jobs(client, register_admin, SessionLocal):
+    from app.services.auto_scheduler import AutoScheduler
+
+    headers = register_admin("preempt@example.com")
+
+    def create_and_approve(name, priority):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": name,
+                "gpu_type": "A100",
+                "num_gpus": 8,
+                "estimated_hours": 0.25,
+                "priority": priority,
+                "command": "python train.py",
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        job_id = resp.json()["id"]
+        resp = client.post(f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+        assert resp.status_code == 200, resp.text
+        return job_id
+
+    # دو Job کم‌اولویت هر دو node A100 را پر می‌کنند
+    low_ids = [create_and_approve(f"batch-{i}", "LOW") for i in range(2)]
+    scheduler = AutoScheduler(session_factory=SessionLocal)
+    assert scheduler.tick() == 2
+
+    urgent_id = create_and_approve("urgent", "HIGH")
+    assert scheduler.tick() == 1
+
+    statuses = {
+        job_id: client.get(f"/api/v1/jobs/{job_id}", headers=headers).json()
+        for job_id in low_ids + [urgent_id]
+    }
+    assert statuses[urgent_id]["status"] == "RUNNING"
+    assert statuses[urgent_id]["priority"] == "HIGH"
+    preempted = [j for j in low_ids if statuses[j]["status"] == "APPROVED"]
+    assert len(preempted) == 1
+    assert statuses[preempted[0]]["preemptions"] == 1
+
+    # ردیف صف Job متوقف‌شده حذف شده است؛ فقط دو Job در حال اجرا پردازش می‌شوند
+    assert job_worker.drain_queue(worker_id="test-worker") == 2
+
+    # Job preempt شده با پیشرفت ذخیره‌شده دوباره شروع می‌شود
+    assert scheduler.tick() == 1
+    assert job_worker.drain_queue(worker_id="test-worker") == 1
+    resp = client.get(f"/api/v1/jobs/{preempted[0]}", headers=headers)
+    assert resp.json()["status"] in ("COMPLETED", "FAILED")
@@ -0,0 +1,87 @@
+# tests/test_bulk_transitions.py
+import app.services.worker as job_worker
+from app.models.job import JobStatus
+
+
+def test_bulk_admin_transitions(client, register_admin):
+    headers = register_admin("bulk@example.com")
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+    job_ids = []
+    for i in range(3):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": f"bulk-{i}",
+                "gpu_type": "T4",
+                "num_gpus": 1,
+                "estimated_hours": 1,
+                "command": "python train.py",
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        job_ids.append(resp.json()["id"])
+
+    # باید دقیقا یکی از job_ids یا filter داده شود
+    resp = client.post("/api/v1/admin/jobs/bulk/approve", headers=headers, json={})
+    assert resp.status_code == 422
+    # filter خالی همه Job های سیستم را انتخاب می‌کرد
+    for action in ("approve", "reject"):
+        resp = client.post(
+            f"/api/v1/admin/jobs/bulk/{action}", headers=headers, json={"filter": {}}
+        )
+        assert resp.status_code == 422
+
+    resp = client.post(
+        "/api/v1/admin/jobs/bulk/reject",
+        headers=headers,
+        json={"job_ids": [job_ids[2]]},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["succeeded"] == [job_ids[2]]
+
+    resp = client.post(
+        "/api/v1/admin/jobs/bulk/approve",
+        headers=headers,
+        json={"job_ids": job_ids + [999999]},
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["succeeded"] == job_ids[:2]
+    assert {s["id"]: s["reason"] for s in body["skipped"]} == {
+        job_ids[2]: f"Cannot approve a job in status {JobStatus.REJECTED}",
+        999999: "Job not found",
+    }
+
+    # inventory تست دو T4 دارد؛ Job سه‌تایی (APPROVED) جا نمی‌شود
+    resp = client.post(
+        "/api/v1/jobs",
+        headers=headers,
+        json={
+            "name": "bulk-too-big",
+            "gpu_type": "T4",
+            "num_gpus": 3,
+            "estimated_hours": 1,
+            "command": "python train.py",
+        },
+    )
+    assert resp.status_code == 201, resp.text
+    too_big = resp.json()["id"]
+    resp = client.post(f"/api/v1/admin/jobs/{too_big}/approve", headers=headers)
+    assert resp.status_code == 200, resp.text
+
+    resp = client.post(
+        "/api/v1/admin/jobs/bulk/start",
+        headers=headers,
+        json={"filter": {"gpu_type": "T4", "user_id": user_id}},
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["succeeded"] == job_ids[:2]
+    assert [s["id"] for s in body["skipped"]] == [too_big]
+    assert "Not enough free T4 GPUs" in body["skipped"][0]["reason"]
+
+    for job_id in job_ids[:2]:
+        resp = client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+        assert resp.json()["status"] == "RUNNING"
+    assert job_worker.drain_queue(worker_id="test-worker") == len(body["succeeded"])
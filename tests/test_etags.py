@@ -0,0 +1,74 @@
+# tests/test_etags.py
+
+
+def test_job_reads_answer_if_none_match_without_touching_jobs(
+    client, register_admin, SessionLocal, engine
+):
+    from sqlalchemy import event
+
+    headers = register_admin("etag@example.com")
+    other = register_admin("etag-other@example.com")
+    job = {
+        "name": "etag",
+        "gpu_type": "T4",
+        "num_gpus": 1,
+        "estimated_hours": 0.1,
+        "command": "python train.py",
+    }
+    job_id = client.post("/api/v1/jobs", headers=headers, json=job).json()["id"]
+
+    resp = client.get("/api/v1/jobs", headers=headers)
+    assert resp.status_code == 200
+    user_etag = resp.headers["ETag"]
+    admin_etag = client.get("/api/v1/admin/jobs", headers=headers).headers["ETag"]
+    detail_etag = client.get(f"/api/v1/jobs/{job_id}", headers=headers).headers["ETag"]
+    # ETag یک پاسخ برای پاسخ دیگری (فیلتر دیگر) معتبر نیست
+    resp = client.get(
+        "/api/v1/jobs",
+        headers={**headers, "If-None-Match": user_etag},
+        params={"status_filter": "PENDING"},
+    )
+    assert resp.status_code == 200
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for url, etag in (
+            ("/api/v1/jobs", user_etag),
+            (f"/api/v1/jobs/{job_id}", detail_etag),
+            ("/api/v1/admin/jobs", admin_etag),
+        ):
+            resp = client.get(url, headers={**headers, "If-None-Match": etag})
+            assert resp.status_code == 304, url
+            assert resp.content == b""
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements
+    assert not any(" jobs" in statement for statement in statements)
+
+    # Job کاربر دیگر: لیست این کاربر همان است ولی لیست ادمین نه
+    client.post("/api/v1/jobs", headers=other, json=job)
+    resp = client.get("/api/v1/jobs", headers={**headers, "If-None-Match": user_etag})
+    assert resp.status_code == 304
+    resp = client.get("/api/v1/admin/jobs", headers={**headers, "If-None-Match": admin_etag})
+    assert resp.status_code == 200
+
+    # تغییر وضعیت Job خود کاربر ETag او را عوض می‌کند
+    client.post(f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+    resp = client.get("/api/v1/jobs", headers={**headers, "If-None-Match": user_etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != user_etag
+    assert resp.json()[0]["status"] == "APPROVED"
+
+    # نسخه global ردیف مشترکی ندارد که همه نویسنده‌ها رویش قفل شوند
+    from app.models.change_version import JobChangeVersion
+
+    db = SessionLocal()
+    try:
+        assert db.get(JobChangeVersion, "global") is None
+    finally:
+        db.close()
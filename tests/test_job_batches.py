@@ -0,0 +1,67 @@
+# tests/test_job_batches.py
+
+
+def test_batch_and_array_jobs_share_one_reservation_and_insert(client, register_admin, engine):
+    from sqlalchemy import event
+
+    headers = register_admin("sweeper@example.com")
+    other = register_admin("not-the-sweeper@example.com")
+    array = {
+        "name": "sweep",
+        "gpu_type": "T4",
+        "estimated_hours": 1,
+        "command": "python train.py --lr {lr} --bs {bs} | awk '{print $1}'",
+        "parameters": {"lr": [0.1, 0.01], "bs": [32, 64, 128]},
+    }
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(" ".join(statement.split()[:3]).upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = client.post("/api/v1/jobs/batch", headers=headers, json={"array": array})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert resp.status_code == 201, resp.text
+    body = resp.json()
+    array_id = body["array_id"]
+    assert [job["array_index"] for job in body["jobs"]] == list(range(6))
+    assert body["jobs"][4]["name"] == "sweep[4]"
+    assert body["jobs"][4]["command"] == (
+        "python train.py --lr 0.01 --bs 64 | awk '{print $1}'"
+    )
+    assert statements.count("INSERT INTO JOBS") == 1
+    assert statements.count("UPDATE USER_QUOTAS SET") == 1
+
+    resp = client.get(f"/api/v1/jobs/arrays/{array_id}/4", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["id"] == body["jobs"][4]["id"]
+    resp = client.get(f"/api/v1/jobs/arrays/{array_id}", headers=headers)
+    assert [job["array_index"] for job in resp.json()] == list(range(6))
+    assert client.get(f"/api/v1/jobs/arrays/{array_id}/6", headers=headers).status_code == 404
+    assert client.get(f"/api/v1/jobs/arrays/{array_id}/0", headers=other).status_code == 403
+    assert client.get(f"/api/v1/jobs/arrays/{array_id}", headers=other).status_code == 403
+
+    # 6 از 10 ساعت مصرف شده: دسته 5 ساعتی کامل رد می‌شود
+    job = {"name": "one", "gpu_type": "T4", "estimated_hours": 1, "command": "run"}
+    resp = client.post("/api/v1/jobs/batch", headers=headers, json={"jobs": [job] * 5})
+    assert resp.status_code == 400
+    assert resp.json()["detail"].endswith("Available: 4.0h")
+    resp = client.get("/api/v1/jobs", headers=headers)
+    assert len(resp.json()) == 6
+
+    resp = client.post("/api/v1/jobs/batch", headers=headers, json={"jobs": [job] * 4})
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["array_id"] is None
+    assert {j["status"] for j in resp.json()["jobs"]} == {"PENDING"}
+
+    for invalid in (
+        {},
+        {"jobs": [job], "array": array},
+        {"array": {**array, "parameters": {"lr": [0.1], "unused": [1]}}},
+        {"array": {**array, "parameters": {"lr": list(range(40)), "bs": list(range(40))}}},
+    ):
+        resp = client.post("/api/v1/jobs/batch", headers=headers, json=invalid)
+        assert resp.status_code == 422, invalid
@@ -0,0 +1,96 @@
+# tests/test_job_events.py
+
+
+def test_job_events_push_transitions_to_subscribers(client, register_admin):
+    import asyncio
+
+    from app.services.job_events import JobEvent, JobEventBroker, broker, event_stream
+
+    headers = register_admin("events@example.com")
+    other = register_admin("events-other@example.com")
+    job = {
+        "name": "events",
+        "gpu_type": "T4",
+        "num_gpus": 1,
+        "estimated_hours": 0.1,
+        "command": "python train.py",
+    }
+    job_id = client.post("/api/v1/jobs", headers=headers, json=job).json()["id"]
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+
+    def call(method, url, **kwargs):
+        return asyncio.to_thread(getattr(client, method), url, **kwargs)
+
+    async def scenario():
+        mine = broker.subscribe(user_id=user_id)
+        everything = broker.subscribe()
+        try:
+            resp = await call("post", "/api/v1/jobs", headers=other, json=job)
+            other_id = resp.json()["id"]
+            await call("post", f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+            # conflict: چیزی commit نمی‌شود و رویدادی هم نیست
+            await call("post", f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+            await call(
+                "post", "/api/v1/admin/jobs/bulk/reject",
+                headers=headers, json={"job_ids": [other_id]},
+            )
+
+            got = await mine.get(timeout=1)
+            assert (got.job_id, got.action, got.status) == (job_id, "approve", "APPROVED")
+            assert await mine.get(timeout=0.05) is None
+
+            seen = [await everything.get(timeout=1) for _ in range(3)]
+            assert [(e.job_id, e.action, e.status) for e in seen] == [
+                (other_id, "create", "PENDING"),
+                (job_id, "approve", "APPROVED"),
+                (other_id, "reject", "REJECTED"),
+            ]
+            assert await everything.get(timeout=0.05) is None
+        finally:
+            mine.close()
+            everything.close()
+
+    asyncio.run(scenario())
+    assert broker.subscriber_count() == 0
+
+    async def stream(local_broker, events):
+        subscription = local_broker.subscribe(user_id=user_id)
+        local_broker.publish(events)
+        await asyncio.sleep(0)  # تحویل رویدادها روی همین loop
+        checks = iter([False, False, True])
+
+        async def is_disconnected():
+            return next(checks)
+
+        return [
+            chunk
+            async for chunk in event_stream(
+                subscription, is_disconnected, heartbeat_seconds=0.01
+            )
+        ]
+
+    done = JobEvent(job_id, user_id, "complete", "COMPLETED")
+    foreign = JobEvent(job_id + 1, user_id + 1, "complete", "COMPLETED")
+    chunks = asyncio.run(stream(JobEventBroker(), [foreign, done]))
+    assert chunks == [
+        b"retry: 5000\n\n",
+        f"event: job\ndata: {done.to_json()}\n\n".encode(),
+        b": ping\n\n",
+    ]
+    # client عقب‌مانده به جای رویدادهای قدیمی resync می‌گیرد
+    chunks = asyncio.run(stream(JobEventBroker(queue_size=1), [done, done]))
+    assert chunks[1:] == [b"event: resync\ndata: {}\n\n", b": ping\n\n"]
+
+    # EventSource توکن را در query می‌فرستد؛ لیست همه Job ها فقط برای ادمین
+    client.post(
+        "/api/v1/auth/register",
+        json={"email": "events-user@example.com", "full_name": "User", "password": "123456"},
+    )
+    token = client.post(
+        "/api/v1/auth/login",
+        data={"username": "events-user@example.com", "password": "123456"},
+    ).json()["access_token"]
+    resp = client.get("/api/v1/admin/jobs/events", params={"access_token": token})
+    assert resp.status_code == 403
+    resp = client.get("/api/v1/jobs/events", params={"access_token": "bad"})
+    assert resp.status_code == 401
@@ -0,0 +1,204 @@
+# tests/test_job_lists.py
+
+
+def test_job_lists_use_keyset_pagination(client, register_admin):
+    headers = register_admin("pages@example.com")
+    created = []
+    for i in range(5):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": f"page-{i}",
+                "gpu_type": "T4",
+                "num_gpus": 1,
+                "estimated_hours": 0.1,
+                "command": "python train.py",
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        created.append(resp.json()["id"])
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, "include_total": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/v1/jobs", headers=headers, params=params)
+        assert resp.status_code == 200, resp.text
+        assert resp.headers["X-Total-Count"] == "5"
+        assert len(resp.json()) <= 2
+        seen += [job["id"] for job in resp.json()]
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen == created[::-1]
+
+    resp = client.get(
+        "/api/v1/admin/jobs",
+        headers=headers,
+        params={"limit": 1, "status_filter": "PENDING"},
+    )
+    assert resp.status_code == 200, resp.text
+    assert len(resp.json()) == 1
+    assert "X-Next-Cursor" in resp.headers
+    assert "X-Total-Count" not in resp.headers
+
+    resp = client.get("/api/v1/jobs", headers=headers, params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+    resp = client.get("/api/v1/jobs", headers=headers, params={"limit": 100000})
+    assert resp.status_code == 422
+
+
+def test_job_export_streams_same_rows_as_list(client, register_admin, SessionLocal, monkeypatch):
+    import json
+
+    from app.config import settings
+    from app.models.job import Job
+    from app.schemas.job import JobRead
+
+    headers = register_admin("export@example.com")
+    for i in range(5):
+        resp = client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": f"export-{i}",
+                "gpu_type": "T4",
+                "num_gpus": 1,
+                "estimated_hours": 0.1,
+                "command": "python train.py",
+                "data_location": "s3://bucket/data" if i % 2 else None,
+            },
+        )
+        assert resp.status_code == 201, resp.text
+
+    all_fields = ",".join(JobRead.model_fields)
+    listed = client.get(
+        "/api/v1/jobs", headers=headers, params={"limit": 500, "fields": all_fields}
+    ).json()
+    assert len(listed) == 5
+
+    # مسیر سریع همان خروجی JobRead را می‌دهد
+    db = SessionLocal()
+    try:
+        expected = [
+            JobRead.model_validate(db.get(Job, job["id"])).model_dump(mode="json")
+            for job in listed
+        ]
+    finally:
+        db.close()
+    assert listed == expected
+
+    # چند دسته کوچک تا مرز دسته‌ها هم تست شود
+    monkeypatch.setattr(settings, "JOB_EXPORT_BATCH_SIZE", 2)
+    resp = client.get("/api/v1/jobs/export", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in resp.text.splitlines()] == listed
+
+    resp = client.get("/api/v1/jobs/export", headers=headers, params={"format": "json"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == listed
+
+    resp = client.get(
+        "/api/v1/admin/jobs/export",
+        headers=headers,
+        params={"format": "json", "status_filter": "PENDING"},
+    )
+    assert resp.status_code == 200, resp.text
+    assert {job["id"] for job in listed} <= {job["id"] for job in resp.json()}
+
+    resp = client.get("/api/v1/jobs/export", headers=headers, params={"format": "xml"})
+    assert resp.status_code == 422
+
+
+def test_job_lists_project_fields_and_skip_heavy_columns(client, register_admin, engine):
+    from sqlalchemy import event
+
+    headers = register_admin("fields@example.com")
+    for i in range(3):
+        client.post(
+            "/api/v1/jobs",
+            headers=headers,
+            json={
+                "name": f"fields-{i}",
+                "gpu_type": "T4",
+                "num_gpus": 1,
+                "estimated_hours": 0.1,
+                "command": "python train.py " + "x" * 1000,
+                "data_location": "s3://bucket/data",
+            },
+        )
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        default = client.get("/api/v1/jobs", headers=headers).json()
+        admin_default = client.get("/api/v1/admin/jobs", headers=headers).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert len(default) == 3
+    for job in default + admin_default:
+        assert not {"command", "data_location", "error_message"} & set(job)
+        assert {"id", "name", "gpu_type", "status"} <= set(job)
+    job_selects = [s for s in statements if "FROM jobs" in s]
+    assert job_selects
+    assert not any("jobs.command" in s or "jobs.data_location" in s for s in job_selects)
+
+    # فقط فیلدهای خواسته‌شده؛ cursor بدون created_at در خروجی هم کار می‌کند
+    resp = client.get(
+        "/api/v1/jobs", headers=headers, params={"fields": "id,command", "limit": 2}
+    )
+    assert resp.status_code == 200, resp.text
+    first = resp.json()
+    assert [set(job) for job in first] == [{"id", "command"}] * 2
+    assert first[0]["command"].startswith("python train.py")
+    resp = client.get(
+        "/api/v1/jobs",
+        headers=headers,
+        params={"fields": "id,command", "limit": 2, "cursor": resp.headers["X-Next-Cursor"]},
+    )
+    assert [job["id"] for job in first + resp.json()] == [job["id"] for job in default]
+
+    # ETag هر projection جداست
+    etag = client.get("/api/v1/jobs", headers=headers).headers["ETag"]
+    resp = client.get(
+        "/api/v1/jobs",
+        headers={**headers, "If-None-Match": etag},
+        params={"fields": "id,command"},
+    )
+    assert resp.status_code == 200
+
+    resp = client.get("/api/v1/jobs", headers=headers, params={"fields": "id,password"})
+    assert resp.status_code == 400
+    assert "password" in resp.json()["detail"]
+
+    # export پیش‌فرض همه فیلدها را دارد
+    resp = client.get("/api/v1/jobs/export", headers=headers, params={"format": "json"})
+    assert "command" in resp.json()[0]
+    resp = client.get(
+        "/api/v1/admin/jobs/export", headers=headers, params={"format": "json", "fields": "id"}
+    )
+    assert all(set(job) == {"id"} for job in resp.json())
+
+    # جزئیات یک Job برای ادمین (ستون‌های سنگین فقط این‌جا لازم است)
+    job_id = default[0]["id"]
+    resp = client.get(f"/api/v1/admin/jobs/{job_id}", headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["data_location"] == "s3://bucket/data"
+    assert client.get("/api/v1/admin/jobs/999999", headers=headers).status_code == 404
+
+    # OpenAPI: ردیف لیست‌ها projection است و هیچ فیلدی اجباری نیست
+    spec = client.get("/openapi.json").json()
+    for path in ("/api/v1/jobs", "/api/v1/admin/jobs"):
+        schema = spec["paths"][path]["get"]["responses"]["200"]["content"]
+        item = schema["application/json"]["schema"]["items"]["$ref"].rsplit("/", 1)[-1]
+        assert item == "JobListItem"
+    assert not spec["components"]["schemas"]["JobListItem"].get("required")
@@ -0,0 +1,48 @@
+# tests/test_job_queue.py
+from app.models.user import User
+
+
+def test_job_queue_claim_is_exclusive_and_lease_expires(register_admin, SessionLocal):
+    from datetime import datetime, timedelta
+
+    from app.models.job import Job, JobStatus
+    from app.models.job_queue import JobQueueEntry
+    from app.services.job_queue import claim_jobs, enqueue_job
+
+    register_admin("queue@example.com")
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "queue@example.com").first()
+        job = Job(
+            user_id=user.id,
+            name="Queue Job",
+            gpu_type="A100",
+            num_gpus=1,
+            estimated_hours=1,
+            command="python train.py",
+            status=JobStatus.RUNNING,
+        )
+        db.add(job)
+        db.flush()
+        enqueue_job(db, job.id)
+        db.commit()
+
+        first = claim_jobs(db, worker_id="w1", limit=10, lease_seconds=60)
+        assert [e.job_id for e in first] == [job.id]
+
+        # ردیف claim شده نباید به worker دیگری برسد
+        assert claim_jobs(db, worker_id="w2", limit=10, lease_seconds=60) == []
+
+        # بعد از تمام شدن lease (مثلا crash شدن w1) دوباره قابل claim است
+        db.query(JobQueueEntry).filter(JobQueueEntry.job_id == job.id).update(
+            {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.commit()
+        second = claim_jobs(db, worker_id="w2", limit=10, lease_seconds=60)
+        assert [e.job_id for e in second] == [job.id]
+        assert second[0].attempts == 2
+
+        db.query(JobQueueEntry).delete()
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,197 @@
+# tests/test_job_runner.py
+import app.services.worker as job_worker
+from app.models.job import JobStatus
+from app.models.user import User
+
+
+def test_async_runner_multiplexes_jobs_and_writes_in_batches(register_admin, SessionLocal):
+    import asyncio
+
+    from app.models.job import Job, JobStatus
+    from app.services.job_runner import AsyncJobRunner
+
+    register_admin("async-runner@example.com")
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "async-runner@example.com").first()
+        jobs = [
+            Job(
+                user_id=user.id,
+                name=f"async-{i}",
+                gpu_type="A100",
+                num_gpus=1,
+                estimated_hours=1,
+                command="python train.py",
+                status=JobStatus.RUNNING,
+            )
+            for i in range(2000)
+        ]
+        db.add_all(jobs)
+        db.commit()
+        job_ids = [j.id for j in jobs]
+    finally:
+        db.close()
+
+    async def run():
+        runner = AsyncJobRunner(
+            session_factory=SessionLocal,
+            duration_fn=lambda hours, gpus: 0.01,
+            batch_size=500,
+        )
+        await runner.start()
+        for job_id in job_ids:
+            runner.submit(job_id=job_id, estimated_hours=1, num_gpus=1)
+        assert runner.in_flight == len(job_ids)
+        await runner.stop(drain=True)
+        return runner
+
+    runner = asyncio.run(run())
+    assert runner.peak_in_flight == len(job_ids)
+    assert runner.completed == len(job_ids)
+    assert runner.batches_written <= 10
+
+    db = SessionLocal()
+    try:
+        remaining = (
+            db.query(Job)
+            .filter(Job.id.in_(job_ids), Job.status == JobStatus.RUNNING)
+            .count()
+        )
+        assert remaining == 0
+    finally:
+        db.close()
+
+
+def test_async_runner_replaces_timer_when_preempted_job_is_reclaimed(
+    client, register_admin, SessionLocal
+):
+    import asyncio
+
+    from app.models.job import Job
+    from app.models.job_queue import JobQueueEntry
+    from app.services.job_queue import dequeue_job, enqueue_job
+    from app.services.job_runner import AsyncJobRunner
+    from app.services.lifecycle import transition
+
+    headers = register_admin("reclaim@example.com")
+    resp = client.post(
+        "/api/v1/jobs",
+        headers=headers,
+        json={
+            "name": "reclaim",
+            "gpu_type": "H100",
+            "num_gpus": 1,
+            "estimated_hours": 1,
+            "command": "python train.py",
+        },
+    )
+    assert resp.status_code == 201, resp.text
+    job_id = resp.json()["id"]
+    resp = client.post(f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+    assert resp.status_code == 200, resp.text
+
+    def start():
+        db = SessionLocal()
+        try:
+            assert transition(db, job_id, "start").applied
+            enqueue_job(db, job_id)
+            db.commit()
+        finally:
+            db.close()
+
+    def preempt():
+        db = SessionLocal()
+        try:
+            assert transition(db, job_id, "preempt", progress_hours=0.5).applied
+            dequeue_job(db, job_id)
+            db.commit()
+        finally:
+            db.close()
+
+    async def scenario():
+        # اجرای اول طولانی است؛ اجرای بعد از preempt (با کار کمتر) کوتاه
+        runner = AsyncJobRunner(
+            session_factory=SessionLocal,
+            duration_fn=lambda hours, gpus: 0.05 if hours < 1 else 60,
+        )
+        await runner.start()
+        claims = []
+        for _ in range(2):
+            start()
+            claimed = job_worker._claim("reclaim-worker", 10)
+            assert [job for _, _, job, _, _ in claimed] == [job_id]
+            job_worker._submit(runner, "reclaim-worker", claimed)
+            # claim دوباره همان ردیف timer دوم نمی‌سازد
+            job_worker._submit(runner, "reclaim-worker", claimed)
+            assert runner.in_flight == 1
+            claims.append(claimed[0][:2])
+            if len(claims) == 1:
+                preempt()
+        assert claims[0] != claims[1]
+        await runner.stop(drain=True)
+        return runner
+
+    runner = asyncio.run(scenario())
+    assert runner.completed == 1
+
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).one()
+        assert job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        assert db.query(JobQueueEntry).filter(JobQueueEntry.job_id == job_id).count() == 0
+    finally:
+        db.close()
+
+
+def test_write_outcomes_ignores_stale_run_of_reused_queue_entry(
+    client, register_admin, SessionLocal
+):
+    from datetime import datetime, timedelta
+
+    from app.models.job import Job
+    from app.services.job_queue import claim_jobs, enqueue_job
+    from app.services.job_runner import JobOutcome, write_outcomes
+    from app.services.lifecycle import transition
+
+    headers = register_admin("stale-outcome@example.com")
+    resp = client.post(
+        "/api/v1/jobs",
+        headers=headers,
+        json={
+            "name": "stale",
+            "gpu_type": "H100",
+            "num_gpus": 1,
+            "estimated_hours": 1,
+            "command": "python train.py",
+        },
+    )
+    assert resp.status_code == 201, resp.text
+    job_id = resp.json()["id"]
+    resp = client.post(f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+    assert resp.status_code == 200, resp.text
+
+    db = SessionLocal()
+    try:
+        assert transition(db, job_id, "start").applied
+        enqueue_job(db, job_id)
+        db.commit()
+        (entry,) = claim_jobs(db, worker_id="stale-worker", limit=10, lease_seconds=60)
+        assert entry.job_id == job_id
+
+        def outcome(enqueued_at):
+            return JobOutcome(
+                job_id=job_id,
+                succeeded=True,
+                finished_at=datetime.utcnow(),
+                queue_entry_id=entry.id,
+                worker_id="stale-worker",
+                enqueued_at=enqueued_at,
+            )
+
+        # اجرای قبل از preempt: همان id و worker، ولی ردیف دیگری از صف
+        assert write_outcomes(db, [outcome(entry.enqueued_at - timedelta(minutes=5))]) == 0
+        assert db.query(Job.status).filter(Job.id == job_id).scalar() == JobStatus.RUNNING
+        assert write_outcomes(db, [outcome(entry.enqueued_at)]) == 1
+        assert db.query(Job.status).filter(Job.id == job_id).scalar() == JobStatus.COMPLETED
+    finally:
+        db.close()
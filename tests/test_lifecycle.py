@@ -0,0 +1,51 @@
+# tests/test_lifecycle.py
+from app.models.job import JobStatus
+
+
+def test_concurrent_transitions_conflict_instead_of_overwriting(
+    client, register_admin, SessionLocal
+):
+    from app.services.lifecycle import TransitionOutcome, transition
+
+    headers = register_admin("cas@example.com")
+    resp = client.post(
+        "/api/v1/jobs",
+        headers=headers,
+        json={
+            "name": "cas",
+            "gpu_type": "T4",
+            "num_gpus": 1,
+            "estimated_hours": 1,
+            "command": "python train.py",
+        },
+    )
+    assert resp.status_code == 201, resp.text
+    job_id = resp.json()["id"]
+
+    # دو ادمین هر دو Job را PENDING دیده‌اند؛ فقط اولی برنده می‌شود
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        approved = transition(first, job_id, "approve")
+        assert approved.outcome == TransitionOutcome.APPLIED
+        assert approved.job.status == JobStatus.APPROVED
+        first.commit()
+
+        rejected = transition(second, job_id, "reject")
+        assert rejected.outcome == TransitionOutcome.CONFLICT
+        assert rejected.current == JobStatus.APPROVED
+        second.rollback()
+
+        missing = transition(second, 999999, "approve")
+        assert missing.outcome == TransitionOutcome.NOT_FOUND
+    finally:
+        first.close()
+        second.close()
+
+    resp = client.post(f"/api/v1/admin/jobs/{job_id}/reject", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == f"Cannot reject a job in status {JobStatus.APPROVED}"
+    resp = client.post("/api/v1/admin/jobs/999999/approve", headers=headers)
+    assert resp.status_code == 404
+
+    resp = client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+    assert resp.json()["status"] == "APPROVED"
@@ -0,0 +1,175 @@
+# tests/test_migrations.py
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.routes_admin_jobs import list_all_jobs
+from app.api.v1.routes_jobs import list_my_jobs
+from app.db.migrations import alembic_config, upgrade_db
+from app.db.session import Base
+from app.models import Job, JobStatus, User
+from app.services.auto_scheduler import AutoScheduler
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade_db(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_match_models(migrated_engine):
+    with migrated_engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    assert diff == []
+
+
+def test_migrations_downgrade_and_upgrade_again(migrated_engine):
+    config = alembic_config()
+    with migrated_engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0001")
+        indexes = {i["name"] for i in inspect(connection).get_indexes("jobs")}
+        assert "ix_jobs_user_status_created" not in indexes
+        assert "ix_jobs_user_id" in indexes
+    upgrade_db(migrated_engine)
+    indexes = {i["name"] for i in inspect(migrated_engine).get_indexes("jobs")}
+    assert "ix_jobs_user_status_created" in indexes
+
+
+def test_pre_migration_database_is_stamped(tmp_path):
+    # اسکیمای create_all قدیمی: همان revision پایه، بدون جدول alembic_version
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    upgrade_db(engine, "0001")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+
+    upgrade_db(engine)
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    assert current == ScriptDirectory.from_config(alembic_config()).get_current_head()
+    engine.dispose()
+
+
+def test_job_stats_migration_backfills_existing_jobs(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    upgrade_db(engine, "0003")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, email, hashed_password, is_active, is_admin, created_at) "
+            "VALUES (1, 'stats@example.com', 'x', 1, 0, '2025-01-01 00:00:00')"
+        )
+        for i, (gpu_type, status, finished_at) in enumerate(
+            [
+                ("A100", "PENDING", None),
+                ("A100", "PENDING", None),
+                # 1.25 ساعت اجرا به علاوه 0.5 ساعت قبل از preempt، روی 2 GPU
+                ("T4", "COMPLETED", "'2025-01-02 12:45:00'"),
+            ]
+        ):
+            started_at = "'2025-01-02 11:30:00'" if finished_at else "NULL"
+            connection.exec_driver_sql(
+                "INSERT INTO jobs (user_id, name, gpu_type, num_gpus, estimated_hours, "
+                "priority, command, is_sensitive, status, created_at, updated_at, "
+                "started_at, finished_at, progress_hours, preemptions) VALUES "
+                f"(1, 'job-{i}', '{gpu_type}', 2, 1.5, 'NORMAL', 'run', 0, '{status}', "
+                "'2025-01-02 10:00:00', '2025-01-02 10:00:00', "
+                f"{started_at}, {finished_at or 'NULL'}, {0.5 if finished_at else 0}, 0)"
+            )
+
+    # 0004 هنوز GPU-hour درخواستی را می‌شمرد
+    upgrade_db(engine, "0004")
+    with engine.connect() as connection:
+        requested = connection.exec_driver_sql(
+            "SELECT sum(gpu_hours) FROM job_stats_rollups"
+        ).scalar()
+    assert requested == 9.0
+
+    upgrade_db(engine)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            "SELECT day, gpu_type, status, job_count, gpu_hours "
+            "FROM job_stats_rollups ORDER BY gpu_type"
+        ).all()
+    assert [tuple(row) for row in rows] == [
+        ("2025-01-02", "A100", "PENDING", 2, 0.0),
+        ("2025-01-02", "T4", "COMPLETED", 1, pytest.approx(3.5)),
+    ]
+    engine.dispose()
+
+
+def test_hot_job_queries_use_indexes(migrated_engine):
+    """
+    regression روی query plan: لیست‌ها و sync زمان‌بند نباید به اسکن کامل
+    جدول jobs برگردند، و صفحه‌بندی keyset نباید sort جداگانه لازم داشته باشد.
+    """
+    Session = sessionmaker(bind=migrated_engine, autoflush=False)
+    db = Session()
+    user = User(email="plans@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    start = datetime(2025, 1, 1)
+    for i in range(30):
+        db.add(
+            Job(
+                user_id=user.id,
+                name=f"job-{i}",
+                gpu_type="A100",
+                command="python train.py",
+                status=list(JobStatus)[i % len(JobStatus)],
+                created_at=start + timedelta(minutes=i),
+                updated_at=start + timedelta(minutes=i),
+            )
+        )
+    db.commit()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and " jobs" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(migrated_engine, "before_cursor_execute", capture)
+    try:
+        for status_filter in (None, JobStatus.PENDING):
+            response = list_my_jobs(
+                db=db, current_user=user, status_filter=status_filter,
+                limit=2, cursor=None, include_total=True, if_none_match=None,
+            )
+            list_my_jobs(
+                db=db, current_user=user, status_filter=status_filter,
+                limit=2, cursor=response.headers["X-Next-Cursor"], include_total=False,
+                if_none_match=None,
+            )
+            response = list_all_jobs(
+                db=db, current_admin=user, status_filter=status_filter,
+                limit=2, cursor=None, include_total=False, if_none_match=None,
+            )
+            list_all_jobs(
+                db=db, current_admin=user, status_filter=status_filter,
+                limit=2, cursor=response.headers["X-Next-Cursor"], include_total=False,
+                if_none_match=None,
+            )
+        list_statements = len(statements)
+        AutoScheduler(session_factory=Session).sync(db)
+    finally:
+        event.remove(migrated_engine, "before_cursor_execute", capture)
+        db.close()
+
+    assert list_statements >= 8
+    with migrated_engine.connect() as connection:
+        raw = connection.connection.driver_connection
+        for i, (statement, parameters) in enumerate(statements):
+            plan = [row[-1] for row in raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            for step in plan:
+                if step.startswith("SCAN jobs"):
+                    assert "USING" in step and "INDEX" in step, (statement, plan)
+            if i < list_statements and "count(" not in statement:
+                assert not any("TEMP B-TREE" in step for step in plan), (statement, plan)
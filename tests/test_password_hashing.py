@@ -0,0 +1,49 @@
+# tests/test_password_hashing.py
+from app.models.user import User
+
+
+def test_login_rehashes_on_cost_change_and_sheds_load(client, SessionLocal, monkeypatch):
+    from app.core.security import password_hasher
+
+    email = "rehash@example.com"
+    password = "123456"
+    form = {"username": email, "password": password}
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+
+    resp = client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "full_name": "Rehash User", "password": password},
+    )
+    assert resp.status_code == 201, resp.text
+
+    def stored_hash() -> str:
+        db = SessionLocal()
+        try:
+            return db.query(User).filter(User.email == email).one().hashed_password
+        finally:
+            db.close()
+
+    assert stored_hash().startswith(f"$2b${password_hasher.rounds:02d}$")
+
+    # BCRYPT_ROUNDS عوض شده: login موفق هش را با هزینه جدید بازنویسی می‌کند
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    resp = client.post("/api/v1/auth/login", data=form, headers=headers)
+    assert resp.status_code == 200, resp.text
+    assert stored_hash().startswith("$2b$04$")
+    resp = client.post("/api/v1/auth/login", data=form, headers=headers)
+    assert resp.status_code == 200, resp.text
+
+    resp = client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": "wrong"},
+        headers=headers,
+    )
+    assert resp.status_code == 400
+    assert stored_hash().startswith("$2b$04$")
+
+    # صف bcrypt پر: 429 با Retry-After به جای منتظر نگه داشتن درخواست
+    monkeypatch.setattr(password_hasher, "capacity", 0)
+    resp = client.post("/api/v1/auth/login", data=form, headers=headers)
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+    assert password_hasher.stats()["in_flight"] == 0
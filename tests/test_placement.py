@@ -0,0 +1,171 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db.session import Base
+from app.models import Job, JobStatus, User
+from app.services import placement
+from app.services.placement import PlacementEngine, parse_inventory_spec, seed_inventory
+
+
+def _build_engine(nodes, per_node, island_size, gpu_type="A100"):
+    rows = []
+    gpu_id = 1
+    for node_id in range(1, nodes + 1):
+        for i in range(per_node):
+            rows.append((gpu_id, node_id, gpu_type, i // island_size, None))
+            gpu_id += 1
+    engine = PlacementEngine()
+    engine.build(rows)
+    return engine
+
+
+def test_parse_inventory_spec():
+    assert parse_inventory_spec("A100:4x8:8, T4:2x4:1") == [
+        ("A100", 4, 8, 8),
+        ("T4", 2, 4, 1),
+    ]
+
+
+def test_multi_gpu_job_gets_a_whole_nvlink_island():
+    # هر node دو island چهارتایی دارد
+    engine = _build_engine(nodes=2, per_node=8, island_size=4)
+
+    # یک Job تک GPU یک island را نیمه‌کاره می‌کند
+    single = engine.allocate(1, "A100", 1)
+    assert single is not None
+
+    # Job چهار GPU ای باید یک island کامل بگیرد، نه island نیمه‌کاره
+    quad = engine.allocate(2, "A100", 4)
+    assert quad is not None
+    assert len({engine.island_of(g) for g in quad}) == 1
+    assert engine.island_of(single[0]) != engine.island_of(quad[0])
+
+
+def test_small_jobs_are_packed_into_fragmented_islands():
+    engine = _build_engine(nodes=2, per_node=8, island_size=4)
+
+    first = engine.allocate(1, "A100", 1)
+    second = engine.allocate(2, "A100", 1)
+    # best-fit: GPU دوم از همان island نیمه‌کاره برداشته می‌شود
+    assert engine.island_of(first[0]) == engine.island_of(second[0])
+
+
+def test_job_spanning_islands_stays_on_one_node():
+    engine = _build_engine(nodes=2, per_node=8, island_size=4)
+
+    gpus = engine.allocate(1, "A100", 8)
+    assert gpus is not None
+    assert len({engine.island_of(g)[0] for g in gpus}) == 1
+
+
+def test_capacity_is_enforced_and_release_restores_it():
+    engine = _build_engine(nodes=1, per_node=4, island_size=4)
+
+    assert engine.allocate(1, "A100", 3) is not None
+    assert engine.allocate(2, "A100", 2) is None
+    assert engine.allocate(3, "V100", 1) is None
+    assert engine.allocate(4, "A100", 5) is None
+
+    assert len(engine.release(1)) == 3
+    assert engine.free_gpus("A100") == 4
+    assert engine.allocate(2, "A100", 2) is not None
+
+
+@pytest.fixture
+def placement_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'placement.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    seed_inventory(db, "A100:2x4:4")
+    user = User(email="placement@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    jobs = [
+        Job(
+            user_id=user.id,
+            name=f"place-{i}",
+            gpu_type="A100",
+            num_gpus=4,
+            command="run",
+            status=JobStatus.APPROVED,
+        )
+        for i in range(3)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    placement.reset_placement_engine()
+    yield db, jobs
+    db.close()
+    placement.reset_placement_engine()
+    engine.dispose()
+
+
+def test_bulk_allocation_resyncs_only_when_needed(placement_db, monkeypatch):
+    db, jobs = placement_db
+    monkeypatch.setattr(settings, "PLACEMENT_RESYNC_SECONDS", 0)
+    placement.get_placement_engine(db)
+    loads = []
+    real_load = placement.load_placement_engine
+    monkeypatch.setattr(
+        placement,
+        "load_placement_engine",
+        lambda session: loads.append(1) or real_load(session),
+    )
+
+    # همه جا می‌شوند: ایندکس با وجود قدیمی بودن بازسازی نمی‌شود
+    assert len(placement.allocate_gpus_bulk(db, jobs[:2])) == 2
+    assert loads == []
+    db.commit()
+
+    # ظرفیت نیست و ایندکس قدیمی است: یک بار بازسازی برای اطمینان
+    assert placement.allocate_gpus_bulk(db, jobs[2:]) == {}
+    assert loads == [1]
+
+
+def test_rollback_returns_allocations_to_the_index(placement_db):
+    db, jobs = placement_db
+    index = placement.get_placement_engine(db)
+
+    assert len(placement.allocate_gpus_bulk(db, jobs[:2])) == 2
+    assert placement.allocate_gpus(db, jobs[2]) is None
+    assert index.free_gpus("A100") == 0
+    db.rollback()
+    assert index.free_gpus("A100") == 8
+
+    assert placement.allocate_gpus(db, jobs[2]) is not None
+    db.commit()
+    assert index.free_gpus("A100") == 4
+    # بعد از commit چیزی برای برگرداندن نمانده است
+    db.rollback()
+    assert index.free_gpus("A100") == 4
+
+
+def test_start_job_requires_free_gpu_capacity(client, register_admin):
+    headers = register_admin("capacity@example.com")
+
+    # inventory تست فقط دو T4 دارد
+    resp = client.post(
+        "/api/v1/jobs",
+        headers=headers,
+        json={
+            "name": "Too Big",
+            "gpu_type": "T4",
+            "num_gpus": 3,
+            "estimated_hours": 1,
+            "command": "python train.py",
+        },
+    )
+    assert resp.status_code == 201, resp.text
+    job_id = resp.json()["id"]
+
+    resp = client.post(f"/api/v1/admin/jobs/{job_id}/approve", headers=headers)
+    assert resp.status_code == 200, resp.text
+
+    resp = client.post(f"/api/v1/admin/jobs/{job_id}/start", headers=headers)
+    assert resp.status_code == 409, resp.text
+
+    resp = client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+    assert resp.json()["status"] == "APPROVED"
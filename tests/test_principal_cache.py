@@ -0,0 +1,90 @@
+# tests/test_principal_cache.py
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.core.principal_cache as cache_module
+import app.core.security as security
+from app.core.principal_cache import Principal, PrincipalCache
+from app.core.security import load_principal
+from app.db.session import Base
+from app.models.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_principal_cache_is_bounded_lru_with_ttl():
+    clock = FakeClock()
+    cache = PrincipalCache(maxsize=2, ttl_seconds=10, clock=clock)
+    for user_id in (1, 2):
+        cache.put(Principal(id=user_id, is_active=True, is_admin=False))
+
+    assert cache.get(1).id == 1  # 1 تازه‌ترین می‌شود
+    cache.put(Principal(id=3, is_active=True, is_admin=False))
+    assert cache.get(2) is None  # قدیمی‌ترین بیرون رفت
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+    clock.now = 10.0
+    assert cache.get(1) is None  # TTL تمام شد
+
+    # invalidate در حین خواندن از دیتابیس: مقدار خوانده‌شده cache نمی‌شود
+    generation = cache.generation
+    cache.invalidate(3)
+    cache.put(Principal(id=3, is_active=True, is_admin=True), generation)
+    assert cache.get(3) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["hit_rate"] == 0.5
+
+    disabled = PrincipalCache(maxsize=10, ttl_seconds=0)
+    disabled.put(Principal(id=1, is_active=True, is_admin=False))
+    assert disabled.get(1) is None
+
+
+def test_orm_user_changes_invalidate_cached_principal(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'principals.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    cache = PrincipalCache(maxsize=10, ttl_seconds=60)
+    monkeypatch.setattr(cache_module, "principal_cache", cache)
+    monkeypatch.setattr(security, "principal_cache", cache)
+
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    db = Session()
+    user = User(email="cached@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    queries.clear()
+    assert load_principal(db, user_id).is_admin is False
+    assert load_principal(db, user_id).is_admin is False
+    assert len(queries) == 1  # بار دوم از cache
+
+    # تغییر تا commit نشده، principal قبلی معتبر است
+    user.is_admin = True
+    db.flush()
+    assert cache.get(user_id) is not None
+    db.rollback()
+    assert cache.get(user_id) is not None
+
+    user.is_admin = True
+    db.commit()
+    assert cache.get(user_id) is None
+    assert load_principal(db, user_id).is_admin is True
+
+    db.delete(user)
+    db.commit()
+    assert load_principal(db, user_id) is None
+    db.close()
+    engine.dispose()
@@ -0,0 +1,270 @@
+# tests/test_quota.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.clock import VirtualClock
+from app.db.session import Base
+from app.models import Job, JobStatus, QuotaLedgerEntry, User, UserQuota
+from app.services.lifecycle import bulk_apply_transition, transition
+from app.services.quota import (
+    InsufficientQuota,
+    ledger_balance,
+    month_bounds,
+    reserve_quota,
+    rollover_quota_periods,
+    run_quota_rollover,
+    settle_quota,
+)
+
+JANUARY = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quota.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+def _add_user(db, email, *, monthly=10.0, period_start=JANUARY, period_end=None):
+    user = User(email=email, hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(
+        UserQuota(
+            user_id=user.id,
+            monthly_quota_hours=monthly,
+            used_hours_this_month=0.0,
+            period_start=period_start,
+            period_end=period_end or month_bounds(period_start)[1],
+        )
+    )
+    return user.id
+
+
+def _submit(db, user_id, *, hours, gpus=1):
+    job = Job(
+        user_id=user_id,
+        name="sweep",
+        gpu_type="T4",
+        num_gpus=gpus,
+        estimated_hours=hours,
+        command="run",
+        status=JobStatus.PENDING,
+    )
+    db.add(job)
+    db.flush()
+    reserve_quota(db, user_id, hours * gpus, job.id)
+    return job.id
+
+
+def _used(db, user_id):
+    return (
+        db.query(UserQuota.used_hours_this_month)
+        .filter(UserQuota.user_id == user_id)
+        .scalar()
+    )
+
+
+def test_finished_jobs_are_charged_measured_gpu_hours(Session):
+    clock = VirtualClock(JANUARY + timedelta(days=3))
+    db = Session()
+    user_id = _add_user(db, "meter@example.com", monthly=20.0)
+    short = _submit(db, user_id, hours=2, gpus=2)
+    overrun = _submit(db, user_id, hours=1)
+    db.commit()
+    assert _used(db, user_id) == 5.0
+    with pytest.raises(InsufficientQuota):
+        _submit(db, user_id, hours=16)
+    db.rollback()
+
+    for job_id in (short, overrun):
+        for action in ("approve", "start"):
+            assert transition(db, job_id, action, now=clock.now()).applied
+    db.commit()
+
+    # 1.5 ساعت روی 2 GPU به جای 4 GPU-hour رزروشده
+    clock.advance(1.5 * 3600)
+    assert transition(db, short, "complete", now=clock.now()).applied
+    db.commit()
+    assert _used(db, user_id) == pytest.approx(3.0 + 1.0)
+
+    # 2 ساعت اجرا با تخمین 1 ساعت: بیشتر از رزرو (مسیر set-based)
+    clock.advance(0.5 * 3600)
+    assert bulk_apply_transition(db, "fail", Job.id == overrun, now=clock.now()) == [overrun]
+    db.commit()
+    assert _used(db, user_id) == pytest.approx(3.0 + 2.0)
+    assert ledger_balance(db, user_id) == pytest.approx(_used(db, user_id))
+
+    # خالص دفتر هر Job همان مصرف اندازه‌گیری‌شده است
+    per_job = dict(
+        db.query(QuotaLedgerEntry.job_id, QuotaLedgerEntry.hours)
+        .filter(QuotaLedgerEntry.kind == "usage")
+        .all()
+    )
+    assert per_job == {short: pytest.approx(-1.0), overrun: pytest.approx(1.0)}
+    db.close()
+
+
+def test_rollover_resets_expired_periods_in_one_statement(Session):
+    clock = VirtualClock(JANUARY + timedelta(days=30, hours=23))
+    db = Session()
+    users = [_add_user(db, f"user{i}@example.com") for i in range(50)]
+    carried = _submit(db, users[0], hours=4)
+    # ردیف قدیمی بدون period_end که همین ماه ساخته شده
+    legacy = _add_user(db, "legacy@example.com", period_start=clock.now())
+    db.flush()
+    db.query(UserQuota).filter(UserQuota.user_id == legacy).update(
+        {"period_end": None, "used_hours_this_month": 2.0}
+    )
+    db.commit()
+
+    # هنوز ژانویه: فقط period_end ردیف قدیمی پر می‌شود
+    assert rollover_quota_periods(db, clock.now()) == 1
+    db.commit()
+    assert _used(db, legacy) == 2.0
+    assert _used(db, users[0]) == 4.0
+
+    statements = []
+
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    clock.advance(3600)
+    assert run_quota_rollover(Session, clock) == len(users) + 1
+    # چند worker همزمان: اجرای دوباره کاری نمی‌کند
+    assert run_quota_rollover(Session, clock) == 0
+    event.remove(db.get_bind(), "before_cursor_execute", record)
+    # بدون خواندن سهمیه‌ها در Python: یک UPDATE برای هر اجرا
+    assert statements == ["UPDATE", "UPDATE"]
+
+    db.expire_all()
+    quota = db.query(UserQuota).filter(UserQuota.user_id == users[0]).one()
+    assert quota.used_hours_this_month == 0.0
+    assert (quota.period_start, quota.period_end) == month_bounds(clock.now())
+    assert _used(db, legacy) == 0.0
+
+    # Job رزروشده در ژانویه که در فوریه reject می‌شود به ماه جدید برنمی‌گردد
+    assert transition(db, carried, "reject", now=clock.now()).applied
+    db.commit()
+    assert _used(db, users[0]) == 0.0
+    assert ledger_balance(db, users[0]) == 0.0
+    db.close()
+
+
+def test_job_spanning_rollover_is_charged_in_the_new_period(Session):
+    clock = VirtualClock(JANUARY + timedelta(days=30, hours=22))
+    db = Session()
+    user_id = _add_user(db, "span@example.com")
+    running = _submit(db, user_id, hours=3, gpus=2)
+    queued = _submit(db, user_id, hours=1)
+    for action in ("approve", "start"):
+        assert transition(db, running, action, now=clock.now()).applied
+    assert transition(db, queued, "approve", now=clock.now()).applied
+    db.commit()
+    assert _used(db, user_id) == 7.0
+
+    clock.advance(3 * 3600)
+    assert run_quota_rollover(Session, clock) == 1
+    db.expire_all()
+    assert _used(db, user_id) == 0.0
+
+    # 3 ساعت روی 2 GPU که 1 ساعتش در فوریه بوده: کل مصرف به فوریه می‌رسد
+    assert transition(db, running, "complete", now=clock.now()).applied
+    assert transition(db, queued, "start", now=clock.now()).applied
+    db.commit()
+    assert _used(db, user_id) == pytest.approx(6.0)
+
+    clock.advance(0.5 * 3600)
+    assert transition(db, queued, "fail", now=clock.now()).applied
+    db.commit()
+    assert _used(db, user_id) == pytest.approx(6.5)
+    assert ledger_balance(db, user_id) == pytest.approx(_used(db, user_id))
+
+    # تسویه تکراری در دوره جدید چیزی اضافه نمی‌کند
+    settle_quota(db, [(user_id, queued, 0.5)])
+    db.commit()
+    assert _used(db, user_id) == pytest.approx(6.5)
+    db.close()
+
+
+def test_quota_is_reserved_atomically_and_refunded(client, register_admin, SessionLocal):
+    headers = register_admin("ledger@example.com")
+    db = SessionLocal()
+    user_id = db.query(User.id).filter(User.email == "ledger@example.com").scalar()
+    db.close()
+
+    def used_and_balance():
+        db = SessionLocal()
+        try:
+            used = (
+                db.query(UserQuota.used_hours_this_month)
+                .filter(UserQuota.user_id == user_id)
+                .scalar()
+            )
+            return used, ledger_balance(db, user_id)
+        finally:
+            db.close()
+
+    job = {
+        "name": "ledger",
+        "gpu_type": "T4",
+        "num_gpus": 1,
+        "estimated_hours": 6,
+        "command": "run",
+    }
+    # سهمیه پیش‌فرض 10 ساعت است
+    first = client.post("/api/v1/jobs", headers=headers, json=job)
+    assert first.status_code == 201, first.text
+    resp = client.post("/api/v1/jobs", headers=headers, json=job)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == (
+        "Not enough GPU quota. Requested: 6.0h, Available: 4.0h"
+    )
+    assert used_and_balance() == (6.0, 6.0)
+
+    # reject کل رزرو را برمی‌گرداند (تکرارش رد می‌شود و چیزی برنمی‌گرداند)
+    job_id = first.json()["id"]
+    assert client.post(f"/api/v1/admin/jobs/{job_id}/reject", headers=headers).status_code == 200
+    assert client.post(f"/api/v1/admin/jobs/{job_id}/reject", headers=headers).status_code == 400
+    assert used_and_balance() == (0.0, 0.0)
+
+    # fail درست بعد از start: مصرف واقعی تقریبا صفر است
+    resp = client.post("/api/v1/jobs", headers=headers, json=job)
+    assert resp.status_code == 201, resp.text
+    job_id = resp.json()["id"]
+    for action in ("approve", "start", "fail"):
+        resp = client.post(f"/api/v1/admin/jobs/{job_id}/{action}", headers=headers)
+        assert resp.status_code == 200, resp.text
+    used, balance = used_and_balance()
+    assert 0.0 <= used < 0.01
+    assert abs(used - balance) < 1e-9
+
+    # bulk reject هم از همان مسیر برمی‌گرداند
+    job_ids = []
+    for _ in range(2):
+        job["estimated_hours"] = 4
+        resp = client.post("/api/v1/jobs", headers=headers, json=job)
+        assert resp.status_code == 201, resp.text
+        job_ids.append(resp.json()["id"])
+    resp = client.post(
+        "/api/v1/admin/jobs/bulk/reject", headers=headers, json={"job_ids": job_ids}
+    )
+    assert resp.json()["succeeded"] == job_ids
+    after = used_and_balance()
+    assert abs(after[0] - used) < 1e-9 and abs(after[1] - balance) < 1e-9
+
+    db = SessionLocal()
+    kinds = [
+        kind
+        for (kind,) in db.query(QuotaLedgerEntry.kind)
+        .filter(QuotaLedgerEntry.user_id == user_id)
+        .order_by(QuotaLedgerEntry.id)
+    ]
+    db.close()
+    assert kinds == ["reserve", "refund", "reserve", "usage"] + ["reserve"] * 2 + ["refund"] * 2
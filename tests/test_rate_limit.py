@@ -0,0 +1,138 @@
+# tests/test_rate_limit.py
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.core.rate_limit import (
+    DatabaseRateLimiter,
+    FairLimiter,
+    LocalRateLimiter,
+    QueueFull,
+    RateLimit,
+    parse_rate_limits,
+)
+from app.db.session import Base
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rate_limits():
+    limits = parse_rate_limits("jobs.create=60/m:30, jobs.admin=2/s")
+    assert limits["jobs.create"] == RateLimit(rate=1.0, burst=30)
+    assert limits["jobs.admin"] == RateLimit(rate=2.0, burst=2)
+    assert parse_rate_limits("") == {}
+    with pytest.raises(ValueError):
+        parse_rate_limits("jobs.create=fast")
+
+
+@pytest.mark.parametrize("backend", ["local", "database"])
+def test_token_buckets_are_per_key_and_refill(backend, tmp_path):
+    clock = FakeClock()
+    if backend == "local":
+        limiter = LocalRateLimiter(clock=clock)
+        other_process = limiter
+    else:
+        # دو engine روی یک فایل: دو process که bucket مشترک دارند
+        engines = [create_engine(f"sqlite:///{tmp_path / 'buckets.db'}") for _ in range(2)]
+        Base.metadata.create_all(bind=engines[0])
+        limiter = DatabaseRateLimiter(engines[0], clock=clock)
+        other_process = DatabaseRateLimiter(engines[1], clock=clock)
+
+    limit = RateLimit(rate=0.5, burst=2)
+    assert limiter.acquire("jobs.create:1", limit) == 0
+    assert other_process.acquire("jobs.create:1", limit) == 0
+    assert limiter.acquire("jobs.create:1", limit) == pytest.approx(2.0)
+    # کاربر دیگر bucket خودش را دارد
+    assert other_process.acquire("jobs.create:2", limit) == 0
+
+    clock.now += 1.0
+    assert other_process.acquire("jobs.create:1", limit) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert limiter.acquire("jobs.create:1", limit) == 0
+
+    # بیکاری طولانی: فقط تا burst پر می‌شود
+    clock.now += 3600
+    assert [limiter.acquire("jobs.create:1", limit) == 0 for _ in range(3)] == [
+        True,
+        True,
+        False,
+    ]
+
+    if backend == "database":
+        for engine in engines:
+            engine.dispose()
+
+
+def test_fair_limiter_serves_users_round_robin():
+    async def scenario():
+        limiter = FairLimiter(1, max_waiting=10, max_waiting_per_user=3, timeout=1.0)
+        order = []
+
+        async def request(user, name):
+            await limiter.acquire(user)
+            order.append(name)
+            await asyncio.sleep(0)
+            limiter.release()
+
+        await limiter.acquire("holder")
+        # noisy سه درخواست زودتر از quiet در صف گذاشته است
+        tasks = [asyncio.create_task(request("noisy", f"noisy-{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("quiet", "quiet-0")))
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFull) as exc:
+            await limiter.acquire("noisy")
+        assert exc.value.per_user
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order == ["noisy-0", "quiet-0", "noisy-1", "noisy-2"]
+        assert limiter.stats()["active"] == 0 and limiter.stats()["waiting"] == 0
+
+        # انتظار بیشتر از timeout: QueueFull سراسری و صف خالی می‌ماند
+        limiter.timeout = 0.01
+        await limiter.acquire("holder")
+        with pytest.raises(QueueFull) as exc:
+            await limiter.acquire("late")
+        assert not exc.value.per_user
+        assert limiter.stats()["waiting"] == 0
+        limiter.release()
+        assert limiter.stats()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_job_submission_is_rate_limited_per_user(client, register_admin, monkeypatch):
+    import app.core.rate_limit as rate_limit
+
+    monkeypatch.setattr(rate_limit, "_rate_limiter", rate_limit.LocalRateLimiter())
+    monkeypatch.setitem(
+        rate_limit.rate_limits, "jobs.create", rate_limit.RateLimit(rate=0.01, burst=2)
+    )
+    noisy = register_admin("noisy-tenant@example.com")
+    quiet = register_admin("quiet-tenant@example.com")
+    job = {
+        "name": "limited",
+        "gpu_type": "T4",
+        "num_gpus": 1,
+        "estimated_hours": 0.1,
+        "command": "run",
+    }
+
+    codes = [client.post("/api/v1/jobs", headers=noisy, json=job).status_code for _ in range(3)]
+    assert codes == [201, 201, 429]
+    resp = client.post("/api/v1/jobs", headers=noisy, json=job)
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 99
+
+    # bucket کاربر دیگر دست نخورده است
+    assert client.post("/api/v1/jobs", headers=quiet, json=job).status_code == 201
+    assert rate_limit.write_limiter.stats()["active"] == 0
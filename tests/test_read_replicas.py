@@ -0,0 +1,88 @@
+# tests/test_read_replicas.py
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.db.session as db_session
+from app.db.session import (
+    READ_PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    ReplicaSet,
+    get_db,
+    get_read_db,
+)
+
+
+def _sqlite_engine(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE source (name TEXT, writes INTEGER)")
+        connection.exec_driver_sql(f"INSERT INTO source VALUES ('{name}', 0)")
+    return engine
+
+
+@pytest.fixture
+def routed_client(tmp_path, monkeypatch):
+    """primary و دو replica (سه فایل SQLite) به همراه یک replica خراب."""
+    primary = _sqlite_engine(tmp_path / "primary.db", "primary")
+    healthy = [
+        _sqlite_engine(tmp_path / f"replica-{i}.db", f"replica-{i}") for i in (1, 2)
+    ]
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([healthy[0], broken, healthy[1]], retry_seconds=60)
+
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(bind=primary))
+    monkeypatch.setattr(db_session, "replicas", replicas)
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/read")
+    def read(db: Session = Depends(get_read_db)):
+        return db.execute(text("SELECT name FROM source")).scalar()
+
+    @app.post("/write")
+    def write(db: Session = Depends(get_db)):
+        db.execute(text("UPDATE source SET writes = writes + 1"))
+        db.commit()
+        return db.execute(text("SELECT name FROM source")).scalar()
+
+    yield TestClient(app), replicas, broken
+    for engine in (primary, broken, *healthy):
+        engine.dispose()
+
+
+def test_reads_rotate_over_healthy_replicas(routed_client):
+    client, replicas, broken = routed_client
+
+    sources = [client.get("/read").json() for _ in range(6)]
+    assert set(sources) == {"replica-1", "replica-2"}
+    assert sources.count("replica-1") == sources.count("replica-2")
+    # replica ای که وصل نشد از چرخش خارج شده است
+    assert replicas.is_down(broken)
+    assert broken not in replicas.candidates()
+
+    # همه replica ها خراب: خواندن از primary
+    for replica in replicas.engines:
+        replicas.mark_down(replica)
+    assert client.get("/read").json() == "primary"
+
+
+def test_client_reads_its_own_writes_from_primary(routed_client):
+    client, _, _ = routed_client
+
+    assert client.get("/read").json().startswith("replica")
+    resp = client.post("/write")
+    assert resp.json() == "primary"
+    assert READ_PRIMARY_COOKIE in resp.cookies
+
+    # همان client (با کوکی) تا پایان بازه از primary می‌خواند
+    assert [client.get("/read").json() for _ in range(3)] == ["primary"] * 3
+
+    # client دیگر یا کوکی منقضی‌شده: replica
+    other = TestClient(client.app)
+    assert other.get("/read").json().startswith("replica")
+    other.cookies.set(READ_PRIMARY_COOKIE, "1")
+    assert other.get("/read").json().startswith("replica")
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.scheduler import FairSharePolicy, FifoPolicy
+
+NOW = datetime(2025, 1, 1)
+
+
+class FakeContext:
+    """SchedulingContext ساده با تعداد ثابت slot برای هر gpu_type."""
+
+    def __init__(self, slots, now=NOW):
+        self.slots = dict(slots)
+        self.now = now
+        self.started = []
+
+    def try_start(self, job):
+        if self.slots.get(job.gpu_type, 0) < job.num_gpus:
+            return False
+        self.slots[job.gpu_type] -= job.num_gpus
+        self.started.append(job.id)
+        return True
+
+
+def _job(job_id, user_id, gpu_type="A100", num_gpus=1, hours=1.0, priority="NORMAL"):
+    return SimpleNamespace(
+        id=job_id,
+        user_id=user_id,
+        gpu_type=gpu_type,
+        num_gpus=num_gpus,
+        estimated_hours=hours,
+        priority=priority,
+        progress_hours=0.0,
+        preemptions=0,
+    )
+
+
+def test_fifo_head_of_line_blocks_same_gpu_type_only():
+    policy = FifoPolicy()
+    policy.submit(_job(1, 1, num_gpus=4))
+    policy.submit(_job(2, 1, num_gpus=1))
+    policy.submit(_job(3, 1, gpu_type="T4"))
+
+    ctx = FakeContext({"A100": 2, "T4": 1})
+    assert policy.dispatch(ctx) == 1
+    assert ctx.started == [3]
+
+
+def test_fair_share_interleaves_users_instead_of_fifo():
+    policy = FairSharePolicy()
+    # کاربر ۱ صد Job پشت سر هم ثبت می‌کند، کاربر ۲ فقط دو تا
+    for i in range(100):
+        policy.submit(_job(i, user_id=1))
+    policy.submit(_job(1000, user_id=2))
+    policy.submit(_job(1001, user_id=2))
+
+    ctx = FakeContext({"A100": 4})
+    policy.dispatch(ctx)
+    assert sorted(ctx.started[:4]) == [0, 1, 1000, 1001]
+
+
+def test_fair_share_respects_quota_weights():
+    policy = FairSharePolicy()
+    policy.set_weight(1, 30.0)
+    policy.set_weight(2, 10.0)
+    for i in range(40):
+        policy.submit(_job(i, user_id=1))
+        policy.submit(_job(100 + i, user_id=2))
+
+    ctx = FakeContext({"A100": 20})
+    policy.dispatch(ctx)
+    by_user_1 = sum(1 for j in ctx.started if j < 100)
+    assert by_user_1 == 15  # سهم ۳ به ۱
+
+
+def test_fair_share_usage_decays_over_time():
+    policy = FairSharePolicy(half_life_hours=24)
+    policy.charge(1, 100.0, NOW)
+    assert abs(policy.usage(1, NOW + timedelta(hours=24)) - 50.0) < 1e-6
+
+    # کاربر ۱ دیروز زیاد مصرف کرده؛ کاربر ۲ امروز کمتر، اما اخیرتر
+    policy.charge(2, 60.0, NOW + timedelta(hours=48))
+    policy.submit(_job(1, user_id=1))
+    policy.submit(_job(2, user_id=2))
+    ctx = FakeContext({"A100": 1}, now=NOW + timedelta(hours=48))
+    policy.dispatch(ctx)
+    assert ctx.started == [1]
+
+
+def test_fair_share_skips_removed_jobs():
+    policy = FairSharePolicy()
+    policy.submit(_job(1, user_id=1))
+    policy.submit(_job(2, user_id=1))
+    policy.remove(1)
+
+    ctx = FakeContext({"A100": 4})
+    assert policy.dispatch(ctx) == 1
+    assert ctx.started == [2]
+    assert len(policy) == 0
+
+
+def test_compute_reservation_picks_earliest_node():
+    from app.services.scheduler import compute_reservation
+
+    reservation = compute_reservation(
+        num_gpus=8,
+        now=NOW,
+        node_free={1: 4, 2: 2},
+        running=[
+            (1, 4, NOW + timedelta(hours=10)),
+            (2, 6, NOW + timedelta(hours=3)),
+        ],
+    )
+    assert reservation.node_id == 2
+    assert reservation.start == NOW + timedelta(hours=3)
+
+
+def test_fair_share_backfill_skips_blocked_user():
+    from app.services.scheduler import Reservation
+
+    class BackfillContext(FakeContext):
+        def free_gpus(self, gpu_type):
+            return self.slots.get(gpu_type, 0)
+
+        def reservation_for(self, job):
+            return Reservation(node_id=1, start=NOW + timedelta(hours=5))
+
+        def try_start(self, job, *, avoid_nodes=None):
+            return super().try_start(job)
+
+    policy = FairSharePolicy(backfill=True)
+    policy.submit(_job(1, user_id=1, num_gpus=8))
+    policy.submit(_job(2, user_id=2, num_gpus=2, hours=1))
+
+    ctx = BackfillContext({"A100": 4})
+    assert policy.dispatch(ctx) == 1
+    assert ctx.started == [2]
+    assert len(policy) == 1
+
+
+def test_choose_victims_prefers_lowest_class_and_fewest_gpus():
+    from app.services.scheduler import choose_victims
+
+    plan = choose_victims(
+        num_gpus=4,
+        priority=2,
+        node_free={1: 0, 2: 2},
+        running=[
+            # node 1: یک Job NORMAL بزرگ
+            (10, 1, 8, 1, NOW),
+            # node 2: دو Job LOW دوتایی
+            (20, 2, 2, 0, NOW),
+            (21, 2, 2, 0, NOW + timedelta(hours=1)),
+        ],
+    )
+    assert plan.node_id == 2
+    assert plan.victims == [21]  # جدیدترین Job، کمترین کار از دست می‌رود
+
+    # هم‌کلاس‌ها هرگز preempt نمی‌شوند
+    assert choose_victims(
+        num_gpus=4, priority=0, node_free={2: 2}, running=[(20, 2, 2, 0, NOW)]
+    ) is None
+
+
+def test_fifo_runs_higher_priority_classes_first():
+    policy = FifoPolicy()
+    policy.submit(_job(1, user_id=1, num_gpus=2))
+    policy.submit(_job(2, user_id=1, num_gpus=2, priority="HIGH"))
+    policy.submit(_job(3, user_id=1, num_gpus=1, priority="LOW"))
+
+    ctx = FakeContext({"A100": 2})
+    assert policy.dispatch(ctx) == 1
+    assert ctx.started == [2]
+    # Job سر کلاس NORMAL جا نشد؛ کلاس LOW پشت آن می‌ماند
+    assert len(policy) == 2